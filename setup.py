@@ -65,7 +65,7 @@ setup(
     tests_require=["tox", "wwpdb.utils.testing"],
     #
     # Not configured ...
-    extras_require={"dev": ["check-manifest"], "test": ["coverage"], "server": ["webob"]},
+    extras_require={"dev": ["check-manifest"], "test": ["coverage"], "server": ["webob"], "zstd": ["zstandard"], "fastjson": ["orjson"]},
     # Added for
     command_options={
         "build_sphinx": {
@@ -5,6 +5,20 @@
 # Update:
 #   16-Feb-2017 jdw add summary content request support --
 #   14-Mar-2017 jdw remove some unused code and uncecessary file checks
+#   18-Oct-2026 ep  serve several entry content types for one dataset from a single read
+#   18-Oct-2026 ep  log model bytes read in place and bytes copied to the session
+#   18-Oct-2026 ep  stream summary reports from the database directly to the report file
+#   18-Oct-2026 ep  serve summary reports from the shared report cache
+#   18-Oct-2026 ep  coalesce identical requests running concurrently on the host
+#   18-Oct-2026 ep  request proxied content types concurrently
+#   18-Oct-2026 ep  bulk entry content request messages
+#   18-Oct-2026 ep  write reports in the requested format (json, ndjson, gzip and zstd compressed)
+#   18-Oct-2026 ep  link completed reports into the content-addressed report store and record their digests
+#   18-Oct-2026 ep  locate the entry model file here rather than in the web request
+#   18-Oct-2026 ep  lock the session store in its own session directory for concurrent consumers
+#   18-Oct-2026 ep  forward the requested format type unchanged to remote sites
+#   18-Oct-2026 ep  replace rather than rewrite test mode reports which may be linked to the report store
+#   18-Oct-2026 ep  reject unsupported report format types rather than writing them as JSON
 ##
 """
 Manage invoking content request for web service -
@@ -19,22 +33,27 @@ __version__ = "V0.07"
 import copy
 import os.path
 
-import json
 import logging
 import os
 import time
 
 #
 from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
-from wwpdb.utils.ws_utils.ServiceDataStore import ServiceDataStore
 from wwpdb.utils.ws_utils.ServiceHistory import ServiceHistory
 
+from wwpdb.apps.content_ws_server.content.ContentRequestBulk import ContentRequestBulk
+from wwpdb.apps.content_ws_server.content.ContentRequestCoalescer import ContentRequestCoalescer
+from wwpdb.apps.content_ws_server.content.ContentRequestModelLocator import ContentRequestModelLocator
 from wwpdb.apps.content_ws_server.content.ContentRequestPolicyFilter import ContentRequestPolicyFilter
 from wwpdb.apps.content_ws_server.content.ContentRequestProxyReportPdbx import ContentRequestProxyReportPdbx
 from wwpdb.apps.content_ws_server.content.ContentRequestReportDb import ContentRequestReportDb
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import ContentRequestReportWriter, getFormatType
+from wwpdb.apps.content_ws_server.content.ContentRequestResultCache import ContentRequestResultCache
 
 #
 from wwpdb.apps.content_ws_server.content.ContentRequestReportPdbx import ContentRequestReportPdbx
+from wwpdb.apps.content_ws_server.content.ContentRequestReportStore import ContentRequestReportStore
+from wwpdb.apps.content_ws_server.content.ContentRequestSessionStore import ContentRequestSessionStore
 
 #
 logger = logging.getLogger()
@@ -64,7 +83,7 @@ class ContentRequest(object):
         try:
             self.__sessionPath = pD["session_path"]
             self.__sdsPrefix = pD["session_store_prefix"]
-            self.__sds = ServiceDataStore(sessionPath=self.__sessionPath, prefix=self.__sdsPrefix)
+            self.__sds = ContentRequestSessionStore(sessionPath=self.__sessionPath, prefix=self.__sdsPrefix)
             self.__sds.set("status", "running")
             #
             #  JDW not used
@@ -89,6 +108,9 @@ class ContentRequest(object):
         testMode = self.__pD.get("worker_test_mode", False)
         successFlag = False
         #
+        if self.__pD.get("request_bulk", False):
+            return self.__runBulk()
+        #
         if testMode:
             try:
                 wSecs = int(self.__pD.get("worker_test_duration", 10))
@@ -101,8 +123,10 @@ class ContentRequest(object):
                 ct = self.__pD["request_content_type"]
                 fp = self.__pD["report_path"]
                 fn = self.__pD["report_file"]
-                with open(fp, "w") as ofh:
+                # The report of an earlier request may be linked to the report store
+                with open(fp + ".tmp", "w") as ofh:
                     ofh.write("DUMMY")
+                os.replace(fp + ".tmp", fp)
                 iD[ct] = (fn, "data")
                 successFlag = True
             except Exception as e:
@@ -111,11 +135,12 @@ class ContentRequest(object):
             logger.info("Test mode service completed")
         else:
             #
-            successFlag = self.__run(self.__pD)
+            # Identical requests that are running concurrently share a single execution
+            successFlag = ContentRequestCoalescer().run(self.__pD, lambda: self.__run(self.__pD))
             # Add the output files to the session store -
-            ct = self.__pD["request_content_type"]
-            fp = self.__pD["report_path"]
-            fn = self.__pD["report_file"]
+            ctL = self.__pD.get("request_content_type_list", [self.__pD["request_content_type"]])
+            fnL = self.__pD.get("report_file_list", [self.__pD["report_file"]])
+            fpL = self.__pD.get("report_path_list", [self.__pD["report_path"]])
             #
             # JDW  - Move down
             # if os.access(fp, os.R_OK):
@@ -124,18 +149,50 @@ class ContentRequest(object):
             # Add an additional existence tests for key report files -
             #
             if successFlag:
-                fp = self.__pD["report_path"]
-                if not os.access(fp, os.R_OK):
-                    successFlag = False
-                else:
-                    successFlag = True
-                    iD[ct] = (fn, "data")
+                for ct, fn, fp in zip(ctL, fnL, fpL):
+                    if not os.access(fp, os.R_OK):
+                        successFlag = False
+                    else:
+                        iD[ct] = (fn, "data")
+            if successFlag:
+                iD["report_digests"] = self.__storeReports(zip(fnL, fpL))
         #
         if successFlag:
             iD["status"] = "completed"
         else:
             iD["status"] = "failed"
         #
+        return self.__updateSessionStatus(iD)
+
+    def __runBulk(self):
+        """Run the datasets in a message of a bulk request  -  the session status is updated once all are done."""
+        done, successFlag = ContentRequestBulk(self.__pD).run()
+        if not done:
+            return True
+        iD = {}
+        if successFlag:
+            iD[self.__pD["request_content_type"]] = (self.__pD["report_file"], "data")
+            iD["report_digests"] = self.__storeReports([(self.__pD["report_file"], self.__pD["report_path"])])
+            iD["status"] = "completed"
+        else:
+            iD["status"] = "failed"
+        return self.__updateSessionStatus(iD)
+
+    def __storeReports(self, fileList):
+        """Link the (fileName, filePath) reports into the report store  -  Returns the session report digests d[fileName] = {sha256, md5, size}"""
+        dD = {}
+        try:
+            dD = self.__sds.get("report_digests") or {}
+            rs = ContentRequestReportStore()
+            for fn, fp in fileList:
+                fD = rs.add(fp)
+                if fD:
+                    dD[fn] = fD
+        except Exception as e:
+            logger.exception("Failed to store reports %s", str(e))
+        return dD
+
+    def __updateSessionStatus(self, iD):
         try:
             #
             # Update service activity tracking
@@ -176,36 +233,56 @@ class ContentRequest(object):
             reportPath = pD["report_path"]
             proxyReportUrl = pD.get("session_proxy_url")
 
+            # Several entry content types may be requested for the same dataset -
+            contentTypeList = pD.get("request_content_type_list", [contentType])
+            reportPathList = pD.get("report_path_list", [reportPath])
+            # Layout and compression of the report files written here  -  remote sites get the requested format type
+            formatType = getFormatType(pD.get("request_format_type", "json"))
+            if formatType is None and not proxyReportUrl:
+                logger.error("Unsupported report format %r", pD.get("request_format_type"))
+                return False
+
             if proxyReportUrl and contentType.startswith("report-entry-"):
                 logger.debug("Forwarding request to another server for an entry")
                 logger.debug("pD is %r", pD)
-                formatType = pD.get("request_format_type")
 
                 cr = ContentRequestProxyReportPdbx()
                 # Need to test for rejection - id not found and forward back errors
-                status = cr.retrieveProxyReport(dataSetId, proxyReportUrl, contentType, formatType, reportPath)
-
-                ok = status
+                # The content types are requested from the remote server concurrently
+                requestFormatType = pD.get("request_format_type")
+                statusList = cr.retrieveProxyReports([(dataSetId, proxyReportUrl, ct, requestFormatType, rp) for ct, rp in zip(contentTypeList, reportPathList)])
+                ok = all(statusList)
 
             elif contentType.startswith("report-entry-"):
                 cr = ContentRequestReportPdbx()
                 ctypeL = cr.getContentTypes()
-                if contentType in ctypeL:
-                    logger.debug("Processing content definition %r", contentType)
+                if all([ct in ctypeL for ct in contentTypeList]):
+                    logger.debug("Processing content definitions %r", contentTypeList)
                     logFilePath = os.path.join(self.__sessionPath, dataSetId + " -parser.log")
-                    pdbxFilePath = pD["session_pdbx_file_path"]
+                    pdbxFilePath = pD.get("session_pdbx_file_path")
+                    bytesCopied = pD.get("session_pdbx_bytes_copied", 0)
+                    if not pdbxFilePath:
+                        ml = ContentRequestModelLocator(sessionPath, siteId=pD.get("session_pdbx_site_id"))
+                        pdbxFilePath = ml.getModelFilePath(dataSetId)
+                        bytesCopied = ml.getBytesCopied(pdbxFilePath)
+                    if not pdbxFilePath:
+                        logger.error("No model file for %r", dataSetId)
+                        return False
                     #
-                    rD = cr.extractContent(pdbxFilePath, logFilePath, contentType)
+                    if len(contentTypeList) > 1:
+                        rDD = cr.extractContents(pdbxFilePath, logFilePath, contentTypeList)
+                    else:
+                        rDD = {contentType: cr.extractContent(pdbxFilePath, logFilePath, contentType)}
                     cF = ContentRequestPolicyFilter()
-                    # Filter content based on contentType policies
-                    rD = cF.filterContent(contentType, rD)
-                    if self.__debugPayload:
-                        logger.debug("File content %r", rD)
-                    ss = json.dumps(rD)
-                    if self.__debugPayload:
-                        logger.info("JSON serialized result %r", ss)
-                    with open(reportPath, "w") as ofh:
-                        ofh.write(ss)
+                    for ct, rp in zip(contentTypeList, reportPathList):
+                        # Filter content based on contentType policies
+                        rD = cF.filterContent(ct, rDD.get(ct, {}))
+                        if self.__debugPayload:
+                            logger.debug("File content %r", rD)
+                        with ContentRequestReportWriter(rp, formatType=formatType) as wr:
+                            wr.writeContent(rD)
+                    ioD = cr.getIoCounters()
+                    logger.info(" - Model bytes read: %d copied: %d", ioD["bytes_read"], bytesCopied)
                     ok = True
             elif contentType.startswith("report-summary-"):
                 site = self.__siteId
@@ -215,22 +292,25 @@ class ContentRequest(object):
                 cr = ContentRequestReportDb(siteId=site)
                 ctL = cr.getContentTypes()
                 if contentType in ctL:
-                    rD = cr.extractContent(contentType)
-                    logger.info("Database content length %r", len(rD))
-                    ss = json.dumps(rD)
-                    logger.info("JSON serialized result length %r", len(ss))
-                    with open(reportPath, "w") as ofh:
-                        ofh.write(ss)
-                    ok = True
+                    rc = ContentRequestResultCache()
+                    key = rc.getKey(contentType, site, cr.getContentDefinitionHash(), formatType)
+                    # Identical concurrent requests wait for the first and are served from the cache
+                    with rc.lock(key):
+                        ok = rc.fetch(contentType, key, reportPath)
+                        if not ok:
+                            ok = cr.writeContent(contentType, reportPath, formatType=formatType)
+                            if ok:
+                                rc.store(contentType, key, reportPath)
+                    logger.info("Database report length %r cache statistics %r", os.path.getsize(reportPath) if ok else None, rc.getStats())
             else:
                 ok = False
             #
             logger.info(" - Site Id: %r", siteId)
             logger.info(" - Session path: %r", sessionPath)
             logger.info(" - Dataset Id:   %r", dataSetId)
-            logger.info(" - Content Type: %r", contentType)
-            logger.info(" - Report file: %r", reportFile)
-            logger.info(" - Report path: %r", reportPath)
+            logger.info(" - Content Type: %r", contentTypeList)
+            logger.info(" - Report file: %r", pD.get("report_file_list", [reportFile]))
+            logger.info(" - Report path: %r", reportPathList)
             logger.info(" - Return status: %r", ok)
 
             return ok
@@ -0,0 +1,156 @@
+##
+# File:  ContentRequestBatchProxy.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  cache dataset site lookups
+#   18-Oct-2026 ep  describe the per dataset remote requests
+##
+"""
+Retrieve one entry content type for many datasets from remote sites -
+
+Datasets are grouped by the site holding them.  The remote content service accepts one dataset
+per entry content request, so this is not a batched remote request:  each dataset is still
+submitted, polled and downloaded on its own.  The requests to each site are run concurrently
+(up to SITE_WS_CONTENT_PROXY_MAX_PER_SITE outstanding) on the pooled remote sessions, and the
+status of each dataset is reported as it progresses.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import threading
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+from wwpdb.utils.config.ConfigInfoDataSet import ConfigInfoDataSet
+
+from wwpdb.apps.content_ws_server.content.ContentRequestModelCache import ContentRequestModelCache
+from wwpdb.apps.content_ws_server.content.ContentRequestProxyReportPdbx import ContentRequestProxyReportPdbx
+
+logger = logging.getLogger()
+
+
+class ContentRequestBatchProxy(object):
+    """
+    Concurrent retrieval of entry reports for many datasets from remote content services.
+
+    """
+
+    def __init__(self, siteLookup=None, proxy=None, maxPerSite=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        # Method returning the site of a dataset
+        self.__siteLookup = siteLookup if siteLookup else self.__lookupSiteId
+        self.__proxy = proxy if proxy else ContentRequestProxyReportPdbx()
+        # Max number of outstanding requests to each remote site
+        self.__maxPerSite = int(maxPerSite if maxPerSite is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_MAX_PER_SITE", 8))
+        #
+        self.__lock = threading.Lock()
+        self.__progressD = {}
+        self.__progressPath = None
+        self.__progressFunc = None
+
+    def __lookupSiteId(self, dataSetId):
+        """Return the site of the dataset  -  lookups are cached in the process."""
+        return ContentRequestModelCache().getSiteId(dataSetId, lambda dId: ConfigInfoDataSet().getSiteId(dId))
+
+    def getDataSetSiteId(self, dataSetId):
+        """Return the site holding the input dataset."""
+        siteId = self.__siteLookup(dataSetId)
+        # On development server
+        if siteId == "UNASSIGNED":
+            siteId = self.__siteId
+        return siteId
+
+    def groupBySite(self, dataSetIdList):
+        """Group datasets by the site serving them -
+
+        Returns: (list of local datasets, d[apiUrl] = [dataSetId, ...], list of datasets without a service)
+        """
+        siteCoverage = [x.strip() for x in str(self.__cI.get("SITE_WS_CONTENT_SITE_COVERAGE")).split(",")]
+        siteMap = self.__cI.get("PROJECT_CONTENTWS_SERVICE_DICTIONARY") or {}
+        localList = []
+        proxyD = {}
+        unresolvedList = []
+        for dataSetId in dataSetIdList:
+            siteId = self.getDataSetSiteId(dataSetId)
+            if siteId == self.__siteId or siteId in siteCoverage:
+                localList.append(dataSetId)
+                continue
+            contentWsUrl = siteMap.get(siteId, None)
+            if contentWsUrl:
+                proxyD.setdefault(contentWsUrl, []).append(dataSetId)
+            else:
+                logger.error("No content service for %r on site %r", dataSetId, siteId)
+                unresolvedList.append(dataSetId)
+        logger.info("Datasets local %d remote %r unresolved %d", len(localList), {k: len(v) for k, v in proxyD.items()}, len(unresolvedList))
+        return localList, proxyD, unresolvedList
+
+    def retrieveReports(self, proxyD, contentType, formatType, reportPathD, progressPath=None, progressFunc=None, timeout=None):
+        """Retrieve the reports for the datasets in proxyD[apiUrl] = [dataSetId, ...] into reportPathD[dataSetId] -
+
+        One remote request is made for each dataset and the requests are run concurrently.  The status of each dataset (queued, submitted, completed or failed) is kept in the JSON
+        file progressPath and passed to progressFunc(dataSetId, status).
+
+        Returns: d[dataSetId] = True for success or False otherwise
+        """
+        self.__progressPath = progressPath
+        self.__progressFunc = progressFunc
+        with self.__lock:
+            self.__progressD = {}
+        for dL in proxyD.values():
+            for dataSetId in dL:
+                self.__setProgress(dataSetId, "queued")
+        loop = asyncio.new_event_loop()
+        try:
+            rL = loop.run_until_complete(self.__gather(proxyD, contentType, formatType, reportPathD, timeout))
+        finally:
+            loop.close()
+        rD = dict(rL)
+        logger.info("Batch %r completed %d of %d", contentType, sum([1 for v in rD.values() if v]), len(rD))
+        return rD
+
+    def getProgress(self):
+        """Return the status of each dataset in the current batch."""
+        with self.__lock:
+            return dict(self.__progressD)
+
+    async def __gather(self, proxyD, contentType, formatType, reportPathD, timeout):
+        taskL = []
+        for apiUrl, dL in proxyD.items():
+            # Each site has its own limit so that a slow site does not hold up the others
+            sem = asyncio.Semaphore(max(1, self.__maxPerSite))
+            for dataSetId in dL:
+                taskL.append(self.__retrieve(sem, dataSetId, apiUrl, contentType, formatType, reportPathD[dataSetId], timeout))
+        return await asyncio.gather(*taskL)
+
+    async def __retrieve(self, sem, dataSetId, apiUrl, contentType, formatType, reportPath, timeout):
+        async with sem:
+            ok = await self.__proxy.retrieveProxyReportAsync(dataSetId, apiUrl, contentType, formatType, reportPath, timeout=timeout, progressFunc=self.__setProgress)
+        self.__setProgress(dataSetId, "completed" if ok else "failed")
+        return dataSetId, ok
+
+    def __setProgress(self, dataSetId, status):
+        with self.__lock:
+            self.__progressD[dataSetId] = status
+            if self.__progressPath:
+                self.__writeProgress()
+        if self.__progressFunc:
+            self.__progressFunc(dataSetId, status)
+
+    def __writeProgress(self):
+        try:
+            fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.__progressPath)))
+            with os.fdopen(fd, "w") as ofh:
+                json.dump(self.__progressD, ofh)
+            os.replace(tmpPath, self.__progressPath)
+        except Exception as e:
+            logger.exception("Failing to update progress file %r %s", self.__progressPath, str(e))
@@ -0,0 +1,165 @@
+##
+# File:  ContentRequestBulk.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  share the model file lookup of entry content requests
+#   18-Oct-2026 ep  lock the session store in its own session directory for concurrent consumers
+#   18-Oct-2026 ep  write the entry reports and the combined NDJSON output with the report writer
+##
+"""
+Process the messages of a bulk entry content request -
+
+A bulk request for one content type and many datasets is published as several messages,
+each with a chunk of the datasets held locally or on one remote site.  Each message writes
+the entry reports to the bulk directory of the session and records the status of its
+datasets in the session store.  The message completing the last datasets combines the
+entry reports into a single NDJSON (optionally compressed as in request_format_type, e.g.
+ndjson.gz) or zip archive output file.  Reports are written with ContentRequestReportWriter and
+so with the configured JSON serializer backend.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import json
+import logging
+import os
+import zipfile
+
+from oslo_concurrency import lockutils
+
+from wwpdb.apps.content_ws_server.content.ContentRequestBatchProxy import ContentRequestBatchProxy
+from wwpdb.apps.content_ws_server.content.ContentRequestModelLocator import ContentRequestModelLocator
+from wwpdb.apps.content_ws_server.content.ContentRequestPolicyFilter import ContentRequestPolicyFilter
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import ContentRequestJsonSerializer
+from wwpdb.apps.content_ws_server.content.ContentRequestReportPdbx import ContentRequestReportPdbx
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import ContentRequestReportWriter, parseFormatType
+from wwpdb.apps.content_ws_server.content.ContentRequestSessionStore import ContentRequestSessionStore
+
+logger = logging.getLogger()
+
+
+def getBulkEntryFileName(dataSetId, contentType):
+    """Return the file name of an entry report in the bulk directory."""
+    return dataSetId + "_" + contentType + ".json"
+
+
+class ContentRequestBulk(object):
+    """
+    Run the datasets of one bulk request message and combine the output of the completed request.
+
+    """
+
+    def __init__(self, pD, modelLocator=None, batchProxy=None):
+        self.__pD = pD
+        self.__contentType = pD["request_content_type"]
+        self.__bulkPath = pD["bulk_path"]
+        self.__sds = ContentRequestSessionStore(sessionPath=pD["session_path"], prefix=pD["session_store_prefix"])
+        # Method returning the model file path for a dataset or None
+        self.__modelLocator = modelLocator if modelLocator else self.__getModelFilePath
+        self.__batchProxy = batchProxy
+        self.__serializer = ContentRequestJsonSerializer()
+
+    def run(self):
+        """Process the datasets of this message -
+
+        Returns: (True if all datasets of the bulk request are done, True if the combined output was written)
+        """
+        dataSetIdList = self.__pD["request_dataset_id_list"]
+        self.__updateStatus({dataSetId: "running" for dataSetId in dataSetIdList})
+        try:
+            if self.__pD.get("session_proxy_url"):
+                statusD = self.__runRemote(dataSetIdList)
+            else:
+                statusD = self.__runLocal(dataSetIdList)
+        except Exception as e:
+            logger.exception("Failing bulk request chunk %r %s", dataSetIdList, str(e))
+            statusD = {dataSetId: "failed" for dataSetId in dataSetIdList}
+        #
+        with self.__lock():
+            entryD = self.__updateStatus(statusD)
+            if not all([st in ["completed", "failed"] for st in entryD.values()]) or self.__sds.get("bulk_finalized"):
+                return False, False
+            ok = self.__combine(entryD)
+            self.__sds.set("bulk_finalized", True)
+        return True, ok
+
+    def __lock(self):
+        return lockutils.lock("wsbulk", external=True, lock_path=self.__bulkPath)
+
+    def __updateStatus(self, statusD):
+        """Record the status of the input datasets  -  Returns the status of all datasets of the bulk request."""
+        with lockutils.lock("wsbulkstatus", external=True, lock_path=self.__bulkPath):
+            entryD = self.__sds.get("bulk_entry_status") or {}
+            entryD.update(statusD)
+            self.__sds.set("bulk_entry_status", entryD)
+        return entryD
+
+    def __entryPath(self, dataSetId):
+        return os.path.join(self.__bulkPath, getBulkEntryFileName(dataSetId, self.__contentType))
+
+    def __runLocal(self, dataSetIdList):
+        statusD = {}
+        cr = ContentRequestReportPdbx()
+        cF = ContentRequestPolicyFilter()
+        for dataSetId in dataSetIdList:
+            statusD[dataSetId] = "failed"
+            try:
+                pdbxFilePath = self.__modelLocator(dataSetId)
+                if not pdbxFilePath:
+                    logger.info("No model file for %r", dataSetId)
+                    continue
+                logFilePath = os.path.join(self.__bulkPath, dataSetId + "-parser.log")
+                rD = cF.filterContent(self.__contentType, cr.extractContent(pdbxFilePath, logFilePath, self.__contentType))
+                with ContentRequestReportWriter(self.__entryPath(dataSetId), formatType="json", serializer=self.__serializer) as wr:
+                    wr.writeContent(rD)
+                statusD[dataSetId] = "completed"
+            except Exception as e:
+                logger.exception("Failing bulk entry %r %s", dataSetId, str(e))
+        return statusD
+
+    def __runRemote(self, dataSetIdList):
+        bp = self.__batchProxy if self.__batchProxy else ContentRequestBatchProxy()
+        apiUrl = self.__pD["session_proxy_url"]
+        reportPathD = {dataSetId: self.__entryPath(dataSetId) for dataSetId in dataSetIdList}
+        rD = bp.retrieveReports({apiUrl: dataSetIdList}, self.__contentType, "json", reportPathD)
+        return {dataSetId: "completed" if rD.get(dataSetId) else "failed" for dataSetId in dataSetIdList}
+
+    def __getModelFilePath(self, dataSetId):
+        """Return the latest archive or deposit model file (or its gzip compressed form) for the dataset."""
+        # Models are not generated by DepUI for bulk requests
+        return ContentRequestModelLocator(self.__pD["session_path"]).getModelFilePath(dataSetId, generateModel=False)
+
+    def __combine(self, entryD):
+        """Write the combined output of the bulk request  -  Returns True if any dataset completed."""
+        reportPath = self.__pD["report_path"]
+        try:
+            if self.__pD.get("bulk_output_format") == "ndjson":
+                # The compression of the output follows the request format type (e.g. ndjson.gz)
+                _, compression = parseFormatType(self.__pD.get("request_format_type", "ndjson"))
+                formatType = "ndjson." + compression if compression else "ndjson"
+                with ContentRequestReportWriter(reportPath, formatType=formatType, serializer=self.__serializer) as wr:
+                    for dataSetId, status in entryD.items():
+                        content = None
+                        if status == "completed":
+                            with open(self.__entryPath(dataSetId), "rb") as ifh:
+                                content = json.load(ifh)
+                        wr.writeRecord({"dataset_id": dataSetId, "status": status, "content": content})
+            else:
+                tmpPath = reportPath + ".tmp"
+                with zipfile.ZipFile(tmpPath, "w", zipfile.ZIP_DEFLATED) as zf:
+                    for dataSetId, status in entryD.items():
+                        if status == "completed":
+                            zf.write(self.__entryPath(dataSetId), getBulkEntryFileName(dataSetId, self.__contentType))
+                    zf.writestr("manifest.json", self.__serializer.dumps(entryD))
+                os.replace(tmpPath, reportPath)
+            nCompleted = sum([1 for st in entryD.values() if st == "completed"])
+            logger.info("Bulk %r output %r completed %d of %d", self.__contentType, reportPath, nCompleted, len(entryD))
+            return nCompleted > 0
+        except Exception as e:
+            logger.exception("Failing to combine bulk output %r %s", reportPath, str(e))
+        return False
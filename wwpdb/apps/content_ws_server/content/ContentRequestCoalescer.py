@@ -0,0 +1,217 @@
+##
+# File:  ContentRequestCoalescer.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  remove idle keys at most once per cleanup interval and only while holding their lock
+#   18-Oct-2026 ep  drop the model file path from the key (it is no longer set on submit)
+##
+"""
+Coalesce identical in-flight content requests -
+
+Requests for the same dataset, content types, format and source are serialized on a lock
+in a directory shared by the consumer instances on a host.  The first request computes
+the reports and publishes them.  Requests that waited on the lock while it was running
+receive the published reports in their own session directory rather than recomputing them.
+
+Key directories idle beyond the retention period are removed by a cleanup run by at most
+one request per cleanup interval.  A key directory is only removed while its lock is held,
+and a request that acquires the lock of a removed directory retries on the new one.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from oslo_concurrency import lockutils
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+
+class ContentRequestCoalescer(object):
+    """
+    Single-flight execution of identical content requests across consumer instances.
+
+    """
+
+    def __init__(self, coalescePath=None, retainSeconds=None, cleanupInterval=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        #
+        self.__path = coalescePath if coalescePath else self.__cI.get("SITE_WS_CONTENT_COALESCE_PATH")
+        if not self.__path:
+            topSessionPath = self.__cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+            if topSessionPath:
+                self.__path = os.path.join(topSessionPath, "ws-cache", "inflight")
+        # Published results of keys idle for longer than this are removed
+        self.__retainSeconds = float(retainSeconds if retainSeconds is not None else self.__cI.get("SITE_WS_CONTENT_COALESCE_RETAIN_SECONDS", 86400))
+        self.__cleanupInterval = float(cleanupInterval if cleanupInterval is not None else self.__cI.get("SITE_WS_CONTENT_COALESCE_CLEANUP_INTERVAL", 3600))
+        self.__enabled = self.__setup()
+
+    def __setup(self):
+        if not self.__path:
+            return False
+        try:
+            if not os.path.isdir(self.__path):
+                os.makedirs(self.__path)
+            return os.access(self.__path, os.W_OK)
+        except Exception as e:
+            logger.exception("Cannot use request coalescing path %r %s", self.__path, str(e))
+        return False
+
+    def isEnabled(self):
+        return self.__enabled
+
+    def getKey(self, pD):
+        """Return the key identifying the output of the input request payload."""
+        kL = [
+            pD.get("request_dataset_id"),
+            pD.get("request_content_type_list", [pD.get("request_content_type")]),
+            pD.get("request_format_type"),
+            pD.get("query_site"),
+            pD.get("session_proxy_url"),
+        ]
+        return hashlib.sha256(json.dumps(kL).encode("utf-8")).hexdigest()
+
+    def run(self, pD, runFunc):
+        """Run runFunc() to create the reports in pD["report_path_list"] (or pD["report_path"]) unless an
+        identical request completes while this request is waiting -
+
+        Returns: the status of runFunc() or True if the reports of a coalesced request were served
+        """
+        if not self.__enabled:
+            return runFunc()
+        key = self.getKey(pD)
+        keyPath = os.path.join(self.__path, key)
+        reportPathList = pD.get("report_path_list", [pD.get("report_path")])
+        startTime = time.time()
+        try:
+            if not os.path.isdir(keyPath):
+                os.makedirs(keyPath)
+        except OSError:
+            pass
+        while True:
+            with lockutils.lock("wscoalesce." + key, external=True, lock_path=keyPath) as lck:
+                if not self.__isCurrent(lck):
+                    logger.debug("Key directory %r removed while waiting -  retrying", keyPath)
+                    continue
+                self.__touch(keyPath)
+                if self.__fetch(keyPath, startTime, reportPathList):
+                    logger.info("Served coalesced result for %r %r after (%.2f seconds)", pD.get("request_dataset_id"), pD.get("request_content_type"), time.time() - startTime)
+                    return True
+                ok = runFunc()
+                if ok:
+                    self.__publish(keyPath, reportPathList)
+                break
+        if self.__isCleanupDue():
+            self.__cleanup()
+        return ok
+
+    def __isCurrent(self, lck):
+        """Return True if the input held lock is on the lock file currently in the key directory."""
+        lockFile = getattr(lck, "lockfile", None)
+        if lockFile is None:
+            # Process locking disabled
+            return True
+        try:
+            return os.path.samestat(os.fstat(lockFile.fileno()), os.stat(lck.path))
+        except OSError:
+            return False
+
+    def __touch(self, fp):
+        try:
+            os.utime(fp, None)
+        except OSError:
+            pass
+
+    def __fetch(self, keyPath, startTime, reportPathList):
+        """Link the published results into reportPathList if they were completed after startTime."""
+        manifestPath = os.path.join(keyPath, "manifest.json")
+        try:
+            with open(manifestPath, "r") as ifh:
+                mD = json.load(ifh)
+            if mD["completed"] < startTime or len(mD["files"]) != len(reportPathList):
+                return False
+            for fn, dstPath in zip(mD["files"], reportPathList):
+                self.__linkOrCopy(os.path.join(keyPath, fn), dstPath)
+            return True
+        except (IOError, OSError, ValueError, KeyError):
+            pass
+        return False
+
+    def __publish(self, keyPath, reportPathList):
+        try:
+            fL = []
+            for ii, srcPath in enumerate(reportPathList):
+                fn = "report-%d" % ii
+                tmpPath = os.path.join(keyPath, fn + ".tmp")
+                self.__linkOrCopy(srcPath, tmpPath)
+                os.replace(tmpPath, os.path.join(keyPath, fn))
+                fL.append(fn)
+            fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=keyPath)
+            with os.fdopen(fd, "w") as ofh:
+                json.dump({"completed": time.time(), "files": fL}, ofh)
+            os.replace(tmpPath, os.path.join(keyPath, "manifest.json"))
+        except Exception as e:
+            logger.exception("Failed publishing result in %r %s", keyPath, str(e))
+
+    def __isCleanupDue(self):
+        """Return True and claim the cleanup if no request has started one within the cleanup interval."""
+        stampPath = os.path.join(self.__path, "cleanup.stamp")
+        try:
+            if time.time() - os.stat(stampPath).st_mtime < self.__cleanupInterval:
+                return False
+            self.__touch(stampPath)
+        except OSError:
+            try:
+                open(stampPath, "a").close()
+            except OSError:
+                return False
+        return True
+
+    def __isIdle(self, keyPath):
+        try:
+            return os.path.isdir(keyPath) and time.time() - os.stat(keyPath).st_mtime > self.__retainSeconds
+        except OSError:
+            return False
+
+    def __cleanup(self):
+        """Remove the published results of keys idle beyond the retention period -  keys in use are skipped."""
+        try:
+            keyList = os.listdir(self.__path)
+        except OSError:
+            return
+        nRemoved = 0
+        for key in keyList:
+            keyPath = os.path.join(self.__path, key)
+            if not self.__isIdle(keyPath):
+                continue
+            try:
+                with lockutils.lock("wscoalesce." + key, external=True, lock_path=keyPath, do_log=False, blocking=False):
+                    # The key may have been used since it was listed
+                    if self.__isIdle(keyPath):
+                        shutil.rmtree(keyPath, ignore_errors=True)
+                        nRemoved += 1
+            except (lockutils.AcquireLockFailedException, OSError):
+                pass
+        logger.debug("Removed %d idle coalescing keys", nRemoved)
+
+    def __linkOrCopy(self, srcPath, dstPath):
+        if os.access(dstPath, os.F_OK):
+            os.remove(dstPath)
+        try:
+            os.link(srcPath, dstPath)
+        except OSError:
+            shutil.copyfile(srcPath, dstPath)
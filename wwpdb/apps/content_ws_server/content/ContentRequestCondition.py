@@ -0,0 +1,128 @@
+##
+# File:  ContentRequestCondition.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Compiled attribute value conditions for content type definitions -
+
+A condition in a content definition has the form  {attribute: (value, type, operator)}
+where type is one of char|int|float and operator is one of eq|ne|gt|ge|lt|le|like|in.
+Each condition is compiled once into a predicate on a single (string) attribute value and
+into the equivalent SQL condition terms for database content.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import logging
+import operator
+import re
+
+#
+logger = logging.getLogger()
+
+_TYPES = {"char": str, "string": str, "int": int, "integer": int, "float": float, "double": float}
+_OPS = {"eq": operator.eq, "ne": operator.ne, "gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le}
+
+
+class ContentRequestCondition(object):
+    """
+    A compiled condition on one attribute -  instances are called with an attribute value
+    and return True if the value satisfies the condition.
+
+    """
+
+    def __init__(self, attributeName, value, vType, op):
+        self.__attributeName = str(attributeName)
+        self.__vType = str(vType).lower()
+        self.__op = str(op).lower()
+        if self.__vType not in _TYPES:
+            raise ValueError("Unsupported condition type %r for %r" % (vType, attributeName))
+        self.__cast = _TYPES[self.__vType]
+        #
+        if self.__op == "in":
+            vL = value if isinstance(value, (list, tuple)) else str(value).split(",")
+            self.__target = [self.__cast(str(v).strip()) for v in vL]
+        elif self.__op == "like":
+            if self.__cast is not str:
+                raise ValueError("Operator like requires a char type for %r" % attributeName)
+            self.__target = str(value)
+        elif self.__op in _OPS:
+            self.__target = self.__cast(str(value))
+        else:
+            raise ValueError("Unsupported condition operator %r for %r" % (op, attributeName))
+        #
+        self.__pred = self.__compile()
+
+    def __compile(self):
+        cast = self.__cast
+        target = self.__target
+        if self.__op == "like":
+            # SQL LIKE pattern - case insensitive as for the default database collation
+            rS = "".join([".*" if c == "%" else "." if c == "_" else re.escape(c) for c in target])
+            match = re.compile(rS, re.IGNORECASE | re.DOTALL).fullmatch
+            return lambda v: v is not None and match(str(v)) is not None
+        if self.__op == "in":
+            tS = frozenset(target)
+            if cast is str:
+                return lambda v: v in tS
+            return self.__guard(lambda v: cast(v) in tS)
+        opFn = _OPS[self.__op]
+        if cast is str:
+            return lambda v: v is not None and opFn(v, target)
+        return self.__guard(lambda v: opFn(cast(v), target))
+
+    def __guard(self, fn):
+        """Values that cannot be cast (e.g. mmCIF '?' and '.') never satisfy a numeric condition."""
+
+        def pred(v):
+            try:
+                return fn(v)
+            except (TypeError, ValueError):
+                return False
+
+        return pred
+
+    def __call__(self, v):
+        return self.__pred(v)
+
+    def getAttributeName(self):
+        return self.__attributeName
+
+    def getPredicate(self):
+        """Return the predicate as a plain function of the attribute value."""
+        return self.__pred
+
+    def addSqlCondition(self, sqlCondition, tableId):
+        """Add this condition to the input MyDbConditionSqlGen object for the input table -"""
+        lhsTuple = (tableId.upper(), self.__attributeName.upper())
+        sqlType = "CHAR" if self.__cast is str else "OTHER"
+        if self.__op == "in":
+            cDefList = [("OR", lhsTuple, "EQ", (v, sqlType)) for v in self.__target]
+            sqlCondition.addGroupValueConditionList(cDefList, preOp="AND")
+        else:
+            sqlCondition.addValueCondition(lhsTuple, self.__op.upper(), (self.__target, sqlType))
+
+    def __repr__(self):
+        return "ContentRequestCondition(%r, %r, %r, %r)" % (self.__attributeName, self.__target, self.__vType, self.__op)
+
+
+def compileConditions(conditionD):
+    """Compile the conditions  {categoryName: {attribute: (value, type, operator), ...}, ...}  of a content definition.
+
+    Returns: d[categoryName] = {attribute: ContentRequestCondition, ...}
+
+    Raises ValueError for an unsupported condition.
+    """
+    rD = {}
+    for catName, cndD in conditionD.items():
+        rD[str(catName)] = {}
+        for attributeName, cTup in cndD.items():
+            value, vType, op = cTup
+            rD[str(catName)][str(attributeName)] = ContentRequestCondition(attributeName, value, vType, op)
+    return rD
@@ -0,0 +1,228 @@
+##
+# File:  ContentRequestDbPool.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#     18-Oct-2026  ep  check only connections idle longer than the check interval -
+#     18-Oct-2026  ep  check and close idle connections outside of the pool lock
+##
+"""
+Per-process pool of database connections for summary content reports -
+
+Open connections are kept per resource name (e.g. DA_INTERNAL, STATUS) and are reused
+by consecutive queries and consecutive requests handled by the same process.  Connections
+idle for longer than a check interval are checked before reuse and connections are closed
+after an idle timeout.  Checks and closes run outside of the pool lock so a slow server
+does not block other checkouts.  The number of connections per resource is bounded.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import contextlib
+import logging
+import os
+import threading
+import time
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+_poolD = {}
+_poolLock = threading.Lock()
+
+
+class ContentRequestDbPool(object):
+    """
+    Bounded pool of open database connections keyed by resource name.
+
+    Pooled items are connection holders with the MyConnectionBase methods openConnection(),
+    getConnection() and closeConnection().  The default factory creates a MyConnectionBase
+    for the resource -  other factories (e.g. for tests) are called with the resource name.
+
+    """
+
+    def __init__(self, siteId=None, maxSize=None, idleTimeout=None, waitTimeout=None, checkInterval=None, connectionFactory=None):
+        self.__siteId = siteId if siteId else getSiteId(defaultSiteId=None)
+        cI = ConfigInfo(self.__siteId)
+        self.__maxSize = int(maxSize if maxSize is not None else cI.get("SITE_WS_CONTENT_DB_POOL_MAX_SIZE", 4))
+        self.__idleTimeout = float(idleTimeout if idleTimeout is not None else cI.get("SITE_WS_CONTENT_DB_POOL_IDLE_TIMEOUT", 300))
+        self.__waitTimeout = float(waitTimeout if waitTimeout is not None else cI.get("SITE_WS_CONTENT_DB_POOL_WAIT_TIMEOUT", 30))
+        self.__checkInterval = float(checkInterval if checkInterval is not None else cI.get("SITE_WS_CONTENT_DB_POOL_CHECK_INTERVAL", 5))
+        self.__factory = connectionFactory if connectionFactory else self.__openResource
+        #
+        self.__cond = threading.Condition()
+        # d[resourceName] = [(holder, lastUsedTime), ...]  and  d[resourceName] = number of open connections
+        self.__idleD = {}
+        self.__openCountD = {}
+        self.__statD = {"opened": 0, "reused": 0, "closed": 0, "failed_checks": 0}
+        self.__pid = os.getpid()
+
+    def __openResource(self, resourceName):
+        # Imported on first use -  the database client library is only required for database content
+        from wwpdb.utils.db.MyConnectionBase import MyConnectionBase  # pylint: disable=import-outside-toplevel
+
+        holder = MyConnectionBase(siteId=self.__siteId, verbose=False)
+        holder.setResource(resourceName=resourceName)
+        return holder if holder.openConnection() else None
+
+    def getStats(self):
+        """Return counts of connections opened, reused, closed and failing health checks."""
+        with self.__cond:
+            return dict(self.__statD)
+
+    def getOpenCount(self, resourceName):
+        with self.__cond:
+            return self.__openCountD.get(resourceName, 0)
+
+    @contextlib.contextmanager
+    def connection(self, resourceName):
+        """Context manager providing a DB-API connection for the input resource -
+
+        The connection is returned to the pool on exit or closed if the block raises.
+        """
+        holder = self.checkout(resourceName)
+        ok = False
+        try:
+            yield holder.getConnection()
+            ok = True
+        finally:
+            self.checkin(resourceName, holder, healthy=ok)
+
+    def checkout(self, resourceName):
+        """Return an open connection holder for the input resource -
+
+        Raises RuntimeError if no connection can be obtained within the wait timeout.
+        """
+        self.__checkFork()
+        deadline = time.time() + self.__waitTimeout
+        while True:
+            idle, expiredL, reserved = self.__reserve(resourceName, deadline)
+            # Connections removed from the pool keep their slot until they are closed
+            for holder in expiredL:
+                self.__close(holder)
+                self.__release(resourceName)
+            if reserved:
+                break
+            if idle is None:
+                continue
+            holder, lastUsed = idle
+            if time.time() - lastUsed <= self.__checkInterval or self.__isHealthy(holder):
+                with self.__cond:
+                    self.__statD["reused"] += 1
+                return holder
+            with self.__cond:
+                self.__statD["failed_checks"] += 1
+            self.__close(holder)
+            self.__release(resourceName)
+        #
+        holder = None
+        try:
+            holder = self.__factory(resourceName)
+        finally:
+            if holder is None:
+                self.__release(resourceName)
+        if holder is None:
+            raise RuntimeError("Cannot open database connection for resource %r" % resourceName)
+        with self.__cond:
+            self.__statD["opened"] += 1
+        return holder
+
+    def checkin(self, resourceName, holder, healthy=True):
+        """Return the input connection holder to the pool (or close it if it is not healthy)."""
+        if not healthy or os.getpid() != self.__pid:
+            self.__close(holder)
+            self.__release(resourceName)
+            return
+        with self.__cond:
+            self.__idleD.setdefault(resourceName, []).append((holder, time.time()))
+            self.__cond.notify()
+
+    def clear(self):
+        """Close all idle connections."""
+        with self.__cond:
+            idleD, self.__idleD = self.__idleD, {}
+        for resourceName, idleL in idleD.items():
+            for holder, _t in idleL:
+                self.__close(holder)
+                self.__release(resourceName)
+
+    def __reserve(self, resourceName, deadline):
+        """Take an idle holder or reserve a slot for a new connection, waiting until the deadline -
+
+        Returns: (holder, lastUsedTime) of the most recently used idle holder or None, the list of holders
+                 idle beyond the timeout (to be closed by the caller), and True if a slot was reserved
+        """
+        with self.__cond:
+            while True:
+                idleL = self.__idleD.get(resourceName, [])
+                now = time.time()
+                # Idle holders are in order of last use
+                expiredL = []
+                while idleL and now - idleL[0][1] > self.__idleTimeout:
+                    expiredL.append(idleL.pop(0)[0])
+                if idleL:
+                    return idleL.pop(), expiredL, False
+                if expiredL:
+                    return None, expiredL, False
+                if self.__openCountD.get(resourceName, 0) < self.__maxSize:
+                    # Reserve the slot while connecting outside of the lock
+                    self.__openCountD[resourceName] = self.__openCountD.get(resourceName, 0) + 1
+                    return None, [], True
+                remaining = deadline - now
+                if remaining <= 0:
+                    raise RuntimeError("No database connection available for resource %r" % resourceName)
+                self.__cond.wait(remaining)
+
+    def __isHealthy(self, holder):
+        try:
+            dbCon = holder.getConnection()
+            if dbCon is None:
+                return False
+            curs = dbCon.cursor()
+            try:
+                curs.execute("SELECT 1")
+                curs.fetchall()
+            finally:
+                curs.close()
+            return True
+        except Exception as e:
+            logger.info("Discarding pooled connection failing check %s", str(e))
+        return False
+
+    def __close(self, holder):
+        try:
+            holder.closeConnection()
+        except Exception as e:
+            logger.debug("Closing pooled connection failing %s", str(e))
+        with self.__cond:
+            self.__statD["closed"] += 1
+
+    def __release(self, resourceName):
+        with self.__cond:
+            self.__openCountD[resourceName] = max(0, self.__openCountD.get(resourceName, 0) - 1)
+            self.__cond.notify()
+
+    def __checkFork(self):
+        """Connections inherited from a parent process are dropped without being closed."""
+        if os.getpid() == self.__pid:
+            return
+        with self.__cond:
+            if os.getpid() != self.__pid:
+                self.__idleD = {}
+                self.__openCountD = {}
+                self.__pid = os.getpid()
+
+
+def getDbPool(siteId=None):
+    """Return the per-process connection pool for the input site."""
+    key = siteId if siteId else getSiteId(defaultSiteId=None)
+    with _poolLock:
+        if key not in _poolD:
+            _poolD[key] = ContentRequestDbPool(siteId=key)
+        return _poolD[key]
@@ -0,0 +1,104 @@
+##
+# File:  ContentRequestJsonSerializer.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+JSON serialization backends for content reports -
+
+The orjson or ujson packages are used when installed, falling back to the standard library
+json module.  The backend is selected by SITE_WS_CONTENT_JSON_BACKEND (auto, orjson, ujson
+or json).  Values are serialized to UTF-8 bytes so that they can be written directly to a
+binary (or compressed) report stream.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+logger = logging.getLogger()
+
+# Backends in order of preference
+_backendL = ["orjson", "ujson", "json"]
+
+
+def getBackendNames():
+    """Return the names of the installed serialization backends in order of preference."""
+    installedD = {"orjson": orjson is not None, "ujson": ujson is not None, "json": True}
+    return [name for name in _backendL if installedD[name]]
+
+
+class ContentRequestJsonSerializer(object):
+    """
+    Serialize values to JSON with the selected backend.
+
+    The separators written between the items of a report (itemSeparator) and between a category
+    name and its rows (keySeparator) follow the spacing of the backend, so a report assembled
+    from serialized rows is identical to serializing the complete report with the same backend.
+
+    """
+
+    def __init__(self, backend=None):
+        if backend is None:
+            cI = ConfigInfo(getSiteId(defaultSiteId=None))
+            backend = cI.get("SITE_WS_CONTENT_JSON_BACKEND", "auto")
+        installedL = getBackendNames()
+        if backend not in installedL:
+            if backend != "auto":
+                logger.warning("JSON backend %r is not available using %r", backend, installedL[0])
+            backend = installedL[0]
+        self.__backend = backend
+        #
+        if backend == "orjson":
+            self.__dumps = orjson.dumps
+        elif backend == "ujson":
+            self.__dumps = self.__ujsonDumps
+        else:
+            self.__dumps = self.__jsonDumps
+        if backend == "json":
+            self.itemSeparator = b", "
+            self.keySeparator = b": "
+        else:
+            self.itemSeparator = b","
+            self.keySeparator = b":"
+
+    def getName(self):
+        return self.__backend
+
+    def dumps(self, obj):
+        """Return the JSON serialization of obj as UTF-8 bytes."""
+        try:
+            return self.__dumps(obj)
+        except (TypeError, OverflowError):
+            # Values outside of the types handled by the faster backends (e.g. integers above 64 bits)
+            if self.__backend == "json":
+                raise
+            return self.__jsonDumps(obj)
+
+    def dump(self, obj, fb):
+        """Write the JSON serialization of obj to the binary stream fb."""
+        fb.write(self.dumps(obj))
+
+    def __jsonDumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def __ujsonDumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
@@ -0,0 +1,188 @@
+##
+# File:  ContentRequestModelCache.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Cache of the archive model file location and the site of each dataset -
+
+The latest archive model file path of a dataset is cached with its version, its modification
+time and the modification time of the archive directory.  A new (or removed) model file version
+changes the directory modification time and invalidates the entry, so a cached location costs a
+single stat() of the archive directory rather than a directory scan.  Datasets without an archive
+model file are cached in the same way.
+
+Entries are held in the process and, if SITE_WS_CONTENT_MODEL_CACHE_PATH is set, in JSON files
+in that directory shared by the consumer instances on a host.  The site of each dataset (which
+changes only if a dataset is relocated) is cached in the process for SITE_WS_CONTENT_SITE_CACHE_SECONDS.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+# Process level entries shared by all instances
+_lock = threading.Lock()
+_modelD = OrderedDict()
+_siteD = OrderedDict()
+_statsD = {"hits": 0, "misses": 0, "invalidated": 0}
+
+
+def getDirModificationTime(dirPath):
+    """Return the modification time (ns) of the directory or None if it does not exist."""
+    try:
+        return os.stat(dirPath).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+class ContentRequestModelCache(object):
+    """
+    Manage the process level (and optionally shared) cache of archive model file locations.
+
+    """
+
+    def __init__(self, cachePath=None, maxEntries=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        #
+        self.__cachePath = cachePath if cachePath else self.__cI.get("SITE_WS_CONTENT_MODEL_CACHE_PATH")
+        # Max number of datasets held in the process
+        self.__maxEntries = int(maxEntries if maxEntries is not None else self.__cI.get("SITE_WS_CONTENT_MODEL_CACHE_MAX_ENTRIES", 50000))
+        # Lifetime (seconds) of the dataset site lookups
+        self.__siteSeconds = float(self.__cI.get("SITE_WS_CONTENT_SITE_CACHE_SECONDS", 3600))
+        self.__shared = self.__setup()
+
+    def __setup(self):
+        if not self.__cachePath:
+            return False
+        try:
+            if not os.path.isdir(self.__cachePath):
+                os.makedirs(self.__cachePath)
+            return os.access(self.__cachePath, os.W_OK)
+        except Exception as e:
+            logger.exception("Cannot use model cache path %r %s", self.__cachePath, str(e))
+        return False
+
+    def isShared(self):
+        return self.__shared
+
+    def getStats(self):
+        with _lock:
+            return dict(_statsD)
+
+    def clear(self):
+        """Remove the entries held in the process."""
+        with _lock:
+            _modelD.clear()
+            _siteD.clear()
+            _statsD.update({"hits": 0, "misses": 0, "invalidated": 0})
+
+    def getSiteId(self, dataSetId, lookupFunc):
+        """Return the site of the dataset from lookupFunc(dataSetId) or the cache."""
+        now = time.time()
+        with _lock:
+            if dataSetId in _siteD and _siteD[dataSetId][1] > now:
+                _siteD.move_to_end(dataSetId)
+                return _siteD[dataSetId][0]
+        siteId = lookupFunc(dataSetId)
+        with _lock:
+            _siteD[dataSetId] = (siteId, now + self.__siteSeconds)
+            _siteD.move_to_end(dataSetId)
+            self.__trim(_siteD)
+        return siteId
+
+    def get(self, siteId, dataSetId):
+        """Return the valid cache entry for the dataset or None -
+
+        Entry: d = {"path": latest archive model path or None, "version", "mtime", "dir_path", "dir_mtime"}
+        """
+        key = self.__getKey(siteId, dataSetId)
+        with _lock:
+            eD = _modelD.get(key)
+        if eD is None and self.__shared:
+            eD = self.__read(key)
+        if eD is None:
+            with _lock:
+                _statsD["misses"] += 1
+            return None
+        if getDirModificationTime(eD["dir_path"]) != eD["dir_mtime"]:
+            with _lock:
+                _modelD.pop(key, None)
+                _statsD["invalidated"] += 1
+                _statsD["misses"] += 1
+            return None
+        with _lock:
+            _modelD[key] = eD
+            _modelD.move_to_end(key)
+            self.__trim(_modelD)
+            _statsD["hits"] += 1
+        return eD
+
+    def set(self, siteId, dataSetId, dirPath, dirMtime, filePath):
+        """Store the archive model file path (or None) found in dirPath -
+
+        dirMtime is the directory modification time read before the directory was scanned.
+        """
+        eD = {"path": filePath, "version": None, "mtime": None, "dir_path": dirPath, "dir_mtime": dirMtime}
+        if filePath:
+            mt = re.search(r"\.V(\d+)", os.path.basename(filePath))
+            eD["version"] = int(mt.group(1)) if mt else None
+            try:
+                eD["mtime"] = os.stat(filePath).st_mtime
+            except OSError:
+                return None
+        key = self.__getKey(siteId, dataSetId)
+        with _lock:
+            _modelD[key] = eD
+            _modelD.move_to_end(key)
+            self.__trim(_modelD)
+        if self.__shared:
+            self.__write(key, eD)
+        return eD
+
+    def __getKey(self, siteId, dataSetId):
+        return "%s-%s" % (siteId, dataSetId)
+
+    def __trim(self, dD):
+        while len(dD) > self.__maxEntries:
+            dD.popitem(last=False)
+
+    def __read(self, key):
+        try:
+            with open(os.path.join(self.__cachePath, key + ".json"), "r") as ifh:
+                return json.load(ifh)
+        except (IOError, OSError, ValueError):
+            pass
+        return None
+
+    def __write(self, key, eD):
+        tmpPath = None
+        try:
+            fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=self.__cachePath)
+            with os.fdopen(fd, "w") as ofh:
+                json.dump(eD, ofh)
+            os.replace(tmpPath, os.path.join(self.__cachePath, key + ".json"))
+            tmpPath = None
+        except Exception as e:
+            logger.exception("Failed writing model cache entry %r %s", key, str(e))
+        finally:
+            if tmpPath and os.access(tmpPath, os.F_OK):
+                os.remove(tmpPath)
@@ -0,0 +1,185 @@
+##
+# File:  ContentRequestModelLocator.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  cache archive model file locations and dataset sites
+#   18-Oct-2026 ep  run the generate script with SubprocessRunner
+##
+"""
+Locate the model file of an entry content request in the content request consumer -
+
+The latest archive model file (or its gzip compressed form) is read in place.  For datasets
+without an archive model file the model is generated by the deposition system in the session
+directory and, failing that, the latest deposit model file is read in place.
+
+Archive model file locations and dataset sites are cached by ContentRequestModelCache so
+repeated requests for a dataset do not scan the archive directory.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import logging
+import os
+
+from wwpdb.io.locator.PathInfo import PathInfo
+from wwpdb.utils.config.ConfigInfo import getSiteId
+from wwpdb.utils.config.ConfigInfoDataSet import ConfigInfoDataSet
+
+from wwpdb.apps.content_ws_server.content.ContentRequestModelCache import ContentRequestModelCache, getDirModificationTime
+from wwpdb.apps.content_ws_server.service.ModelGenerateService import ModelGenerateClient
+from wwpdb.apps.content_ws_server.service.SubprocessRunner import SubprocessRunner
+
+logger = logging.getLogger()
+
+
+class ContentRequestModelLocator(object):
+    """
+    Return the model file path for a dataset to be read by the content request.
+
+    """
+
+    def __init__(self, sessionPath, siteId=None):
+        self.__sessionPath = sessionPath
+        # Site holding the datasets  -  looked up for each dataset if not provided
+        self.__siteId = siteId
+        self.__mySiteId = getSiteId(defaultSiteId=None)
+        # Timeout (seconds) for DepUI model generation
+        self.__generateTimeout = 30
+        self.__mc = ContentRequestModelCache()
+
+    def getDataSetSiteId(self, dataSetId):
+        """Return the site holding the input dataset."""
+        if self.__siteId:
+            return self.__siteId
+        siteId = self.__mc.getSiteId(dataSetId, self.__lookupSiteId)
+        # On development server
+        if siteId == "UNASSIGNED":
+            siteId = self.__mySiteId
+        return siteId
+
+    def __lookupSiteId(self, dataSetId):
+        return ConfigInfoDataSet().getSiteId(dataSetId)
+
+    def getModelFilePath(self, dataSetId, generateModel=True):
+        """Return the model file path for the dataset or None -
+
+        The archive model file is used first, then a model generated by DepUI in the session
+        directory (if generateModel) and last the deposit model file.
+        """
+        # Sanity check
+        if not dataSetId or len(dataSetId) > 30 or os.sep in dataSetId:
+            return None
+        pdbxFilePath = None
+        try:
+            siteId = self.getDataSetSiteId(dataSetId)
+            logger.debug("Locating model for %r on site %r", dataSetId, siteId)
+            pdbxFilePath = self.__getArchiveModelFilePath(siteId, dataSetId)
+            if not pdbxFilePath and generateModel:
+                pdbxFilePath = self.__depuiGenerateModelFile(siteId, dataSetId)
+            # Fallback on deposit directory
+            if not pdbxFilePath:
+                pdbxFilePath = self.__getModelFilePath(siteId, dataSetId, "deposit")
+        except Exception as e:
+            logger.exception("Locate model failing for %r %s", dataSetId, str(e))
+        return pdbxFilePath
+
+    def getBytesCopied(self, pdbxFilePath):
+        """Return the size of the model file if it was created in the session rather than read in place."""
+        try:
+            if pdbxFilePath and os.path.abspath(pdbxFilePath).startswith(os.path.abspath(self.__sessionPath) + os.sep):
+                return os.path.getsize(pdbxFilePath)
+        except OSError:
+            pass
+        return 0
+
+    def __getArchiveModelFilePath(self, siteId, dataSetId):
+        """Return the latest archive model file path from the cache or from a scan of the archive directory."""
+        eD = self.__mc.get(siteId, dataSetId)
+        if eD is not None:
+            return eD["path"]
+        dirPath = None
+        try:
+            pI = PathInfo(siteId=siteId, sessionPath=self.__sessionPath, verbose=True)
+            dirPath = pI.getDirPath(dataSetId=dataSetId, fileSource="archive")
+        except Exception as e:
+            logger.exception("Archive path lookup failing for %r %s", dataSetId, str(e))
+        # Read before the scan so that a model file added meanwhile invalidates the entry
+        dirMtime = getDirModificationTime(dirPath)
+        pdbxFilePath = self.__getModelFilePath(siteId, dataSetId, "archive")
+        if dirPath:
+            self.__mc.set(siteId, dataSetId, dirPath, dirMtime, pdbxFilePath)
+        return pdbxFilePath
+
+    def __getModelFilePath(self, siteId, dataSetId, fileSource):
+        """Return the path of the latest model file (or its gzip compressed form) in the input file source
+        or None if it is not readable.
+        """
+        try:
+            pI = PathInfo(siteId=siteId, sessionPath=self.__sessionPath, verbose=True)
+            fp = pI.getModelPdbxFilePath(dataSetId=dataSetId, fileSource=fileSource, versionId="latest")
+            if not fp:
+                return None
+            for tp in [fp, fp + ".gz"]:
+                if os.access(tp, os.R_OK):
+                    return tp
+        except Exception as e:
+            logger.exception("Model path lookup failing for %r %r %s", dataSetId, fileSource, str(e))
+        return None
+
+    def __depuiGenerateModelFile(self, siteId, dataSetId):
+        """Uses code in the deposition system to generate a model file in the session directory.
+        returns path to filename or None if it fails
+        """
+        logger.debug("generate %r from depui", dataSetId)
+        sessDir = self.__sessionPath
+
+        # The model generation server has Django initialized  -  otherwise run the generate script
+        status = ModelGenerateClient().generate(siteId, dataSetId, sessDir, timeout=self.__generateTimeout)
+        logger.debug("response from model generate server %r", status)
+        if status in [None, "unsupported"]:
+            retCode = self.__depuiGenerateModelScript(siteId, dataSetId, sessDir)
+        else:
+            retCode = 0 if status == "ok" else None
+
+        logger.debug("response from depui %r", retCode)
+        if retCode != 0:
+            return None
+        pI = PathInfo(siteId=self.__mySiteId, sessionPath=sessDir, verbose=True)
+        pdbxFilePath = pI.getModelPdbxFilePath(dataSetId=dataSetId, fileSource="session")
+        # DepUI can generate file even if deposition non-existant!! Make sure minimal size....
+        if pdbxFilePath and os.access(pdbxFilePath, os.R_OK):
+            statinfo = os.stat(pdbxFilePath)
+            if statinfo.st_size > 100:
+                return pdbxFilePath
+
+        return None
+
+    def __depuiGenerateModelScript(self, siteId, dataSetId, sessDir):
+        """Generate the model file with a script run in a new Python process  -  returns the script return code"""
+        # Create script to run. Django will need WWPDB_SITE_ID set before invoking
+        cmdPy = os.path.join(sessDir, "generate.py")
+        with open(cmdPy, "w") as fOut:
+            fOut.write("#!/usr/bin/env python\n")
+            fOut.write("import os, sys\n")
+            # Setup the Django environment
+            fOut.write('os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wwpdb.apps.deposit.settings")\n')
+            fOut.write("import django\n")
+            fOut.write("django.setup()\n")
+            fOut.write("from wwpdb.apps.deposit.depui.generate_model import generate_model\n")
+            fOut.write('generate_model(depID="%s", sessionDir = "%s").write_out_cif_from_depui()' % (dataSetId, sessDir))
+        cmdfile = os.path.join(sessDir, "generate.sh")
+        with open(cmdfile, "w") as fOut:
+            fOut.write("#!/bin/sh\n")
+            fOut.write("export WWPDB_SITE_ID=%s\n" % siteId)
+            fOut.write("export PYTHONPATH=$TOP_WWPDB_PYTHON_DIR/wwpdb/apps/deposit:$PYTHONPATH\n")
+            fOut.write("python %s\n" % cmdPy)
+        os.chmod(cmdfile, 0o777)
+
+        logfile = os.path.join(sessDir, "generate.log")
+
+        return SubprocessRunner(timeout=self.__generateTimeout, logPath=logfile).run(cmdfile)
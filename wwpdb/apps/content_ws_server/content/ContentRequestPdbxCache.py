@@ -0,0 +1,187 @@
+##
+# File:  ContentRequestPdbxCache.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Shared on-disk cache of data categories read from PDBx model files -
+
+Entries are keyed by (model file path, modification time, size, category selection) and
+are stored as JSON files in a cache directory that may be shared by the consumer instances
+on a host.  Entries are written atomically and the cache is held within a size bound by
+evicting the least recently used entries.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from mmcif.api.DataCategory import DataCategory
+from mmcif.api.PdbxContainers import DataContainer
+from oslo_concurrency import lockutils
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+
+class ContentRequestPdbxCache(object):
+    """
+    Manage a size bounded on-disk cache of data categories read from PDBx files.
+
+    """
+
+    def __init__(self, cachePath=None, maxBytes=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        #
+        self.__cachePath = cachePath if cachePath else self.__cI.get("SITE_WS_CONTENT_PDBX_CACHE_PATH")
+        if not self.__cachePath:
+            topSessionPath = self.__cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+            if topSessionPath:
+                self.__cachePath = os.path.join(topSessionPath, "ws-cache", "pdbx")
+        #
+        if maxBytes is None:
+            maxBytes = self.__cI.get("SITE_WS_CONTENT_PDBX_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+        self.__maxBytes = int(maxBytes)
+        self.__lockName = "wspdbxcache.evict-lock"
+        self.__enabled = self.__setup()
+
+    def __setup(self):
+        if not self.__cachePath or self.__maxBytes <= 0:
+            return False
+        try:
+            if not os.path.isdir(self.__cachePath):
+                os.makedirs(self.__cachePath)
+            return os.access(self.__cachePath, os.W_OK)
+        except Exception as e:
+            logger.exception("Cannot use PDBx cache path %r %s", self.__cachePath, str(e))
+        return False
+
+    def isEnabled(self):
+        return self.__enabled
+
+    def getKey(self, filePath, catNameList=None):
+        """Return the cache key for the selected categories of the input file or None if the file is unreadable."""
+        try:
+            st = os.stat(str(filePath))
+        except OSError:
+            return None
+        catL = sorted(set(catNameList)) if catNameList else []
+        kS = json.dumps([os.path.abspath(str(filePath)), st.st_mtime_ns, st.st_size, catL])
+        return hashlib.sha256(kS.encode("utf-8")).hexdigest()
+
+    def __entryPath(self, key):
+        return os.path.join(self.__cachePath, key + ".json")
+
+    def get(self, key):
+        """Return the cached container list for the input key or None on a cache miss."""
+        if not self.__enabled or not key:
+            return None
+        fp = self.__entryPath(key)
+        try:
+            with open(fp, "r") as infile:
+                cL = json.load(infile)
+            # Update the modification time for LRU eviction
+            os.utime(fp, None)
+            return self.__toContainerList(cL)
+        except (IOError, OSError):
+            return None
+        except Exception as e:
+            logger.error("Removing unreadable PDBx cache entry %r %s", fp, str(e))
+            self.__remove(fp)
+        return None
+
+    def set(self, key, containerList):
+        """Store the input container list under the input key -  Returns True for success or False otherwise."""
+        if not self.__enabled or not key or not containerList:
+            return False
+        fp = self.__entryPath(key)
+        tmpPath = None
+        try:
+            fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=self.__cachePath)
+            with os.fdopen(fd, "w") as ofh:
+                json.dump(self.__fromContainerList(containerList), ofh)
+            # Readers in other processes see either the complete entry or no entry at all
+            os.replace(tmpPath, fp)
+            tmpPath = None
+            self.__evict()
+            return True
+        except Exception as e:
+            logger.exception("Failed writing PDBx cache entry %r %s", fp, str(e))
+        finally:
+            if tmpPath:
+                self.__remove(tmpPath)
+        return False
+
+    def clear(self):
+        """Remove all cache entries."""
+        if not self.__enabled:
+            return
+        with lockutils.lock(self.__lockName, external=True, lock_path=self.__cachePath):
+            for fp, _mt, _sz in self.__getEntryList():
+                self.__remove(fp)
+
+    def __evict(self):
+        """Remove the least recently used entries until the cache is within its size bound."""
+        with lockutils.lock(self.__lockName, external=True, lock_path=self.__cachePath):
+            eL = self.__getEntryList()
+            total = sum([sz for _fp, _mt, sz in eL])
+            if total <= self.__maxBytes:
+                return
+            for fp, _mt, sz in sorted(eL, key=lambda t: t[1]):
+                if total <= self.__maxBytes:
+                    break
+                if self.__remove(fp):
+                    logger.debug("Evicted PDBx cache entry %r", fp)
+                total -= sz
+
+    def __getEntryList(self):
+        """Return a list of (path, modification time, size) for current cache entries."""
+        eL = []
+        for fn in os.listdir(self.__cachePath):
+            if not fn.endswith(".json"):
+                continue
+            fp = os.path.join(self.__cachePath, fn)
+            try:
+                st = os.stat(fp)
+                eL.append((fp, st.st_mtime, st.st_size))
+            except OSError:
+                # Removed by another instance
+                pass
+        return eL
+
+    def __remove(self, fp):
+        try:
+            os.remove(fp)
+            return True
+        except OSError:
+            return False
+
+    def __fromContainerList(self, containerList):
+        cL = []
+        for container in containerList:
+            catL = []
+            for catName in container.getObjNameList():
+                cObj = container.getObj(catName)
+                catL.append({"name": catName, "attributes": cObj.getAttributeList(), "rows": cObj.getRowList()})
+            cL.append({"name": container.getName(), "categories": catL})
+        return cL
+
+    def __toContainerList(self, cL):
+        containerList = []
+        for cD in cL:
+            container = DataContainer(cD["name"])
+            for catD in cD["categories"]:
+                container.append(DataCategory(catD["name"], attributeNameList=catD["attributes"], rowList=catD["rows"], copyInputData=False))
+            containerList.append(container)
+        return containerList
@@ -0,0 +1,237 @@
+##
+# File:  ContentRequestPdbxStreamReader.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#     18-Oct-2026  ep  read plain files through mmap and gzip compressed files by streaming decompression -
+##
+"""
+Streaming reader for selected categories of large PDBx model files -
+
+The input file is scanned line by line.  Only the text of the selected categories is
+tokenized and materialized, all other categories are skipped without being stored, and
+reading stops as soon as every selected category has been read.  Memory use therefore
+depends on the size of the selected categories and not on the size of the file.
+
+Category boundaries are recognized from data item names, loop_ and data_ keywords at the
+start of a line (outside of semicolon delimited text fields) as in PDBx files written
+by the wwPDB.  Only the first data block is read.
+
+Plain files are memory mapped and gzip compressed files (.gz) are decompressed as they are
+read, so neither is copied nor decompressed to disk.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import gzip
+import logging
+import mmap
+import os
+import re
+
+from mmcif.api.DataCategory import DataCategory
+from mmcif.api.PdbxContainers import DataContainer
+
+#
+logger = logging.getLogger()
+
+# As in mmcif.io.PdbxReader -  (category, attribute, quoted string, unquoted word)
+_mmcifRe = re.compile(
+    r"(?:"
+    r"(?:_(.+?)[.](\S+))"
+    r"|"  # _category.attribute
+    r"(?:['](.*?)(?:[']\s|[']$))"
+    r"|"  # single quoted strings
+    r'(?:["](.*?)(?:["]\s|["]$))'
+    r"|"  # double quoted strings
+    r"(?:\s*#.*$)"
+    r"|"  # comments (dumped)
+    r"(\S+)"  # unquoted words
+    r")"
+)
+
+
+class ContentRequestPdbxStreamReader(object):
+    """
+    Read selected categories from a PDBx file without materializing the rest of the file.
+
+    """
+
+    def __init__(self):
+        self.__bytesScanned = 0
+        self.__linesScanned = 0
+        self.__bytesRead = 0
+
+    def getStats(self):
+        """Return the number of lines and characters scanned and the number of bytes read from the file in the last read."""
+        return {"lines_scanned": self.__linesScanned, "bytes_scanned": self.__bytesScanned, "bytes_read": self.__bytesRead}
+
+    def readFile(self, filePath, catNameList):
+        """Read the selected categories from the first data block of the input (optionally gzip compressed) file -
+
+        Returns: list containing a single DataContainer or an empty list
+        """
+        fp = str(filePath)
+        with open(fp, "rb") as rfh:
+            if fp.endswith(".gz"):
+                with gzip.open(rfh, "rt", encoding="utf-8", errors="ignore") as ifh:
+                    containerList = self.read(ifh, catNameList)
+                    # Compressed bytes consumed (to the read buffer boundary)
+                    self.__bytesRead = rfh.tell()
+                return containerList
+            if os.fstat(rfh.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(rfh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                containerList = self.read(self.__iterLines(mm), catNameList)
+                self.__bytesRead = mm.tell()
+        return containerList
+
+    def __iterLines(self, mm):
+        for line in iter(mm.readline, b""):
+            yield line.decode("utf-8", errors="ignore")
+
+    def read(self, ifh, catNameList):
+        """Read the selected categories from the first data block of the input line iterator -"""
+        self.__bytesScanned = 0
+        self.__linesScanned = 0
+        self.__bytesRead = 0
+        selectD = {c: True for c in catNameList}
+        seenD = {}
+        container = None
+        #
+        # Current section -  category name, loop flag, loop header flag, selected flag, and buffered lines
+        curCat = None
+        isLoop = False
+        inHeader = False
+        selected = False
+        lineL = []
+        inText = False
+        #
+        for line in ifh:
+            self.__linesScanned += 1
+            self.__bytesScanned += len(line)
+            if inText:
+                if line.startswith(";"):
+                    inText = False
+                if selected:
+                    lineL.append(line)
+                continue
+            if line.startswith(";"):
+                inText = True
+                if selected:
+                    lineL.append(line)
+                continue
+            #
+            word = line.lstrip()
+            if not word or word.startswith("#"):
+                continue
+            lWord = word[:7].lower()
+            if word.startswith("_"):
+                catName = word[1:].split(".", 1)[0]
+                if isLoop and inHeader and curCat is None:
+                    curCat = catName
+                    selected = curCat in selectD
+                elif isLoop and inHeader and catName == curCat:
+                    pass
+                elif not isLoop and catName == curCat:
+                    pass
+                else:
+                    # A new key-value category
+                    self.__endSection(container, curCat, isLoop, selected, lineL, seenD)
+                    if self.__isComplete(selectD, seenD):
+                        break
+                    curCat, isLoop, inHeader, lineL = catName, False, False, []
+                    selected = curCat in selectD
+            elif lWord.startswith("loop_"):
+                self.__endSection(container, curCat, isLoop, selected, lineL, seenD)
+                if self.__isComplete(selectD, seenD):
+                    break
+                curCat, isLoop, inHeader, selected, lineL = None, True, True, False, []
+                continue
+            elif lWord.startswith("data_"):
+                self.__endSection(container, curCat, isLoop, selected, lineL, seenD)
+                curCat, isLoop, inHeader, selected, lineL = None, False, False, False, []
+                if container is not None:
+                    break
+                container = DataContainer(word.strip()[5:])
+                continue
+            else:
+                inHeader = False
+            #
+            if selected:
+                lineL.append(line)
+        else:
+            self.__endSection(container, curCat, isLoop, selected, lineL, seenD)
+        #
+        logger.debug("Scanned %d lines (%d characters) selected categories %r", self.__linesScanned, self.__bytesScanned, list(seenD.keys()))
+        return [container] if container is not None else []
+
+    def __isComplete(self, selectD, seenD):
+        return len(seenD) >= len(selectD)
+
+    def __endSection(self, container, catName, isLoop, selected, lineL, seenD):
+        """Materialize the buffered lines of a selected category and add it to the container."""
+        if not selected or container is None or catName is None or not lineL:
+            return
+        tokenL = self.__tokenize(lineL)
+        dc = DataCategory(catName)
+        if isLoop:
+            nAttr = 0
+            for ii, tok in enumerate(tokenL):
+                if tok[0] is None:
+                    break
+                dc.appendAttribute(tok[1])
+                nAttr += 1
+            else:
+                ii = len(tokenL)
+            valL = [tok[2] for tok in tokenL[ii:] if tok[0] is None]
+            if nAttr and len(valL) % nAttr != 0:
+                logger.error("Incomplete last row in loop for category %s", catName)
+            rowList = [valL[jj : jj + nAttr] for jj in range(0, len(valL) - nAttr + 1, nAttr)] if nAttr else []
+        else:
+            row = []
+            pending = None
+            for tok in tokenL:
+                if tok[0] is not None:
+                    pending = tok[1]
+                elif pending is not None:
+                    dc.appendAttribute(pending)
+                    row.append(tok[2])
+                    pending = None
+            rowList = [row]
+        for row in rowList:
+            dc.append(row)
+        container.append(dc)
+        seenD[catName] = True
+        del lineL[:]
+
+    def __tokenize(self, lineL):
+        """Return a list of tokens (category, attribute, value) for the input lines."""
+        tokenL = []
+        lineIter = iter(lineL)
+        for line in lineIter:
+            if line.startswith(";"):
+                mlString = [line[1:]]
+                for line in lineIter:  # noqa: B020 pylint: disable=redefined-outer-name
+                    if line.startswith(";"):
+                        break
+                    mlString.append(line)
+                # remove trailing new-line that is part of the \n; delimiter
+                mlString[-1] = mlString[-1].rstrip()
+                tokenL.append((None, None, "".join(mlString)))
+                line = line[1:]
+            for it in _mmcifRe.finditer(line):
+                tgroups = it.groups()
+                if tgroups[0] is not None:
+                    tokenL.append((tgroups[0], tgroups[1], None))
+                elif tgroups[2] is not None:
+                    tokenL.append((None, None, tgroups[2]))
+                elif tgroups[3] is not None:
+                    tokenL.append((None, None, tgroups[3]))
+                elif tgroups[4] is not None:
+                    tokenL.append((None, None, tgroups[4]))
+        return tokenL
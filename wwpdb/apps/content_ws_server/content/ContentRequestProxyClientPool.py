@@ -0,0 +1,167 @@
+##
+# File:  ContentRequestProxyClientPool.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Per-process pool of biocuration api clients for remote content services -
+
+Clients are kept per remote api url and hold their persistent HTTP connections and an open
+remote session, so that several proxied requests are run over one session.  The api key is
+cached and reloaded when the key file changes.  Round-trip times of the remote calls are
+recorded per remote site.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import logging
+import os
+import threading
+import time
+
+from onedep_biocuration.api.ContentRequest import ContentRequest
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+logger = logging.getLogger()
+
+# Process level pool  -  (pid, pool)
+_poolD = {}
+_poolLock = threading.Lock()
+
+
+def getProxyClientPool():
+    """Return the proxy client pool for this process."""
+    with _poolLock:
+        pid = os.getpid()
+        if _poolD.get("pid") != pid:
+            # Connections inherited from a parent process are not shared
+            _poolD["pid"] = pid
+            _poolD["pool"] = ContentRequestProxyClientPool()
+        return _poolD["pool"]
+
+
+class ProxyClient(object):
+    """Remote api client and session checked out of the pool."""
+
+    def __init__(self, apiUrl, api, apiKey):
+        self.apiUrl = apiUrl
+        self.api = api
+        self.apiKey = apiKey
+        self.createTime = time.time()
+
+
+class ContentRequestProxyClientPool(object):
+    """
+    Pool of remote content service clients keyed by api url.
+
+    """
+
+    def __init__(self, apiKeyPath=None, maxIdle=None, sessionMaxAge=None, clientFactory=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        self.__apiKeyPath = apiKeyPath
+        # Max number of idle clients held for each remote site
+        self.__maxIdle = int(maxIdle if maxIdle is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_POOL_MAX_IDLE", 4))
+        # Remote sessions older than this (seconds) are replaced
+        self.__sessionMaxAge = float(sessionMaxAge if sessionMaxAge is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_SESSION_MAX_AGE", 3600))
+        self.__clientFactory = clientFactory if clientFactory else self.__defaultFactory
+        #
+        self.__lock = threading.Lock()
+        # d[apiUrl] = [ProxyClient, ...]
+        self.__idleD = {}
+        # d[filePath] = (mtime, size, apiKey)
+        self.__keyD = {}
+        # d[apiUrl] = {counters}
+        self.__statD = {}
+
+    def __defaultFactory(self, apiKey, apiUrl):
+        return ContentRequest(apiKey=apiKey, apiUrl=apiUrl)
+
+    def getApiKey(self):
+        """Return the api key  -  the key file is re-read only when it has changed."""
+        filePath = self.__apiKeyPath if self.__apiKeyPath else self.__cI.get("SITE_WS_CONTENT_WWPDB_KEY")
+        try:
+            st = os.stat(filePath)
+            with self.__lock:
+                tup = self.__keyD.get(filePath)
+                if tup and tup[0] == st.st_mtime and tup[1] == st.st_size:
+                    return tup[2]
+            with open(filePath, "r") as fp:
+                apiKey = fp.read()
+            with self.__lock:
+                self.__keyD[filePath] = (st.st_mtime, st.st_size, apiKey)
+            return apiKey
+        except Exception as e:
+            logger.exception("Could not read apiKeyFile %r %s", filePath, str(e))
+        return None
+
+    def checkout(self, apiUrl):
+        """Return a client with an open session for the remote api url or None on failure."""
+        apiKey = self.getApiKey()
+        if not apiKey:
+            return None
+        now = time.time()
+        with self.__lock:
+            idleL = self.__idleD.setdefault(apiUrl, [])
+            while idleL:
+                client = idleL.pop()
+                if client.apiKey == apiKey and now - client.createTime < self.__sessionMaxAge:
+                    self.__count(apiUrl, "sessions_reused")
+                    return client
+                self.__count(apiUrl, "sessions_expired")
+        #
+        client = ProxyClient(apiUrl, self.__clientFactory(apiKey, apiUrl), apiKey)
+        rD = self.call(client, "createSession")
+        if not rD or rD["onedep_error_flag"]:
+            logger.error("Response from create session %r", rD)
+            return None
+        logger.debug("Created remote session %r for %r", rD["session_id"], apiUrl)
+        with self.__lock:
+            self.__count(apiUrl, "sessions_created")
+        return client
+
+    def checkin(self, client, reuse=True):
+        """Return a client to the pool -  clients from failed requests are discarded."""
+        if not reuse:
+            return
+        with self.__lock:
+            idleL = self.__idleD.setdefault(client.apiUrl, [])
+            if len(idleL) < self.__maxIdle:
+                idleL.append(client)
+
+    def call(self, client, methodName, *args, **kwargs):
+        """Call the client api method and record the round-trip time for the remote site."""
+        startTime = time.time()
+        try:
+            return getattr(client.api, methodName)(*args, **kwargs)
+        finally:
+            rtt = time.time() - startTime
+            with self.__lock:
+                self.__count(client.apiUrl, "requests")
+                sD = self.__statD[client.apiUrl]
+                sD["rtt_total"] += rtt
+                sD["rtt_max"] = max(sD["rtt_max"], rtt)
+
+    def clear(self):
+        with self.__lock:
+            self.__idleD = {}
+
+    def getStats(self):
+        """Return the request, session and round-trip time statistics for each remote site."""
+        rD = {}
+        with self.__lock:
+            for apiUrl, sD in self.__statD.items():
+                rD[apiUrl] = dict(sD)
+                rD[apiUrl]["rtt_mean"] = sD["rtt_total"] / sD["requests"] if sD["requests"] else 0.0
+                rD[apiUrl]["idle"] = len(self.__idleD.get(apiUrl, []))
+        return rD
+
+    def __count(self, apiUrl, ky):
+        if apiUrl not in self.__statD:
+            self.__statD[apiUrl] = {"requests": 0, "rtt_total": 0.0, "rtt_max": 0.0, "sessions_created": 0, "sessions_reused": 0, "sessions_expired": 0}
+        self.__statD[apiUrl][ky] += 1
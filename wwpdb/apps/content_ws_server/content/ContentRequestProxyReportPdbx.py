@@ -3,10 +3,19 @@
 # Date:  02-Jun-2017  E. Peisach. Westbrook
 #
 # Update:
+#   18-Oct-2026 ep  asyncio retrieval with jittered capped polling, an overall deadline and concurrent requests
+#   18-Oct-2026 ep  reuse remote sessions and connections from the per-process client pool
+#   18-Oct-2026 ep  optional progress callback for batch requests
+#   18-Oct-2026 ep  download to a temporary file for each attempt which replaces the report on success
 ##
 """
 Fetch content and prepare report from PDBx content -
 
+Remote requests are run as asyncio tasks.  The blocking biocuration api calls are run in the
+default executor so that many requests may be outstanding while their status is polled.
+An executor thread is not stopped when its request times out or is cancelled, so each report
+is downloaded to a temporary file of its own which replaces the report only on success.
+
 """
 __docformat__ = "restructuredtext en"
 __author__ = "Ezra Peisach"
@@ -14,12 +23,18 @@ __email__ = "peisach@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.07"
 
+import asyncio
+import functools
 import logging
-import time
+import os
+import random
+import tempfile
+import threading
 
-from onedep_biocuration.api.ContentRequest import ContentRequest
 from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
 
+from wwpdb.apps.content_ws_server.content.ContentRequestProxyClientPool import getProxyClientPool
+
 logger = logging.getLogger()
 
 
@@ -30,74 +45,115 @@ class ContentRequestProxyReportPdbx(object):
 
     """
 
-    def __init__(self, verbose=True):  # pylint: disable=unused-argument
+    def __init__(self, verbose=True, pollInterval=None, pollMaxInterval=None, timeout=None, maxOutstanding=None, clientPool=None):  # pylint: disable=unused-argument
         # self.__verbose = verbose
         self.__siteId = getSiteId(defaultSiteId=None)
         self.__cI = ConfigInfo(self.__siteId)
+        # Status polling interval (seconds) -  doubled after each poll up to the maximum
+        self.__pollInterval = float(pollInterval if pollInterval is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_POLL_INTERVAL", 0.5))
+        self.__pollMaxInterval = float(pollMaxInterval if pollMaxInterval is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_POLL_MAX_INTERVAL", 4))
         # Max time to get a response
-        self.__maxWait = 60
+        self.__timeout = float(timeout if timeout is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_TIMEOUT", 180))
+        # Max number of concurrent remote requests in retrieveProxyReports()
+        self.__maxOutstanding = int(maxOutstanding if maxOutstanding is not None else self.__cI.get("SITE_WS_CONTENT_PROXY_MAX_OUTSTANDING", 16))
+        # Remote clients and sessions are shared by the requests in this process
+        self.__clientPool = clientPool if clientPool else getProxyClientPool()
         logger.info("Starting with siteId %r", self.__siteId)
         #
 
-    def __readApiKey(self, filePath):
-        """Reads API key from file"""
-        api_key = None
-        try:
-            with open(filePath, "r") as fp:
-                api_key = fp.read()
-        except Exception as e:
-            logger.exception(e)
-
-        return api_key
+    def getClientStats(self):
+        """Return the request, session and round-trip time statistics for each remote site."""
+        return self.__clientPool.getStats()
 
     def retrieveProxyReport(self, dataSetId, apiUrl, contentType, formatType, reportPath):
         """Retrieve a report from a remote server"""
-        logger.debug("dataSetId %r apiUrl %r contentType %r reportPath %r", dataSetId, apiUrl, contentType, reportPath)
+        return self.retrieveProxyReports([(dataSetId, apiUrl, contentType, formatType, reportPath)])[0]
 
-        apiKeyFileName = self.__cI.get("SITE_WS_CONTENT_WWPDB_KEY")
-        apiKey = self.__readApiKey(apiKeyFileName)
-        if not apiKey:
-            logger.error("Could not read apiKeyFile %r", apiKeyFileName)
-            return False
+    def retrieveProxyReports(self, requestList, timeout=None):
+        """Retrieve reports from remote servers concurrently -
 
-        cr = ContentRequest(apiKey=apiKey, apiUrl=apiUrl)
+        requestList: list of (dataSetId, apiUrl, contentType, formatType, reportPath)
 
-        # Need a session....
-        rD = cr.createSession()
-        if not rD or rD["onedep_error_flag"]:
-            logger.error("Response from create session %r", rD)
-            return False
+        Returns: list of status for each request
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.__gather(requestList, timeout))
+        finally:
+            loop.close()
+            logger.info("Remote client statistics %r", self.__clientPool.getStats())
+
+    async def __gather(self, requestList, timeout):
+        sem = asyncio.Semaphore(max(1, self.__maxOutstanding))
+
+        async def bounded(args):
+            async with sem:
+                return await self.retrieveProxyReportAsync(*args, timeout=timeout)
 
-        sessionId = rD["session_id"]
-        logger.debug("sessionId %r", sessionId)
+        return await asyncio.gather(*[bounded(args) for args in requestList])
 
-        rD = cr.requestEntryContent(dataSetId, contentType, formatType)
+    async def retrieveProxyReportAsync(self, dataSetId, apiUrl, contentType, formatType, reportPath, timeout=None, progressFunc=None):
+        """Retrieve a report from a remote server within the timeout (seconds)  -  the task may be cancelled.
+
+        progressFunc(dataSetId, status) is called once the request is submitted to the remote server.
+
+        Returns: True for success or False otherwise
+        """
+        timeout = self.__timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(self.__retrieve(dataSetId, apiUrl, contentType, formatType, reportPath, progressFunc), timeout)
+        except asyncio.TimeoutError:
+            logger.error("No response from remote service for %r %r in %.1f seconds", dataSetId, contentType, timeout)
+        except asyncio.CancelledError:
+            logger.info("Cancelled remote request for %r %r", dataSetId, contentType)
+            raise
+        except Exception as e:
+            logger.exception("Failing remote request for %r %r %s", dataSetId, contentType, str(e))
+        return False
+
+    async def __retrieve(self, dataSetId, apiUrl, contentType, formatType, reportPath, progressFunc):
+        logger.debug("dataSetId %r apiUrl %r contentType %r reportPath %r", dataSetId, apiUrl, contentType, reportPath)
+        loop = asyncio.get_running_loop()
+        pool = self.__clientPool
+
+        # A client with an open remote session -  one request at a time per session
+        client = await loop.run_in_executor(None, pool.checkout, apiUrl)
+        if client is None:
+            return False
+        ok = False
+        try:
+            ok = await self.__request(loop, client, dataSetId, contentType, formatType, reportPath, progressFunc)
+        finally:
+            # Sessions left in an unknown state are not reused
+            pool.checkin(client, reuse=ok)
+        return ok
+
+    async def __request(self, loop, client, dataSetId, contentType, formatType, reportPath, progressFunc):
+        pool = self.__clientPool
+        rD = await loop.run_in_executor(None, functools.partial(pool.call, client, "requestEntryContent", dataSetId, contentType, formatType))
         if rD["onedep_error_flag"]:
             logger.error("Submitted content service failed request %r", rD)
             return False
 
         logger.debug("Submitted remote content reuqest")
+        if progressFunc:
+            progressFunc(dataSetId, "submitted")
 
         #
-        #   Poll for service completion -
+        #   Poll for service completion -  jittered so that concurrent requests do not poll in step
         #
-        total = 0
         it = 0
-        sl = 2
+        interval = self.__pollInterval
         while True:
             #    Pause -
             it += 1
-            pause = it * it * sl
-            time.sleep(pause)
-            rD = cr.getStatus()
-            if rD["status"] in ["completed", "failed"]:
+            pause = random.uniform(0.5, 1.0) * interval
+            await asyncio.sleep(pause)
+            rD = await loop.run_in_executor(None, pool.call, client, "getStatus")
+            if rD.get("status") in ["completed", "failed"]:
                 break
-            logger.debug("[%4d] Pausing for %4d (seconds)", it, pause)
-            total += pause
-            # Timeout?
-            if pause > self.__maxWait:
-                logger.error("No response from remote service in %r", total)
-                return False
+            logger.debug("[%4d] Paused for %.2f (seconds)", it, pause)
+            interval = min(2.0 * interval, self.__pollMaxInterval)
         #
         logger.debug("Received response from remote %r", rD)
 
@@ -105,10 +161,35 @@ class ContentRequestProxyReportPdbx(object):
             logger.error("Remote service request failed %r", rD)
             return False
 
-        rD = cr.getOutputByType(reportPath, contentType, formatType=formatType)
-        if rD["onedep_error_flag"]:
-            logger.debug("getOutputByType failed %r", rD)
-            return False
+        # The download thread may outlive this task  -  it writes only to the temporary file of this attempt
+        fd, tmpPath = tempfile.mkstemp(prefix=os.path.basename(reportPath) + ".", suffix=".tmp", dir=os.path.dirname(reportPath))
+        os.close(fd)
+        abandoned = threading.Event()
+        ok = False
+        try:
+            rD = await loop.run_in_executor(None, self.__download, client, tmpPath, contentType, formatType, abandoned)
+            if rD["onedep_error_flag"]:
+                logger.debug("getOutputByType failed %r", rD)
+                return False
+            os.replace(tmpPath, reportPath)
+            # We have succeeded!!!!
+            ok = True
+        finally:
+            if not ok:
+                abandoned.set()
+                self.__remove(tmpPath)
+        return ok
+
+    def __download(self, client, tmpPath, contentType, formatType, abandoned):
+        """Download the report to the temporary path  -  the file is removed if the request was abandoned meanwhile."""
+        try:
+            return self.__clientPool.call(client, "getOutputByType", tmpPath, contentType, formatType=formatType)
+        finally:
+            if abandoned.is_set():
+                self.__remove(tmpPath)
 
-        # We have succeeded!!!!
-        return True
+    def __remove(self, filePath):
+        try:
+            os.remove(filePath)
+        except OSError:
+            pass
@@ -3,7 +3,14 @@
 # Date:  15-Feb-2017  J. Westbrook
 #
 # Update:
-#
+#   18-Oct-2026 ep  build SQL conditions from the compiled content definition conditions
+#   18-Oct-2026 ep  run queries on connections from the per-process connection pool
+#   18-Oct-2026 ep  add writeContent() to stream summary reports to disk from a server-side cursor
+#   18-Oct-2026 ep  run the category queries of a content type concurrently (bounded per resource)
+#   18-Oct-2026 ep  cache schema definition objects and generated SQL in the process
+#   18-Oct-2026 ep  add getContentDefinitionHash()
+#   18-Oct-2026 ep  write streamed reports with ContentRequestReportWriter (ndjson and compressed formats)
+#   18-Oct-2026 ep  run category queries on a plain cursor -  MyDbQuery.selectRows() changes the process warning filters
 ##
 """
 Fetch content and prepare report from PDBx content -
@@ -18,21 +25,33 @@ __version__ = "V0.07"
 import datetime
 import logging
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+from MySQLdb.cursors import SSCursor
 
 #
 #  -- supporting queries against only DA_INTERNAL in this service --
 from wwpdb.utils.db.DaInternalSchemaDef import DaInternalSchemaDef
 from wwpdb.utils.db.MyConnectionBase import MyConnectionBase
 from wwpdb.utils.db.MyDbSqlGen import MyDbQuerySqlGen, MyDbConditionSqlGen
-from wwpdb.utils.db.MyDbUtil import MyDbQuery
 from wwpdb.utils.db.WorkflowSchemaDef import WorkflowSchemaDef
 
+from wwpdb.apps.content_ws_server.content.ContentRequestDbPool import getDbPool
 from wwpdb.apps.content_ws_server.content.ContentRequestReportIo import ContentRequestReportIo
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import ContentRequestReportWriter
 
 #
 logger = logging.getLogger()
 
+# Process level caches -  schema definition objects by database name and generated SQL by
+# (content type, table) for the content definitions identified by "hash"
+_schemaDefD = {}
+_sqlCacheD = {"hash": None, "sql": {}}
+_cacheStatD = {"schema_hits": 0, "schema_misses": 0, "sql_hits": 0, "sql_misses": 0}
+_cacheLock = threading.Lock()
+
 
 class ContentRequestReportDb(MyConnectionBase):
     """
@@ -40,11 +59,15 @@ class ContentRequestReportDb(MyConnectionBase):
 
     """
 
-    def __init__(self, siteId, verbose=True, log=sys.stderr):
+    def __init__(self, siteId, verbose=True, log=sys.stderr, dbPool=None, maxParallel=None):
         super(ContentRequestReportDb, self).__init__(siteId=siteId, verbose=verbose, log=log)
         self.__verbose = verbose
         logger.info("Starting with siteId %r", siteId)
         self.__lfh = log
+        # Connections are shared with later requests served by this process
+        self.__dbPool = dbPool if dbPool is not None else getDbPool(siteId)
+        # Concurrent category queries (overrides the site configuration if set)
+        self.__maxParallel = maxParallel
         #
         self.__crio = ContentRequestReportIo()
 
@@ -54,6 +77,9 @@ class ContentRequestReportDb(MyConnectionBase):
     def getContentTypes(self):
         return self.__crio.getContentTypes()
 
+    def getContentDefinitionHash(self):
+        return self.__crio.getContentDefinitionHash()
+
     def extractContent(self, requestContentType):
         """Apply the input 'requestContentType' to the current database state -
 
@@ -69,105 +95,191 @@ class ContentRequestReportDb(MyConnectionBase):
         """
         rD = {}
         try:
-            cDef = self.getContentTypeDef(requestContentType)
-            logger.debug("Content definition %r", cDef.items())
-            logger.debug("Content keys definition %r", cDef["content"].keys())
-            logger.debug("Content resource %r", cDef["resource"])
-            #
-            #  -- Note the str() filter here --
-            myCategoryList = [str(c) for c in cDef["content"].keys()]
-            myConditionList = [str(c) for c in cDef["conditions"].keys()]
-
-            #
-            if len(cDef) < 1:
-                logger.error("Undefined/empty content definition")
+            queryList = self.__getQueryList(requestContentType)
+            nWorkers = min(len(queryList), self.__getMaxParallel())
+            if nWorkers <= 1:
+                for catName, myResource, sList, sqlS in queryList:
+                    rD[catName] = self.__processQuery(myResource, sList, sqlS) if sqlS else []
                 return rD
-
             #
-            logger.debug("Category list in definition %r", myCategoryList)
-            #
-            for catName in myCategoryList:
-                rD[catName] = []
-                sList = cDef["content"][catName]
-                myResource, myDatabase = cDef["resource"][catName]
-                logger.debug("Resource %r database %r", myResource, myDatabase)
-                if myResource.upper() in ["DA_INTERNAL", "STATUS"]:
-                    if myDatabase in ["da_internal", "da_internal_prod", "da_internal_combine"]:
-                        sDef = DaInternalSchemaDef(verbose=self.__verbose, log=sys.stderr, databaseName=myDatabase)
-                    elif myDatabase in ["status"]:
-                        sDef = WorkflowSchemaDef(verbose=self.__verbose, log=sys.stderr)
-                    else:
-                        sDef = {}
-                else:
-                    logger.error("Undefined resource %r database %r", myResource, myDatabase)
-                    continue
-
-                # tableIdList = sd.getTableIdList()
-                # aIdList = sd.getAttributeIdList(tableId)
-                sqlGen = MyDbQuerySqlGen(schemaDefObj=sDef, verbose=self.__verbose, log=sys.stderr)
-                sTableIdList = []
-
-                sTableIdList.append(catName.upper())
-                for s in sList:
-                    sqlGen.addSelectAttributeId(attributeTuple=(catName.upper(), s.upper()))
-
-                if catName in myConditionList:
-                    # {'entity_poly': {'entity_id': ('1', 'char', 'eq')},
-                    sqlCondition = MyDbConditionSqlGen(schemaDefObj=sDef, verbose=self.__verbose, log=sys.stderr)
-                    cndD = cDef["conditions"][catName]
-                    cList = []
-                    for k, v in cndD.items():
-                        cList.append(((catName.upper(), k.upper()), v[2].upper(), (v[0].upper(), v[1].upper())))
-                    for cTup in cList:
-                        sqlCondition.addValueCondition(cTup[0], cTup[1], cTup[2])
-
-                    sqlCondition.addTables(sTableIdList)
-                    sqlGen.setCondition(sqlCondition)
-                    #
-                sqlS = sqlGen.getSql()
-                logger.debug("SQL string\n %s\n\n", sqlS)
-                sqlGen.clear()
-                #
-                rL = self.__processQuery(myResource, sList, sqlS)
-                rD[catName] = rL
+            # Each worker runs its query on its own pooled connection -  results are merged in definition order
+            startTime = time.time()
+            semD = {myResource.upper(): threading.BoundedSemaphore(self.__getMaxParallel(myResource)) for _c, myResource, _s, sqlS in queryList if sqlS}
+            with ThreadPoolExecutor(max_workers=nWorkers) as executor:
+                futureList = [
+                    (catName, executor.submit(self.__processQueryBounded, semD[myResource.upper()], myResource, sList, sqlS) if sqlS else None)
+                    for catName, myResource, sList, sqlS in queryList
+                ]
+                for catName, future in futureList:
+                    rD[catName] = future.result() if future is not None else []
+            logger.debug("Completed %d queries with %d workers in (%.2f seconds)", len(queryList), nWorkers, time.time() - startTime)
         except Exception as e:
             logger.exception("Database extraction failing for content type %r", requestContentType)
             logger.exception(e)
         #
         return rD
 
+    def writeContent(self, requestContentType, reportPath, formatType="json", batchSize=None):
+        """Apply the input 'requestContentType' to the current database state and write the result to 'reportPath' -
+
+        Rows are fetched in batches with a server-side cursor and written as they arrive so memory
+        use does not depend on the number of rows.  The JSON output is identical to json.dumps() of
+        the extractContent() result.  For formatType 'ndjson' each row is written as a separate line
+        {"category": <categoryName>, "row": {attribute: value, ...}}.  The suffix .gz or .zst on the
+        formatType compresses the report (see ContentRequestReportWriter).
+
+        Returns: True for success or False otherwise (no report file is written)
+        """
+        startTime = time.time()
+        batchSize = int(batchSize if batchSize else self._cI.get("SITE_WS_CONTENT_DB_FETCH_BATCH_SIZE", 1000))
+        try:
+            queryList = self.__getQueryList(requestContentType)
+            with ContentRequestReportWriter(reportPath, formatType=formatType) as wr:
+                for catName, myResource, sList, sqlS in queryList:
+                    wr.writeCategory(catName, self.__streamQuery(myResource, sList, sqlS, batchSize) if sqlS else [])
+            logger.info("Wrote %d rows for %r in (%.2f seconds)", wr.getRowCount(), requestContentType, time.time() - startTime)
+            return True
+        except Exception as e:
+            logger.exception("Database report failing for content type %r", requestContentType)
+            logger.exception(e)
+        return False
+
+    def __getQueryList(self, requestContentType):
+        """Return the list of (categoryName, resourceName, attributeList, sql) for the input content type -
+
+        The sql is None for categories in an undefined resource.  Generated SQL is reused by later
+        requests in this process until the content definitions are changed.
+        """
+        qL = []
+        cDef = self.getContentTypeDef(requestContentType)
+        if len(cDef) < 1:
+            logger.error("Undefined/empty content definition")
+            return qL
+        logger.debug("Content definition %r", cDef.items())
+        logger.debug("Content keys definition %r", cDef["content"].keys())
+        logger.debug("Content resource %r", cDef["resource"])
+        #
+        #  -- Note the str() filter here --
+        myCategoryList = [str(c) for c in cDef["content"].keys()]
+        condD = self.__crio.getContentConditions(requestContentType)
+        if condD is None:
+            logger.error("Unsupported conditions in content definition %r", requestContentType)
+            return qL
+
+        #
+        logger.debug("Category list in definition %r", myCategoryList)
+        defHash = self.__crio.getContentDefinitionHash()
+        with _cacheLock:
+            if _sqlCacheD["hash"] != defHash:
+                _sqlCacheD["hash"] = defHash
+                _sqlCacheD["sql"] = {}
+            sqlD = _sqlCacheD["sql"]
+        #
+        for catName in myCategoryList:
+            sList = cDef["content"][catName]
+            myResource, myDatabase = cDef["resource"][catName]
+            sqlS = sqlD.get((requestContentType, catName))
+            if sqlS is not None:
+                with _cacheLock:
+                    _cacheStatD["sql_hits"] += 1
+                qL.append((catName, myResource, sList, sqlS))
+                continue
+            logger.debug("Resource %r database %r", myResource, myDatabase)
+            if myResource.upper() in ["DA_INTERNAL", "STATUS"]:
+                sDef = self.__getSchemaDef(myDatabase)
+            else:
+                logger.error("Undefined resource %r database %r", myResource, myDatabase)
+                qL.append((catName, myResource, sList, None))
+                continue
+
+            # tableIdList = sd.getTableIdList()
+            # aIdList = sd.getAttributeIdList(tableId)
+            sqlGen = MyDbQuerySqlGen(schemaDefObj=sDef, verbose=self.__verbose, log=sys.stderr)
+            sTableIdList = []
+
+            sTableIdList.append(catName.upper())
+            for s in sList:
+                sqlGen.addSelectAttributeId(attributeTuple=(catName.upper(), s.upper()))
+
+            if catName in condD and condD[catName]:
+                # {'entity_poly': {'entity_id': ('1', 'char', 'eq')},
+                sqlCondition = MyDbConditionSqlGen(schemaDefObj=sDef, verbose=self.__verbose, log=sys.stderr)
+                for cnd in condD[catName].values():
+                    cnd.addSqlCondition(sqlCondition, catName)
+
+                sqlCondition.addTables(sTableIdList)
+                sqlGen.setCondition(sqlCondition)
+                #
+            sqlS = sqlGen.getSql()
+            logger.debug("SQL string\n %s\n\n", sqlS)
+            sqlGen.clear()
+            with _cacheLock:
+                _cacheStatD["sql_misses"] += 1
+                sqlD[(requestContentType, catName)] = sqlS
+            qL.append((catName, myResource, sList, sqlS))
+        return qL
+
+    def __getSchemaDef(self, databaseName):
+        """Return the shared schema definition object for the input database name -"""
+        with _cacheLock:
+            if databaseName in _schemaDefD:
+                _cacheStatD["schema_hits"] += 1
+                return _schemaDefD[databaseName]
+            _cacheStatD["schema_misses"] += 1
+            if databaseName in ["da_internal", "da_internal_prod", "da_internal_combine"]:
+                sDef = DaInternalSchemaDef(verbose=self.__verbose, log=sys.stderr, databaseName=databaseName)
+            elif databaseName in ["status"]:
+                sDef = WorkflowSchemaDef(verbose=self.__verbose, log=sys.stderr)
+            else:
+                sDef = {}
+            _schemaDefD[databaseName] = sDef
+            return sDef
+
+    def getCacheStats(self):
+        """Return the process schema definition and SQL cache hit and miss counts."""
+        with _cacheLock:
+            return dict(_cacheStatD)
+
+    def __getMaxParallel(self, resourceName=None):
+        """Return the maximum number of concurrent queries (for the input resource) -
+
+        SITE_WS_CONTENT_DB_MAX_PARALLEL_<RESOURCE> overrides SITE_WS_CONTENT_DB_MAX_PARALLEL (default 4).
+        """
+        if self.__maxParallel is not None:
+            return max(1, int(self.__maxParallel))
+        nMax = self._cI.get("SITE_WS_CONTENT_DB_MAX_PARALLEL", 4)
+        if resourceName:
+            nMax = self._cI.get("SITE_WS_CONTENT_DB_MAX_PARALLEL_" + resourceName.upper(), nMax)
+        return max(1, int(nMax))
+
+    def __processQueryBounded(self, semaphore, resourceName, sList, sqlS):
+        with semaphore:
+            return self.__processQuery(resourceName, sList, sqlS)
+
     def __processQuery(self, resourceName, sList, sqlS):
         """Process query  -"""
         startTime = time.time()
         #
-        # config the db auth info
-        self.setResource(resourceName=resourceName.upper())
-
         rL = []
         #
         try:
-            self.openConnection()
-            myQ = MyDbQuery(dbcon=self._dbCon, verbose=self.__verbose, log=self.__lfh)
-            rowList = myQ.selectRows(queryString=sqlS)
+            # Not MyDbQuery.selectRows() -  its warnings.catch_warnings() block is not thread safe and
+            # can leave the "error" filter installed for the process when queries run concurrently
+            with self.__dbPool.connection(resourceName.upper()) as dbCon:
+                curs = dbCon.cursor()
+                try:
+                    curs.execute(sqlS)
+                    rowList = curs.fetchall()
+                finally:
+                    curs.close()
             #
             if self.__verbose:
                 logger.debug("Result length %d", len(rowList))
                 # logger.debug("Row list %r" % rowList)
                 #
             for row in rowList:
-                d = {}
-                for ii, s in enumerate(sList):
-                    tt = row[ii]
-                    try:
-                        if isinstance(tt, datetime.datetime) or isinstance(tt, datetime.date):
-                            tt = tt.isoformat()
-                    except Exception as e:
-                        logger.exception("Failing %r", tt)
-                        logger.exception(e)
-                    d[s] = tt
-                rL.append(d)
+                rL.append(self.__rowToDict(sList, row))
             #
-            self.closeConnection()
         except Exception as e:
             logger.exception("Failing for resource %r and query %r", resourceName, sqlS)
             logger.exception(e)
@@ -176,6 +288,38 @@ class ContentRequestReportDb(MyConnectionBase):
         logger.debug("Completed in (%.2f seconds)", endTime - startTime)
         return rL
 
+    def __streamQuery(self, resourceName, sList, sqlS, batchSize):
+        """Generate the result rows of the input query as dictionaries fetching batchSize rows at a time -"""
+        with self.__dbPool.connection(resourceName.upper()) as dbCon:
+            try:
+                # Unbuffered server-side cursor -  rows are held by the server until fetched
+                curs = dbCon.cursor(SSCursor)
+            except TypeError:
+                curs = dbCon.cursor()
+            try:
+                curs.execute(sqlS)
+                while True:
+                    rowList = curs.fetchmany(batchSize)
+                    if not rowList:
+                        break
+                    for row in rowList:
+                        yield self.__rowToDict(sList, row)
+            finally:
+                curs.close()
+
+    def __rowToDict(self, sList, row):
+        d = {}
+        for ii, s in enumerate(sList):
+            tt = row[ii]
+            try:
+                if isinstance(tt, datetime.datetime) or isinstance(tt, datetime.date):
+                    tt = tt.isoformat()
+            except Exception as e:
+                logger.exception("Failing %r", tt)
+                logger.exception(e)
+            d[s] = tt
+        return d
+
     #
     def json_serial(self, obj):
         """JSON serializer for objects not serializable by default json code"""
@@ -3,7 +3,9 @@
 # Date:  14-Feb-2017  J. Westbrook
 #
 # Update:
-#
+#   18-Oct-2026 ep  compile content definition conditions when definitions are loaded
+#   18-Oct-2026 ep  add getContentDefinitionHash() to identify the loaded content definitions
+#   18-Oct-2026 ep  take the definition file lock with an explicit lock path rather than the process default
 ##
 """
      Manage fetching and storing  content type definitions.
@@ -16,8 +18,10 @@ __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.07"
 
 import datetime
+import hashlib
 import logging
 
+from wwpdb.apps.content_ws_server.content.ContentRequestCondition import compileConditions
 from wwpdb.apps.content_ws_server.content_definitions.ContentDefintions import get_content_definition_file_path
 
 try:
@@ -43,13 +47,47 @@ class ContentRequestReportIo(object):
         self.__cI = ConfigInfo(self.__siteId)
         logger.info("Starting with siteId %r", self.__siteId)
         self.__D = None
+        self.__condD = None
+        self.__defHash = None
         #
+        # The process default lock path is also set by each session data store
         self.__lockDirPath = self.__cI.get("SITE_SERVICE_REGISTRATION_LOCKDIR_PATH", ".")
-        lockutils.set_defaults(self.__lockDirPath)
 
     def __setup(self):
         if self.__D is None:
             self.__D = self.__readContentDefinitionDictionary()
+            self.__condD = self.__compileConditions(self.__D)
+
+    def __compileConditions(self, contentDefD):
+        """Compile the conditions of each content definition -  content types with unsupported
+        conditions map to None.
+        """
+        condD = {}
+        for contentType, cDef in contentDefD.items():
+            try:
+                condD[contentType] = compileConditions(cDef.get("conditions", {}))
+            except Exception as e:
+                logger.error("Unsupported conditions in content definition %r %s", contentType, str(e))
+                condD[contentType] = None
+        return condD
+
+    def getContentDefinitionHash(self):
+        """Return the SHA-256 digest of the loaded content definition file -  this changes whenever the
+        content definitions are changed and reloaded.
+        """
+        self.__setup()
+        return self.__defHash
+
+    def getContentConditions(self, contentType):
+        """Return the compiled conditions for the input content type  d[categoryName] = {attribute: predicate, ...}
+
+        Returns None if the content type has unsupported conditions.
+        """
+        self.__setup()
+        if contentType and contentType in self.__condD:
+            return self.__condD[contentType]
+        else:
+            return {}
 
     def getContentDefinition(self, contentType):
         self.__setup()
@@ -81,15 +119,16 @@ class ContentRequestReportIo(object):
         """
         fp = self.__get_content_definition_file()
         try:
-            with open(fp, "r") as infile:
-                return json.load(infile)
+            with open(fp, "rb") as infile:
+                data = infile.read()
+            self.__defHash = hashlib.sha256(data).hexdigest()
+            return json.loads(data.decode("utf-8"))
         except Exception as e:
             logger.info("Failed reading json resource file %s", fp)
             logger.exception(e)
 
         return {}
 
-    @lockutils.synchronized("wscontenttypedef.exceptionfile-lock", external=True)
     def writeContentDefinitionDictionary(self, contentDefD, backup=True):
         """Write the dictionary containing web service content type definitions.
 
@@ -97,17 +136,20 @@ class ContentRequestReportIo(object):
         """
         fp = self.__get_content_definition_file()
 
-        try:
-            if backup:
-                bp = fp + datetime.datetime.now().strftime("-%Y-%m-%d-%H-%M-%S")
-                d = self.__readContentDefinitionDictionary()
-                with open(bp, "w") as outfile:
-                    json.dump(d, outfile, indent=4)
-            #
-            with open(fp, "w") as outfile:
-                json.dump(contentDefD, outfile, indent=4)
-            return True
-        except Exception as e:
-            logger.exception("Failed writing json resource file %s -- %s", fp, str(e))
+        with lockutils.lock("wscontenttypedef.exceptionfile-lock", external=True, lock_path=self.__lockDirPath):
+            try:
+                if backup:
+                    bp = fp + datetime.datetime.now().strftime("-%Y-%m-%d-%H-%M-%S")
+                    d = self.__readContentDefinitionDictionary()
+                    with open(bp, "w") as outfile:
+                        json.dump(d, outfile, indent=4)
+                #
+                with open(fp, "w") as outfile:
+                    json.dump(contentDefD, outfile, indent=4)
+                # Reload the definitions on next use
+                self.__D = None
+                return True
+            except Exception as e:
+                logger.exception("Failed writing json resource file %s -- %s", fp, str(e))
 
         return False
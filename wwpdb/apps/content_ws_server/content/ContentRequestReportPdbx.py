@@ -4,6 +4,12 @@
 #
 # Update:
 #     16-Feb-2017  jdw add limited condition filters -
+#     18-Oct-2026  ep  read selected categories through the shared on-disk category cache -
+#     18-Oct-2026  ep  add extractContents() to serve several content types from a single read -
+#     18-Oct-2026  ep  column oriented attribute selection and condition evaluation -
+#     18-Oct-2026  ep  conditions are compiled predicates that select rows (as for database content) -
+#     18-Oct-2026  ep  read selected categories of large model files with the streaming category reader -
+#     18-Oct-2026  ep  read gzip compressed model files without decompressing to disk and count bytes read -
 ##
 """
 Fetch content and prepare report from PDBx content -
@@ -15,11 +21,18 @@ __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.07"
 
+import gzip
 import logging
+import operator
+import os
 import sys
 import time
 from mmcif.io.IoAdapterCore import IoAdapterCore
+from mmcif.io.PdbxReader import PdbxReader
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
 
+from wwpdb.apps.content_ws_server.content.ContentRequestPdbxCache import ContentRequestPdbxCache
+from wwpdb.apps.content_ws_server.content.ContentRequestPdbxStreamReader import ContentRequestPdbxStreamReader
 from wwpdb.apps.content_ws_server.content.ContentRequestReportIo import ContentRequestReportIo
 
 #
@@ -32,10 +45,17 @@ class ContentRequestReportPdbx(object):
 
     """
 
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, cache=None, streamMinBytes=None):
         self.__verbose = verbose
         #
         self.__crio = ContentRequestReportIo()
+        self.__cache = cache if cache is not None else ContentRequestPdbxCache()
+        # Selected categories of files of at least this size are read with the streaming reader (< 0 disables)
+        if streamMinBytes is None:
+            cI = ConfigInfo(getSiteId(defaultSiteId=None))
+            streamMinBytes = cI.get("SITE_WS_CONTENT_PDBX_STREAM_MIN_BYTES", 100 * 1024 * 1024)
+        self.__streamMinBytes = int(streamMinBytes)
+        self.__ioCountD = {"files_read": 0, "bytes_read": 0}
         logger.info("Starting ContentRequestReportPdbx")
 
     def getContentTypeDef(self, contentType):
@@ -44,18 +64,50 @@ class ContentRequestReportPdbx(object):
     def getContentTypes(self):
         return self.__crio.getContentTypes()
 
+    def getIoCounters(self):
+        """Return the number of model files and bytes read from disk by this instance."""
+        return dict(self.__ioCountD)
+
     def readFilePdbx(self, filePath, logFilePath, catNameList=None):
-        """Read selected categories from PDBx file"""
+        """Read selected categories from PDBx file (or the category cache)
+
+        Model files are read in place -  gzip compressed files (.gz) are decompressed as they are read.
+        """
         startTime = time.time()
         containerList = []
+        cacheKey = None
         try:
-            io = IoAdapterCore(verbose=self.__verbose, log=sys.stderr)
-            if catNameList and len(catNameList) > 0:
+            if self.__cache.isEnabled():
+                cacheKey = self.__cache.getKey(filePath, catNameList)
+                cachedList = self.__cache.get(cacheKey)
+                if cachedList is not None:
+                    logger.info("Read %d data blocks from cache for %r in (%.2f seconds)", len(cachedList), filePath, time.time() - startTime)
+                    return cachedList
+            #
+            isGzip = str(filePath).endswith(".gz")
+            if catNameList and len(catNameList) > 0 and (isGzip or self.__useStreamReader(filePath)):
+                sr = ContentRequestPdbxStreamReader()
+                containerList = sr.readFile(filePath, catNameList)
+                logger.info("Streaming read scanned %r", sr.getStats())
+                bytesRead = sr.getStats()["bytes_read"]
+            elif isGzip:
+                with gzip.open(str(filePath), "rt", encoding="utf-8", errors="ignore") as ifh:
+                    pRd = PdbxReader(ifh)
+                    pRd.read(containerList)
+                bytesRead = os.path.getsize(str(filePath))
+            elif catNameList and len(catNameList) > 0:
+                io = IoAdapterCore(verbose=self.__verbose, log=sys.stderr)
                 containerList = io.readFile(str(filePath), selectList=catNameList, logFilePath=str(logFilePath))
+                bytesRead = os.path.getsize(str(filePath))
             else:
+                io = IoAdapterCore(verbose=self.__verbose, log=sys.stderr)
                 containerList = io.readFile(str(filePath), logFilePath=str(logFilePath))
+                bytesRead = os.path.getsize(str(filePath))
+            self.__ioCountD["files_read"] += 1
+            self.__ioCountD["bytes_read"] += bytesRead
             #
             logger.info("Read %d data blocks from %r", len(containerList), filePath)
+            self.__cache.set(cacheKey, containerList)
 
         except Exception as e:
             logger.exception("Read failing for %r", filePath)
@@ -65,32 +117,13 @@ class ContentRequestReportPdbx(object):
         logger.info("Completed in (%.2f seconds)", endTime - startTime)
         return containerList
 
-    def __cmpfunc(self, v, target, myType, myOp):
-        """Internal function to compare simple types -"""
-        if myType in ["string", "char"]:
-            vv = str(v)
-        elif myType == "int":
-            vv = int(str(v))
-        elif myType in ["float", "double"]:
-            vv = float(str(v))
-        else:
-            vv = str(v)
-        #
-        if type in ["string", "char", "float", "double", "int"]:
-            if myOp in ["eq"]:
-                return vv == target
-            elif myOp in ["gt"]:
-                return vv > target
-            elif myOp in ["ge"]:
-                return vv >= target
-            elif myOp in ["lt"]:
-                return vv < target
-            elif myOp in ["le"]:
-                return vv <= target
-            else:
-                return False
-        #
-        return False
+    def __useStreamReader(self, filePath):
+        if self.__streamMinBytes < 0:
+            return False
+        try:
+            return os.path.getsize(str(filePath)) >= self.__streamMinBytes
+        except OSError:
+            return False
 
     def extractContent(self, pdbxFilePath, logFilePath, requestContentType):
         """Apply the input 'requestContentType' to the content of the input PDBx data file -"""
@@ -101,39 +134,116 @@ class ContentRequestReportPdbx(object):
             logger.info("Content keys definition %r", cDef["content"].keys())
             # Note the str() filter here -
             myCategoryList = [str(c) for c in cDef["content"].keys()]
-            myConditionList = [str(c) for c in cDef["conditions"].keys()]
             #
             if len(cDef) < 1:
                 return rD
             logger.info("Category list in definition %r", myCategoryList)
+            condD = self.__crio.getContentConditions(requestContentType)
+            if condD is None:
+                logger.error("Unsupported conditions in content definition %r", requestContentType)
+                return rD
             myContainerList = self.readFilePdbx(pdbxFilePath, logFilePath, myCategoryList)
-            for container in myContainerList:
-                catNameList = container.getObjNameList()
-                for catName in myCategoryList:
-                    if catName in catNameList:
-                        rD[catName] = []
-                        catSel = cDef["content"][catName]
-                        if catName in myConditionList:
-                            cndD = cDef["conditions"][catName]
-                        else:
-                            cndD = {}
-                        cObj = container.getObj(catName)
-                        for ii in range(0, cObj.getRowCount()):
-                            od = {}
-                            dd = cObj.getRowAttributeDict(ii)
-                            for k, v in dd.items():
-                                # Check for a condition -
-                                if k in cndD:
-                                    fD = cndD[k]
-                                    ok = self.__cmpfunc(v, fD[0], fD[1], fD[2])
-                                    if not ok:
-                                        continue
-                                #
-                                if k in catSel:
-                                    od[k] = v
-                            rD[catName].append(od)
+            rD = self.__applyContentDef(myContainerList, cDef, condD)
         except Exception as e:
             logger.exception("Extraction processing failing for %r content type %r", pdbxFilePath, requestContentType)
             logger.exception(e)
         #
         return rD
+
+    def extractContents(self, pdbxFilePath, logFilePath, requestContentTypeList):
+        """Apply each of the input content types to the content of the input PDBx data file -
+
+        The union of the categories in all of the content definitions is read once.
+
+        Returns: d[<content_type>] = {categoryName: [{attribute: value, ...}, ...], ...}
+        """
+        rD = {}
+        try:
+            cDefD = {}
+            myCategoryList = []
+            for requestContentType in requestContentTypeList:
+                rD[requestContentType] = {}
+                cDef = self.getContentTypeDef(requestContentType)
+                if len(cDef) < 1:
+                    logger.error("Undefined/empty content definition %r", requestContentType)
+                    continue
+                condD = self.__crio.getContentConditions(requestContentType)
+                if condD is None:
+                    logger.error("Unsupported conditions in content definition %r", requestContentType)
+                    continue
+                cDefD[requestContentType] = (cDef, condD)
+                for c in cDef["content"].keys():
+                    if str(c) not in myCategoryList:
+                        myCategoryList.append(str(c))
+            #
+            if not cDefD:
+                return rD
+            logger.info("Category list for content types %r: %r", list(cDefD.keys()), myCategoryList)
+            myContainerList = self.readFilePdbx(pdbxFilePath, logFilePath, myCategoryList)
+            for requestContentType, (cDef, condD) in cDefD.items():
+                rD[requestContentType] = self.__applyContentDef(myContainerList, cDef, condD)
+        except Exception as e:
+            logger.exception("Extraction processing failing for %r content types %r", pdbxFilePath, requestContentTypeList)
+            logger.exception(e)
+        #
+        return rD
+
+    def __applyContentDef(self, containerList, cDef, condD):
+        """Select the categories, attributes and rows of the input content definition from the input containers -"""
+        rD = {}
+        # Note the str() filter here -
+        myCategoryList = [str(c) for c in cDef["content"].keys()]
+        for container in containerList:
+            catNameList = container.getObjNameList()
+            for catName in myCategoryList:
+                if catName in catNameList:
+                    catSel = cDef["content"][catName]
+                    cndD = condD.get(catName, {})
+                    cObj = container.getObj(catName)
+                    rD[catName] = self.filterCategory(cObj, catSel, cndD)
+        return rD
+
+    def filterCategory(self, cObj, catSel, cndD, columnMode=True):
+        """Return the list of row dictionaries of the selected attributes for the rows of the input
+        category object that satisfy all of the input conditions  {attribute: predicate, ...} -
+
+        In column mode only the selected and conditioned attribute columns are fetched by index,
+        each condition is evaluated once over its column and rows are built only for the survivors.
+        Categories with ragged rows are processed row by row.
+        """
+        attributeList = cObj.getAttributeList()
+        rowList = cObj.getRowList()
+        nAttr = len(attributeList)
+        if not columnMode or any(len(row) != nAttr for row in rowList):
+            return self.__filterCategoryByRow(cObj, catSel, cndD)
+        #
+        idxD = cObj.getAttributeIndexDict()
+        mask = None
+        for k, pred in cndD.items():
+            if k not in idxD:
+                # A condition on a missing attribute is never satisfied
+                return []
+            ii = idxD[k]
+            cMask = [pred(row[ii]) for row in rowList]
+            mask = cMask if mask is None else [m and c for m, c in zip(mask, cMask)]
+        survivorList = rowList if mask is None else [row for row, m in zip(rowList, mask) if m]
+        #
+        selL = [(k, ii) for ii, k in enumerate(attributeList) if k in catSel]
+        if not selL:
+            return [{} for _ in survivorList]
+        if len(selL) == 1:
+            k, ii = selL[0]
+            return [{k: row[ii]} for row in survivorList]
+        keyL = [k for k, _ii in selL]
+        getter = operator.itemgetter(*[ii for _k, ii in selL])
+        return [dict(zip(keyL, getter(row))) for row in survivorList]
+
+    def __filterCategoryByRow(self, cObj, catSel, cndD):
+        rL = []
+        for ii in range(0, cObj.getRowCount()):
+            dd = cObj.getRowAttributeDict(ii)
+            # Check the conditions -
+            if not all([k in dd and pred(dd[k]) for k, pred in cndD.items()]):
+                continue
+            rL.append({k: v for k, v in dd.items() if k in catSel})
+        return rL
@@ -0,0 +1,198 @@
+##
+# File:  ContentRequestReportStore.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  record the report inode with its digests and add releaseReport() for writers
+##
+"""
+Content-addressed store of report files shared by sessions -
+
+Completed report files are stored once by their SHA-256 digest under
+<store>/<first two digest characters>/<digest>.  The report file in the session is
+replaced by a hard link to the stored object so identical reports in different sessions
+share their disk space.  The SHA-256 and MD5 digests and the size of each object are kept
+in <digest>.json beside the object so that downloads do not re-read the report.
+
+As the report file shares its inode with the stored object (and possibly the reports of other
+sessions and cache entries) a report must never be rewritten in place.  Writers either replace
+the report (write a temporary file and os.replace() it) or first remove it with releaseReport().
+The inode of the report is recorded with its digests so that a replaced report is detected.
+
+Objects no longer linked from any session (or other cache) are removed by purge(), which is
+also run by add() at most once in each retention period in a process.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+# Time of the last purge in this process
+_purgeD = {"time": time.time()}
+_purgeLock = threading.Lock()
+
+
+def getFileDigests(filePath, blockSize=1024 * 1024):
+    """Return d = {"sha256": hex digest, "md5": hex digest, "size": bytes} of the input file."""
+    sha = hashlib.sha256()
+    md5 = hashlib.md5()  # noqa: S324
+    size = 0
+    with open(filePath, "rb") as ifh:
+        for chunk in iter(lambda: ifh.read(blockSize), b""):
+            sha.update(chunk)
+            md5.update(chunk)
+            size += len(chunk)
+    return {"sha256": sha.hexdigest(), "md5": md5.hexdigest(), "size": size}
+
+
+def releaseReport(reportPath):
+    """Remove the report file so that it may be written in place without changing the stored object it is linked to."""
+    try:
+        os.remove(reportPath)
+    except OSError:
+        pass
+
+
+class ContentRequestReportStore(object):
+    """
+    Manage the content-addressed store of report files.
+
+    """
+
+    def __init__(self, storePath=None, retainSeconds=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        #
+        self.__storePath = storePath if storePath else self.__cI.get("SITE_WS_CONTENT_REPORT_STORE_PATH")
+        if not self.__storePath:
+            topSessionPath = self.__cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+            if topSessionPath:
+                self.__storePath = os.path.join(topSessionPath, "ws-cache", "objects")
+        # Objects older than this (seconds) are removed once they are no longer linked from a session
+        self.__retainSeconds = float(retainSeconds if retainSeconds is not None else self.__cI.get("SITE_WS_CONTENT_REPORT_STORE_RETAIN_SECONDS", 3600))
+        self.__enabled = self.__setup()
+
+    def __setup(self):
+        if not self.__storePath:
+            return False
+        try:
+            if not os.path.isdir(self.__storePath):
+                os.makedirs(self.__storePath)
+            return os.access(self.__storePath, os.W_OK)
+        except Exception as e:
+            logger.exception("Cannot use report store path %r %s", self.__storePath, str(e))
+        return False
+
+    def isEnabled(self):
+        return self.__enabled
+
+    def __objectPath(self, sha256):
+        return os.path.join(self.__storePath, sha256[:2], sha256)
+
+    def add(self, reportPath):
+        """Add the report file to the store and link the report to the stored object -
+
+        Returns: d = {"sha256", "md5", "size", "inode"} for the report or {} on failure.  The digests are
+                 returned even if the report could not be linked to the store.
+        """
+        try:
+            dD = getFileDigests(reportPath)
+        except Exception as e:
+            logger.exception("Failed reading report %r %s", reportPath, str(e))
+            return {}
+        if not self.__enabled:
+            return dD
+        objPath = self.__objectPath(dD["sha256"])
+        try:
+            objDir = os.path.dirname(objPath)
+            if not os.path.isdir(objDir):
+                os.makedirs(objDir, exist_ok=True)
+            if os.access(objPath, os.R_OK):
+                # Identical content is already stored  -  the report shares the stored object
+                # (the modification time is left unchanged as the object may also be a report cache entry)
+                self.__link(objPath, reportPath)
+                logger.debug("Report %r shares stored object %s", reportPath, dD["sha256"])
+            else:
+                self.__link(reportPath, objPath)
+                self.__writeMetadata(objPath, dD)
+        except OSError as e:
+            # e.g. the session and store paths are on different file systems
+            logger.warning("Report %r not added to the store %s", reportPath, str(e))
+        try:
+            dD["inode"] = os.stat(reportPath).st_ino
+        except OSError:
+            pass
+        #
+        with _purgeLock:
+            doPurge = time.time() - _purgeD["time"] > self.__retainSeconds
+            if doPurge:
+                _purgeD["time"] = time.time()
+        if doPurge:
+            self.purge()
+        return dD
+
+    def getDigests(self, sha256):
+        """Return the digests of the stored object or {} if it is not stored."""
+        try:
+            with open(self.__objectPath(sha256) + ".json", "r") as ifh:
+                return json.load(ifh)
+        except (IOError, OSError, ValueError):
+            pass
+        return {}
+
+    def purge(self, retainSeconds=None):
+        """Remove objects not linked from elsewhere and unused for retainSeconds -  Returns the number removed."""
+        if not self.__enabled:
+            return 0
+        retainSeconds = self.__retainSeconds if retainSeconds is None else retainSeconds
+        now = time.time()
+        nRemoved = 0
+        for objPath in glob.glob(os.path.join(glob.escape(self.__storePath), "??", "*")):
+            if objPath.endswith(".json") or objPath.endswith(".tmp"):
+                continue
+            try:
+                st = os.stat(objPath)
+                if st.st_nlink > 1 or now - st.st_mtime < retainSeconds:
+                    continue
+                os.remove(objPath)
+                if os.access(objPath + ".json", os.F_OK):
+                    os.remove(objPath + ".json")
+                nRemoved += 1
+            except OSError:
+                pass
+        logger.info("Removed %d unreferenced report store objects", nRemoved)
+        return nRemoved
+
+    def __link(self, srcPath, dstPath):
+        """Atomically replace dstPath with a hard link to srcPath."""
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(dstPath))
+        os.close(fd)
+        os.remove(tmpPath)
+        try:
+            os.link(srcPath, tmpPath)
+            os.replace(tmpPath, dstPath)
+        finally:
+            if os.access(tmpPath, os.F_OK):
+                os.remove(tmpPath)
+
+    def __writeMetadata(self, objPath, dD):
+        fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(objPath))
+        with os.fdopen(fd, "w") as ofh:
+            json.dump(dD, ofh)
+        os.replace(tmpPath, objPath + ".json")
@@ -0,0 +1,202 @@
+##
+# File:  ContentRequestReportWriter.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  serialize with the selected JSON backend directly to the report stream
+#   18-Oct-2026 ep  add writeRecord() for NDJSON reports with other record layouts (bulk output)
+#   18-Oct-2026 ep  write to a unique temporary file and reject unrecognized format types
+##
+"""
+Write content reports in the requested output format -
+
+The format type selects the layout and the compression of the report:
+
+   json         a single JSON object {category: [row, ...], ...}
+   ndjson       one line {"category": category, "row": row} for each row
+   json.gz      gzip compressed (also ndjson.gz)
+   json.zst     zstandard compressed (also ndjson.zst)  -  requires the zstandard package
+
+Requests without a format type ('unassigned') are written as JSON.  Other format types are not supported.
+
+Rows are serialized with ContentRequestJsonSerializer in batches and written to the report stream
+as they are produced.  Reports are written to a temporary file (unique to the writer) which replaces
+the report file when complete.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import gzip
+import logging
+import os
+import tempfile
+from itertools import islice
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import ContentRequestJsonSerializer
+
+logger = logging.getLogger()
+
+
+def parseFormatType(formatType):
+    """Return the (layout, compression) of the input format type -
+
+    The layout is 'json' or 'ndjson' and the compression is None, 'gz' or 'zst'.  Unset format
+    types (None or 'unassigned') are uncompressed JSON.  The layout is None for unrecognized format types.
+    """
+    fL = str(formatType).strip().lower().split(".") if formatType is not None else [""]
+    if len(fL) == 1 and fL[0] in ["", "none", "unassigned"]:
+        return "json", None
+    if fL[0] not in ["json", "ndjson"] or len(fL) > 2 or (len(fL) == 2 and fL[1] not in ["gz", "zst"]):
+        return None, None
+    return fL[0], fL[1] if len(fL) == 2 else None
+
+
+def getFormatType(formatType):
+    """Return the normalized form of the input format type (None if it is not recognized)."""
+    layout, compression = parseFormatType(formatType)
+    if layout is None:
+        return None
+    return layout + "." + compression if compression else layout
+
+
+def isFormatSupported(formatType):
+    """Return True if reports can be written in the input format type."""
+    layout, compression = parseFormatType(formatType)
+    return layout is not None and (compression != "zst" or zstandard is not None)
+
+
+class ContentRequestReportWriter(object):
+    """
+    Context manager writing the categories of a content report -
+
+        with ContentRequestReportWriter(reportPath, formatType="ndjson.gz") as wr:
+            wr.writeCategory(catName, rowIterator)
+
+    """
+
+    def __init__(self, reportPath, formatType="json", serializer=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        self.__reportPath = reportPath
+        self.__tmpPath = None
+        self.__layout, self.__compression = parseFormatType(formatType)
+        if self.__layout is None:
+            logger.error("Unsupported report format %r for %r", formatType, reportPath)
+            raise ValueError("Unsupported report format %r" % formatType)
+        self.__isNdJson = self.__layout == "ndjson"
+        self.__gzipLevel = int(self.__cI.get("SITE_WS_CONTENT_REPORT_GZIP_LEVEL", 6))
+        self.__zstdLevel = int(self.__cI.get("SITE_WS_CONTENT_REPORT_ZSTD_LEVEL", 3))
+        self.__serializer = serializer if serializer else ContentRequestJsonSerializer()
+        self.__sepItem = self.__serializer.itemSeparator
+        self.__sepKey = self.__serializer.keySeparator
+        # Rows serialized together in the JSON layout
+        self.__batchSize = int(self.__cI.get("SITE_WS_CONTENT_REPORT_BATCH_SIZE", 1000))
+        #
+        self.__fb = None
+        self.__ofh = None
+        self.__nCategories = 0
+        self.__nRows = 0
+
+    def __enter__(self):
+        if self.__compression == "zst" and zstandard is None:
+            raise ValueError("Report format %s.zst requires the zstandard package" % self.__layout)
+        # Other writers of the same report (e.g. a retried request) use their own temporary file
+        fd, self.__tmpPath = tempfile.mkstemp(prefix=os.path.basename(self.__reportPath) + ".", suffix=".tmp", dir=os.path.dirname(os.path.abspath(self.__reportPath)))
+        self.__fb = os.fdopen(fd, "wb", buffering=256 * 1024)
+        if self.__compression == "gz":
+            # A fixed header time gives identical output for identical content
+            self.__ofh = gzip.GzipFile(fileobj=self.__fb, mode="wb", compresslevel=self.__gzipLevel, mtime=0)
+        elif self.__compression == "zst":
+            self.__ofh = zstandard.ZstdCompressor(level=self.__zstdLevel).stream_writer(self.__fb)
+        else:
+            self.__ofh = self.__fb
+        if not self.__isNdJson:
+            self.__ofh.write(b"{")
+        return self
+
+    def __exit__(self, excType, excValue, tb):
+        try:
+            if excType is None and not self.__isNdJson:
+                self.__ofh.write(b"}")
+            self.__ofh.close()
+            self.__fb.close()
+        except Exception as e:
+            logger.exception("Failing to close report %r %s", self.__reportPath, str(e))
+            excType = type(e)
+        if excType is None:
+            os.replace(self.__tmpPath, self.__reportPath)
+            logger.debug("Wrote %d categories %d rows to %r with %s", self.__nCategories, self.__nRows, self.__reportPath, self.__serializer.getName())
+        elif os.access(self.__tmpPath, os.W_OK):
+            os.remove(self.__tmpPath)
+        return False
+
+    def writeCategory(self, catName, rowIterator):
+        """Write the rows of a category  -  Returns the number of rows written."""
+        nRows = 0
+        dumps = self.__serializer.dumps
+        write = self.__ofh.write
+        if self.__isNdJson:
+            for row in rowIterator:
+                write(dumps({"category": catName, "row": row}))
+                write(b"\n")
+                nRows += 1
+        else:
+            self.__writeKey(catName)
+            write(b"[")
+            # A batch of rows is serialized as a list in one call and written without the brackets
+            it = iter(rowIterator)
+            while True:
+                rowList = list(islice(it, self.__batchSize))
+                if not rowList:
+                    break
+                if nRows:
+                    write(self.__sepItem)
+                write(dumps(rowList)[1:-1])
+                nRows += len(rowList)
+            write(b"]")
+        self.__nCategories += 1
+        self.__nRows += nRows
+        return nRows
+
+    def writeContent(self, rD):
+        """Write a report dictionary {category: [row, ...], ...}  -  other values are written unchanged."""
+        for catName, value in rD.items():
+            if isinstance(value, list):
+                self.writeCategory(catName, value)
+                continue
+            if self.__isNdJson:
+                self.__ofh.write(self.__serializer.dumps({"category": catName, "row": value}))
+                self.__ofh.write(b"\n")
+            else:
+                self.__writeKey(catName)
+                self.__ofh.write(self.__serializer.dumps(value))
+            self.__nCategories += 1
+        return self.__nRows
+
+    def writeRecord(self, obj):
+        """Write obj as one line of an NDJSON report."""
+        if not self.__isNdJson:
+            raise ValueError("Records are only written to NDJSON reports")
+        self.__ofh.write(self.__serializer.dumps(obj))
+        self.__ofh.write(b"\n")
+        self.__nRows += 1
+
+    def __writeKey(self, catName):
+        if self.__nCategories:
+            self.__ofh.write(self.__sepItem)
+        self.__ofh.write(self.__serializer.dumps(catName))
+        self.__ofh.write(self.__sepKey)
+
+    def getRowCount(self):
+        return self.__nRows
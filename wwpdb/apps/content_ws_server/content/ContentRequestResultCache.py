@@ -0,0 +1,239 @@
+##
+# File:  ContentRequestResultCache.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+#   18-Oct-2026 ep  parse the per content type time-to-live setting and remove lock files of purged entries
+##
+"""
+Shared cache of summary content report files -
+
+Summary reports are the same for every caller.  Report files are cached by
+(content type, query site, content definition hash, format) in a cache directory shared
+by the consumer instances on a host and are served into new sessions by hard link (or copy)
+until they are older than the time-to-live for the content type.  Purging an entry also
+removes its lock file unless the lock is held.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from oslo_concurrency import lockutils
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+#
+logger = logging.getLogger()
+
+# Per-process counters
+_statD = {"hits": 0, "misses": 0, "stores": 0, "purged": 0}
+_statLock = threading.Lock()
+
+
+class ContentRequestResultCache(object):
+    """
+    Manage the shared cache of summary content report files.
+
+    """
+
+    def __init__(self, cachePath=None, defaultTtl=None, ttlD=None):
+        self.__siteId = getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        #
+        self.__cachePath = cachePath if cachePath else self.__cI.get("SITE_WS_CONTENT_RESULT_CACHE_PATH")
+        if not self.__cachePath:
+            topSessionPath = self.__cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+            if topSessionPath:
+                self.__cachePath = os.path.join(topSessionPath, "ws-cache", "reports")
+        # Time-to-live in seconds  -  per content type  d[contentType] = seconds  otherwise the default
+        self.__defaultTtl = float(defaultTtl if defaultTtl is not None else self.__cI.get("SITE_WS_CONTENT_RESULT_CACHE_TTL", 300))
+        self.__ttlD = self.__getTtlDict(ttlD if ttlD is not None else self.__cI.get("SITE_WS_CONTENT_RESULT_CACHE_TTL_DICT", {}))
+        self.__enabled = self.__setup()
+
+    def __setup(self):
+        if not self.__cachePath:
+            return False
+        try:
+            if not os.path.isdir(self.__cachePath):
+                os.makedirs(self.__cachePath)
+            return os.access(self.__cachePath, os.W_OK)
+        except Exception as e:
+            logger.exception("Cannot use report cache path %r %s", self.__cachePath, str(e))
+        return False
+
+    def __getTtlDict(self, ttlD):
+        """Return the per content type time-to-live dictionary -  site configuration values are JSON strings."""
+        if isinstance(ttlD, str):
+            try:
+                ttlD = json.loads(ttlD) if ttlD.strip() else {}
+            except ValueError as e:
+                logger.warning("Malformed report cache time-to-live setting %r %s", ttlD, str(e))
+                return {}
+        if not isinstance(ttlD, dict):
+            logger.warning("Report cache time-to-live setting is not a dictionary %r", ttlD)
+            return {}
+        return ttlD
+
+    def isEnabled(self):
+        return self.__enabled
+
+    def getTtl(self, contentType):
+        """Return the time-to-live in seconds for reports of the input content type (0 disables caching)."""
+        try:
+            return float(self.__ttlD.get(contentType, self.__defaultTtl))
+        except (TypeError, ValueError):
+            logger.warning("Bad report cache time-to-live for %r %r", contentType, self.__ttlD.get(contentType))
+            return self.__defaultTtl
+
+    def getKey(self, contentType, querySite, definitionHash, formatType="json"):
+        kS = json.dumps([contentType, querySite, definitionHash, formatType])
+        return hashlib.sha256(kS.encode("utf-8")).hexdigest()
+
+    def __entryPath(self, contentType, key):
+        return os.path.join(self.__cachePath, "%s.%s" % (contentType, key))
+
+    def __lockName(self, key):
+        return "wsreportcache." + key
+
+    def lock(self, key):
+        """Return an inter-process lock for computing the report for the input key."""
+        return lockutils.lock(self.__lockName(key), external=True, lock_path=self.__cachePath)
+
+    def __removeLock(self, key):
+        """Remove the lock file for the input key unless the lock is held -  Returns True if removed.
+
+        A process that opened the lock file before it is removed may still lock the old file, so
+        at worst one report is computed twice.
+        """
+        try:
+            with lockutils.lock(self.__lockName(key), external=True, lock_path=self.__cachePath, do_log=False, blocking=False):
+                os.remove(os.path.join(self.__cachePath, self.__lockName(key)))
+            return True
+        except (lockutils.AcquireLockFailedException, OSError):
+            pass
+        return False
+
+    def fetch(self, contentType, key, dstPath):
+        """Serve the cached report for the input key to dstPath -
+
+        Returns: True for a cache hit or False otherwise
+        """
+        ttl = self.getTtl(contentType)
+        if not self.__enabled or ttl <= 0:
+            return False
+        fp = self.__entryPath(contentType, key)
+        try:
+            age = time.time() - os.stat(fp).st_mtime
+            if age <= ttl and self.__linkOrCopy(fp, dstPath):
+                self.__count("hits")
+                logger.info("Report cache hit for %r (%.1f seconds old)", contentType, age)
+                return True
+        except OSError:
+            pass
+        self.__count("misses")
+        return False
+
+    def store(self, contentType, key, srcPath):
+        """Store the report file srcPath for the input key -  Returns True for success or False otherwise."""
+        if not self.__enabled or self.getTtl(contentType) <= 0:
+            return False
+        tmpPath = None
+        try:
+            fd, tmpPath = tempfile.mkstemp(suffix=".tmp", dir=self.__cachePath)
+            os.close(fd)
+            os.remove(tmpPath)
+            if not self.__linkOrCopy(srcPath, tmpPath):
+                return False
+            # Sessions holding links to a previous entry keep their own copy of the data
+            os.replace(tmpPath, self.__entryPath(contentType, key))
+            tmpPath = None
+            self.__count("stores")
+            return True
+        except Exception as e:
+            logger.exception("Failed storing report cache entry for %r %s", contentType, str(e))
+        finally:
+            if tmpPath and os.access(tmpPath, os.F_OK):
+                os.remove(tmpPath)
+        return False
+
+    def purge(self, contentType=None, expiredOnly=False):
+        """Remove the cached reports (for the input content type) and their lock files -
+
+        Lock files without a cache entry are removed by a purge of all content types (if older than
+        the default time-to-live for expiredOnly).
+
+        Returns: the number of entries removed
+        """
+        if not self.__enabled:
+            return 0
+        pattern = "%s.*" % contentType if contentType else "*.*"
+        nRemoved = 0
+        now = time.time()
+        keyS = set()
+        lockKeyL = []
+        for fp in glob.glob(os.path.join(glob.escape(self.__cachePath), pattern)):
+            fn = os.path.basename(fp)
+            if fn.startswith("wsreportcache."):
+                lockKeyL.append((fp, fn[len("wsreportcache.") :]))
+                continue
+            if fn.endswith(".tmp") or fn.endswith("-lock"):
+                continue
+            ct, key = fn.rsplit(".", 1)
+            try:
+                if expiredOnly and now - os.stat(fp).st_mtime <= self.getTtl(ct):
+                    keyS.add(key)
+                    continue
+                os.remove(fp)
+                nRemoved += 1
+                self.__removeLock(key)
+            except OSError:
+                keyS.add(key)
+        #
+        if not contentType:
+            for fp, key in lockKeyL:
+                if key in keyS or not os.access(fp, os.F_OK):
+                    continue
+                try:
+                    if expiredOnly and now - os.stat(fp).st_mtime <= self.__defaultTtl:
+                        continue
+                except OSError:
+                    continue
+                self.__removeLock(key)
+        self.__count("purged", nRemoved)
+        return nRemoved
+
+    def getStats(self):
+        """Return the report cache hit, miss, store and purge counts for this process."""
+        with _statLock:
+            return dict(_statD)
+
+    def __count(self, ky, n=1):
+        with _statLock:
+            _statD[ky] += n
+
+    def __linkOrCopy(self, srcPath, dstPath):
+        try:
+            if os.access(dstPath, os.F_OK):
+                os.remove(dstPath)
+            os.link(srcPath, dstPath)
+            return True
+        except OSError:
+            pass
+        try:
+            shutil.copyfile(srcPath, dstPath)
+            return True
+        except (IOError, OSError) as e:
+            logger.error("Failed copying %r to %r %s", srcPath, dstPath, str(e))
+        return False
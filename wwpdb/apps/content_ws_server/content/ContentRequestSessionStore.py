@@ -0,0 +1,69 @@
+##
+# File:  ContentRequestSessionStore.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Session data store safe for concurrent requests in one consumer process -
+
+ServiceDataStore takes its external lock in the process-wide default lock path which is
+reset by each new store.  With several messages running on threads in one consumer the lock
+file may then be created in the directory of another session, and consumers updating the
+same session no longer exclude each other.  This store takes the same lock file
+(<session path>/sessiondatastore.lock) with an explicit lock path, so it also excludes
+ServiceDataStore instances in the web application and other consumers.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import logging
+
+from oslo_concurrency import lockutils
+from wwpdb.utils.ws_utils.ServiceDataStore import ServiceDataStore
+
+logger = logging.getLogger()
+
+# Lock file name used by ServiceDataStore
+_LOCK_NAME = "sessiondatastore.lock"
+
+
+class ContentRequestSessionStore(ServiceDataStore):
+    """
+    Session data store with the external lock taken in the session directory.
+
+    """
+
+    def __init__(self, sessionPath, prefix=None):
+        super(ContentRequestSessionStore, self).__init__(sessionPath, prefix=prefix)
+        self.__sessionPath = sessionPath
+
+    def __locked(self, method, *args, **kwargs):
+        """Run the undecorated ServiceDataStore method holding the session lock."""
+        with lockutils.lock(_LOCK_NAME, external=True, lock_path=self.__sessionPath, do_log=False):
+            return getattr(ServiceDataStore, method).__wrapped__(self, *args, **kwargs)
+
+    def get(self, key):
+        return self.__locked("get", key)
+
+    def getDictionary(self):
+        return self.__locked("getDictionary")
+
+    def set(self, key, value, overWrite=True):
+        return self.__locked("set", key, value, overWrite=overWrite)
+
+    def update(self, uDict):
+        return self.__locked("update", uDict)
+
+    def updateAll(self, uDict):
+        return self.__locked("updateAll", uDict)
+
+    def append(self, key, value):
+        return self.__locked("append", key, value)
+
+    def extend(self, key, valueList):
+        return self.__locked("extend", key, valueList)
@@ -6,16 +6,22 @@
 #
 #  Updates:
 #  18-Feb-2017  jdw switch to using default ampq connection url
+#  18-Oct-2026  ep  process several messages concurrently in one consumer with thread and process worker pools
+#  18-Oct-2026  ep  note the session store locking required by requests run on threads
+#  18-Oct-2026  ep  start worker processes from a fork server created before the broker connection
 #
 ##
 
 import platform
 
+import functools
 import json
 import logging
+import multiprocessing
 import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from argparse import ArgumentParser as ArgParser
 from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
 from wwpdb.utils.detach.DetachedProcessBase import DetachedProcessBase
@@ -32,40 +38,157 @@ logging.basicConfig(
 )
 
 
+def runContentRequest(msgBody):
+    """Run the content request in the input message body -  Returns False for an unreadable message."""
+    try:
+        # logger.debug("Message body %r" % msgBody)
+        pD = json.loads(msgBody)
+    except Exception as e:
+        logger.error("Message format error - discarding")
+        logger.exception(e)
+        return False
+    #
+    successFlag = True
+    try:
+        # logger.info("Message body %r", pD)
+        v = ContentRequest()
+        v.setup(pD)
+        v.run()
+    except Exception as e:
+        logger.exception("Failed service execution with message %r", pD)
+        logger.exception(e)
+
+    return successFlag
+
+
+def getWorkerContext():
+    """Return the start context for worker processes -  workers are not forked from the threaded consumer."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def initWorkerProcess(logLevel, logFilePathList):
+    """Worker process initializer -  log to the log files of the consumer."""
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+    for logFilePath in logFilePathList:
+        handler = logging.FileHandler(logFilePath)
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
+    logger.setLevel(logLevel)
+
+
 class MessageConsumer(MessageConsumerBase):
-    # def __init__(self, amqpUrl):
-    #     super(MessageConsumer, self).__init__(amqpUrl)
+    """Content request consumer -
+
+    With more than one worker thread or any worker processes, up to prefetchCount messages are
+    run concurrently.  Entry reports parsed from local PDBx files are run in the process pool
+    (when configured) and proxy and database requests in the thread pool.  Messages are
+    acknowledged once their request completes.  Requests lock their session store in the session
+    directory (ContentRequestSessionStore) as the process default lock path is shared by the threads.
+    Worker processes are started from a fork server (or spawned) so they do not inherit the broker
+    connection or locks held by the consumer threads.
+    """
+
+    def __init__(self, amqpUrl, numThreads=None, numProcesses=None, prefetchCount=None):
+        super(MessageConsumer, self).__init__(amqpUrl)
+        cI = ConfigInfo(getSiteId(defaultSiteId=None))
+        self.__numThreads = int(numThreads if numThreads is not None else cI.get("SITE_WS_CONTENT_CONSUMER_THREADS", 1))
+        self.__numProcesses = int(numProcesses if numProcesses is not None else cI.get("SITE_WS_CONTENT_CONSUMER_PROCESSES", 0))
+        self.__prefetchCount = int(prefetchCount if prefetchCount is not None else cI.get("SITE_WS_CONTENT_CONSUMER_PREFETCH", max(1, self.__numThreads + self.__numProcesses)))
+        self.__queueName = None
+        self.__threadPool = None
+        self.__processPool = None
+
+    def isConcurrent(self):
+        return self.__numThreads > 1 or self.__numProcesses > 0
+
+    def setQueue(self, queueName, routingKey):
+        self.__queueName = queueName
+        super(MessageConsumer, self).setQueue(queueName, routingKey)
 
     def workerMethod(self, msgBody, deliveryTag=None):
+        return runContentRequest(msgBody)
+
+    def run(self):
+        """Consume messages -  messages are run concurrently in the worker pools if configured."""
+        if not self.isConcurrent():
+            super(MessageConsumer, self).run()
+            return
+        self.startPools()
         try:
-            # logger.debug("Message body %r" % msgBody)
-            pD = json.loads(msgBody)
-        except Exception as e:
-            logger.error("Message format error - discarding")
-            logger.exception(e)
-            return False
-        #
-        successFlag = True
+            self._connection = self.connect()
+            self._channel = self._connection.channel()
+            self._channel.queue_declare(queue=self.__queueName, durable=True)
+            self._channel.basic_qos(prefetch_count=self.__prefetchCount)
+            self._channel.basic_consume(queue=self.__queueName, on_message_callback=self.onMessage)
+            logger.info("Consuming with %d threads %d processes prefetch %d", self.__numThreads, self.__numProcesses, self.__prefetchCount)
+            self._channel.start_consuming()
+        finally:
+            self.stopPools()
+
+    def startPools(self):
+        """Create the worker pools -  called before the broker connection is opened."""
+        if self.__processPool is None and self.__numProcesses > 0:
+            logFilePathList = [h.baseFilename for h in logger.handlers if isinstance(h, logging.FileHandler)]
+            self.__processPool = ProcessPoolExecutor(
+                max_workers=self.__numProcesses, mp_context=getWorkerContext(), initializer=initWorkerProcess, initargs=(logger.level, logFilePathList)
+            )
+            # Start the fork server now while this process has no other threads
+            self.__processPool.submit(os.getpid).result()
+        if self.__threadPool is None:
+            self.__threadPool = ThreadPoolExecutor(max_workers=max(1, self.__numThreads))
+
+    def stopPools(self, wait=True):
+        for pool in (self.__threadPool, self.__processPool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        self.__threadPool = None
+        self.__processPool = None
+
+    def selectPool(self, msgBody):
+        """Return the worker pool for the input message -  PDBx parsing is run in the process pool."""
+        if self.__processPool is not None:
+            try:
+                pD = json.loads(msgBody)
+                if pD.get("request_content_type", "").startswith("report-entry-") and not pD.get("session_proxy_url"):
+                    return self.__processPool
+            except Exception:
+                pass
+        return self.__threadPool
+
+    def onMessage(self, unused_channel, basic_deliver, properties, body):
+        if not self.isConcurrent():
+            super(MessageConsumer, self).onMessage(unused_channel, basic_deliver, properties, body)
+            return
+        deliveryTag = basic_deliver.delivery_tag
+        logger.info("Received message # %s from %s", deliveryTag, properties.app_id)
         try:
-            # logger.info("Message body %r", pD)
-            v = ContentRequest()
-            v.setup(pD)
-            v.run()
+            future = self.selectPool(body).submit(runContentRequest, body)
+            future.add_done_callback(functools.partial(self.__onDone, deliveryTag))
         except Exception as e:
-            logger.exception("Failed service execution with message %r", pD)
-            logger.exception(e)
+            logger.exception("Worker submission failing for message # %s %s", deliveryTag, str(e))
+            self.acknowledgeMessage(deliveryTag)
 
-        return successFlag
+    def __onDone(self, deliveryTag, future):
+        if future.exception() is not None:
+            logger.error("Worker failing for message # %s with %r", deliveryTag, future.exception())
+        logger.info("Done task # %s", deliveryTag)
+        try:
+            # The channel may only be used from the connection thread
+            self._connection.add_callback_threadsafe(functools.partial(self.acknowledgeMessage, deliveryTag))
+        except Exception as e:
+            logger.exception("Failing to acknowledge message # %s %s", deliveryTag, str(e))
 
 
 class MessageConsumerWorker(object):
-    def __init__(self):
-        self.__setup()
+    def __init__(self, numThreads=None, numProcesses=None, prefetchCount=None):
+        self.__setup(numThreads, numProcesses, prefetchCount)
 
-    def __setup(self):
+    def __setup(self, numThreads, numProcesses, prefetchCount):
         mqc = MessageQueueConnection()
         url = mqc._getDefaultConnectionUrl()  # pylint: disable=protected-access
-        self.__mc = MessageConsumer(amqpUrl=url)
+        self.__mc = MessageConsumer(amqpUrl=url, numThreads=numThreads, numProcesses=numProcesses, prefetchCount=prefetchCount)
         self.__mc.setQueue(queueName=get_queue_name(), routingKey=get_routing_key())
         self.__mc.setExchange(exchange=get_exchange_name(), exchangeType=get_exchange_topic())
         #
@@ -107,6 +230,9 @@ class MyDetachedProcess(DetachedProcessBase):
         wrkDir="/",
         gid=None,
         uid=None,
+        numThreads=None,
+        numProcesses=None,
+        prefetchCount=None,
     ):
         super(MyDetachedProcess, self).__init__(
             pidFile=pidFile,
@@ -117,7 +243,7 @@ class MyDetachedProcess(DetachedProcessBase):
             gid=gid,
             uid=uid,
         )
-        self.__mcw = MessageConsumerWorker()
+        self.__mcw = MessageConsumerWorker(numThreads=numThreads, numProcesses=numProcesses, prefetchCount=prefetchCount)
 
     def run(self):
         logger.info("STARTING detached run method")
@@ -198,6 +324,27 @@ def main():
         dest="instanceNo",
         help="Instance number [1-n]",
     )
+    parser.add_argument(
+        "--threads",
+        default=None,
+        type=int,
+        dest="numThreads",
+        help="Number of worker threads (default: SITE_WS_CONTENT_CONSUMER_THREADS or 1)",
+    )
+    parser.add_argument(
+        "--processes",
+        default=None,
+        type=int,
+        dest="numProcesses",
+        help="Number of worker processes for PDBx parsing (default: SITE_WS_CONTENT_CONSUMER_PROCESSES or 0)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        default=None,
+        type=int,
+        dest="prefetchCount",
+        help="Number of unacknowledged messages held by the consumer (default: threads + processes)",
+    )
     #
     # (options, args) = parser.parse_args()
 
@@ -238,6 +385,9 @@ def main():
         stdout=stdoutFilePath,
         stderr=stderrFilePath,
         wrkDir=wsLogDirPath,
+        numThreads=args.numThreads,
+        numProcesses=args.numProcesses,
+        prefetchCount=args.prefetchCount,
     )
 
     if args.startOp:
@@ -0,0 +1,216 @@
+##
+# File:  ModelGenerateService.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Pre-warmed model file generation from the deposition system -
+
+A long-lived server initializes Django and imports the deposition model generator once.
+Each generate job received over a local (Unix domain) socket is run in a process forked
+from the initialized server, so a job does not pay the interpreter and Django start up.
+Jobs are killed after their timeout as with the generate.sh script they replace.
+
+The protocol is one JSON line in each direction:
+
+    request   {"site_id": ..., "dataset_id": ..., "session_path": ..., "timeout": seconds}
+    response  {"status": "ok" | "failed" | "timeout" | "unsupported"}
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+
+logger = logging.getLogger()
+
+
+def getModelGenerateSocketPath():
+    """Return the path of the model generation server socket or None if it is not configured."""
+    cI = ConfigInfo(getSiteId(defaultSiteId=None))
+    socketPath = cI.get("SITE_WS_CONTENT_MODEL_GENERATE_SOCKET")
+    if not socketPath:
+        topSessionPath = cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+        if topSessionPath:
+            socketPath = os.path.join(topSessionPath, "ws-cache", "model-generate.sock")
+    return socketPath
+
+
+def loadDepuiGenerator():
+    """Initialize Django for the deposition system and return a method generate(dataSetId, sessionPath)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wwpdb.apps.deposit.settings")
+    topPythonDir = os.environ.get("TOP_WWPDB_PYTHON_DIR")
+    if topPythonDir:
+        sys.path.insert(0, os.path.join(topPythonDir, "wwpdb", "apps", "deposit"))
+    import django  # pylint: disable=import-outside-toplevel,import-error
+
+    django.setup()
+    from wwpdb.apps.deposit.depui.generate_model import generate_model  # pylint: disable=import-outside-toplevel,import-error
+
+    def generate(dataSetId, sessionPath):
+        generate_model(depID=dataSetId, sessionDir=sessionPath).write_out_cif_from_depui()
+
+    return generate
+
+
+def _runJob(generateFunc, dataSetId, sessionPath, logPath):
+    """Generate job run in the forked process  -  output goes to the session log file."""
+    os.setsid()
+    ofh = open(logPath, "a")  # pylint: disable=consider-using-with
+    os.dup2(ofh.fileno(), 1)
+    os.dup2(ofh.fileno(), 2)
+    sys.stdout = sys.stderr = ofh
+    exitCode = 0
+    try:
+        generateFunc(dataSetId, sessionPath)
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        exitCode = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exitCode)  # pylint: disable=protected-access
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            rD = self.server.generator.runRequest(json.loads(self.rfile.readline().decode("utf-8")))
+        except Exception as e:
+            logger.exception("Failing model generate request %s", str(e))
+            rD = {"status": "failed"}
+        self.wfile.write((json.dumps(rD) + "\n").encode("utf-8"))
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ModelGenerateServer(object):
+    """
+    Run model generate jobs in processes forked from this (pre-warmed) process.
+
+    """
+
+    def __init__(self, socketPath, generateFunc, siteId=None, maxWorkers=None):
+        self.__siteId = siteId if siteId else getSiteId(defaultSiteId=None)
+        self.__cI = ConfigInfo(self.__siteId)
+        self.__socketPath = socketPath
+        self.__generateFunc = generateFunc
+        # Max number of concurrent generate jobs
+        maxWorkers = int(maxWorkers if maxWorkers is not None else self.__cI.get("SITE_WS_CONTENT_MODEL_GENERATE_WORKERS", 4))
+        self.__slots = threading.BoundedSemaphore(max(1, maxWorkers))
+        self.__ctx = multiprocessing.get_context("fork")
+        self.__server = None
+
+    def serve_forever(self):
+        """Listen on the socket and serve requests until shutdown()."""
+        sockDir = os.path.dirname(self.__socketPath)
+        if sockDir and not os.path.isdir(sockDir):
+            os.makedirs(sockDir)
+        if os.path.exists(self.__socketPath):
+            os.remove(self.__socketPath)
+        self.__server = _ThreadingUnixServer(self.__socketPath, _RequestHandler)
+        self.__server.generator = self
+        logger.info("Model generate server for %r listening on %r", self.__siteId, self.__socketPath)
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.__server.server_close()
+            if os.path.exists(self.__socketPath):
+                os.remove(self.__socketPath)
+
+    def shutdown(self):
+        if self.__server:
+            self.__server.shutdown()
+
+    def runRequest(self, rqD):
+        """Run the generate job in the request dictionary  -  Returns the response dictionary."""
+        dataSetId = str(rqD.get("dataset_id", ""))
+        sessionPath = rqD.get("session_path")
+        timeout = float(rqD.get("timeout", 30))
+        # Django settings are those of the site this server was started for
+        if rqD.get("site_id") != self.__siteId:
+            return {"status": "unsupported"}
+        if not dataSetId or len(dataSetId) > 30 or os.sep in dataSetId or not sessionPath or not os.path.isdir(sessionPath):
+            return {"status": "failed"}
+        #
+        startTime = time.time()
+        if not self.__slots.acquire(timeout=timeout):
+            logger.info("No worker available for %r in (%.1f seconds)", dataSetId, timeout)
+            return {"status": "timeout"}
+        try:
+            status = self.__runJob(dataSetId, sessionPath, max(0.0, timeout - (time.time() - startTime)))
+        finally:
+            self.__slots.release()
+        logger.info("Generated model for %r status %r in (%.2f seconds)", dataSetId, status, time.time() - startTime)
+        return {"status": status}
+
+    def __runJob(self, dataSetId, sessionPath, timeout):
+        logPath = os.path.join(sessionPath, "generate.log")
+        proc = self.__ctx.Process(target=_runJob, args=(self.__generateFunc, dataSetId, sessionPath, logPath))
+        proc.start()
+        proc.join(timeout)
+        if proc.exitcode is None:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                proc.kill()
+            proc.join()
+            with open(logPath, "a") as ofh:
+                ofh.write("Execution terminated by timeout %d (seconds)\n" % timeout)
+            return "timeout"
+        return "ok" if proc.exitcode == 0 else "failed"
+
+
+class ModelGenerateClient(object):
+    """
+    Submit generate jobs to the model generation server.
+
+    """
+
+    def __init__(self, socketPath=None):
+        self.__socketPath = socketPath if socketPath else getModelGenerateSocketPath()
+
+    def generate(self, siteId, dataSetId, sessionPath, timeout=30):
+        """Generate the model file for the dataset in the session directory -
+
+        Returns: the job status 'ok', 'failed', 'timeout' or 'unsupported' or None if no server is available
+        """
+        if not self.__socketPath or not os.path.exists(self.__socketPath):
+            return None
+        rqD = {"site_id": siteId, "dataset_id": dataSetId, "session_path": sessionPath, "timeout": timeout}
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout + 5)
+            sock.connect(self.__socketPath)
+        except OSError as e:
+            logger.warning("Model generate server %r not available %s", self.__socketPath, str(e))
+            return None
+        try:
+            sock.sendall((json.dumps(rqD) + "\n").encode("utf-8"))
+            with sock.makefile("rb") as ifh:
+                return json.loads(ifh.readline().decode("utf-8"))["status"]
+        except socket.timeout:
+            logger.error("Model generate for %r timed out", dataSetId)
+            return "timeout"
+        except Exception as e:
+            logger.exception("Model generate for %r failing %s", dataSetId, str(e))
+        finally:
+            sock.close()
+        return "failed"
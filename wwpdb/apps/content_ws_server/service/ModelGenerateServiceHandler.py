@@ -0,0 +1,162 @@
+#
+# File:  ModelGenerateServiceHandler.py
+# Date:  18-Oct-2026
+#
+#  Controlling wrapper for the pre-warmed model generation server -
+#
+#  Updates:
+#
+##
+
+import platform
+
+import logging
+import os
+import sys
+import time
+from argparse import ArgumentParser as ArgParser
+from wwpdb.utils.config.ConfigInfo import ConfigInfo, getSiteId
+from wwpdb.utils.detach.DetachedProcessBase import DetachedProcessBase
+
+from wwpdb.apps.content_ws_server.service.ModelGenerateService import ModelGenerateServer, getModelGenerateSocketPath, loadDepuiGenerator
+
+logger = logging.getLogger()
+logging.basicConfig(
+    level=logging.DEBUG,
+    format="\n%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s",
+)
+
+
+class MyDetachedProcess(DetachedProcessBase):
+    """This class implements the run() method of the DetachedProcessBase() utility class for the model generation server."""
+
+    def __init__(
+        self,
+        pidFile="/tmp/DetachedProcessBase.pid",
+        stdin=os.devnull,
+        stdout=os.devnull,
+        stderr=os.devnull,
+        wrkDir="/",
+        gid=None,
+        uid=None,
+        socketPath=None,
+        maxWorkers=None,
+    ):
+        super(MyDetachedProcess, self).__init__(
+            pidFile=pidFile,
+            stdin=stdin,
+            stdout=stdout,
+            stderr=stderr,
+            wrkDir=wrkDir,
+            gid=gid,
+            uid=uid,
+        )
+        self.__socketPath = socketPath
+        self.__maxWorkers = maxWorkers
+        self.__server = None
+
+    def run(self):
+        logger.info("STARTING detached run method")
+        startTime = time.time()
+        try:
+            # Django and the deposition system are initialized once in the detached process
+            generateFunc = loadDepuiGenerator()
+            logger.info("Initialized model generator in (%.2f seconds)", time.time() - startTime)
+            self.__server = ModelGenerateServer(self.__socketPath, generateFunc, maxWorkers=self.__maxWorkers)
+            self.__server.serve_forever()
+        except Exception as e:
+            logger.exception("Model generate server failing %s", str(e))
+
+    def suspend(self):
+        logger.info("SUSPENDING detached process")
+        try:
+            if self.__server:
+                self.__server.shutdown()
+        except Exception as e:
+            logger.exception(e)
+
+
+def main():
+    siteId = getSiteId(defaultSiteId=None)
+    cI = ConfigInfo(siteId)
+    topSessionPath = cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH")
+    #
+    myFullHostName = platform.uname()[1]
+    myHostName = str(myFullHostName.split(".")[0]).lower()
+    #
+    wsLogDirPath = os.path.join(topSessionPath, "ws-logs")
+    if not os.path.exists(wsLogDirPath):
+        os.makedirs(wsLogDirPath)
+
+    #  Setup logging  --
+    now = time.strftime("%Y-%m-%d", time.localtime())
+
+    description = "Model generation service handler"
+    parser = ArgParser(description=description)
+
+    parser.add_argument("--start", default=False, action="store_true", dest="startOp", help="Start model generation server")
+    parser.add_argument("--stop", default=False, action="store_true", dest="stopOp", help="Stop model generation server")
+    parser.add_argument("--restart", default=False, action="store_true", dest="restartOp", help="Restart model generation server")
+    parser.add_argument("--status", default=False, action="store_true", dest="statusOp", help="Report model generation server status")
+    parser.add_argument("--debug", default=1, type=int, dest="debugLevel", help="Debug level (default: 1 [0-3]")
+    parser.add_argument(
+        "--workers",
+        default=None,
+        type=int,
+        dest="maxWorkers",
+        help="Number of concurrent generate jobs (default: SITE_WS_CONTENT_MODEL_GENERATE_WORKERS or 4)",
+    )
+    args = parser.parse_args()
+
+    #
+    pidFilePath = os.path.join(wsLogDirPath, myHostName + "_model_generate.pid")
+    stdoutFilePath = os.path.join(wsLogDirPath, myHostName + "_model_generate_stdout.log")
+    stderrFilePath = os.path.join(wsLogDirPath, myHostName + "_model_generate_stderr.log")
+    wfLogFilePath = os.path.join(wsLogDirPath, myHostName + "_model_generate_" + now + ".log")
+    #
+    logger = logging.getLogger(name="root")  # pylint: disable=redefined-outer-name
+    logging.captureWarnings(True)
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s]-%(module)s.%(funcName)s: %(message)s")
+    handler = logging.FileHandler(wfLogFilePath)
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    #
+    lt = time.strftime("%Y %m %d %H:%M:%S", time.localtime())
+    #
+    if args.debugLevel > 2:
+        logger.setLevel(logging.DEBUG)
+    elif args.debugLevel > 0:
+        logger.setLevel(logging.INFO)
+    else:
+        logger.setLevel(logging.ERROR)
+    #
+    myDP = MyDetachedProcess(
+        pidFile=pidFilePath,
+        stdout=stdoutFilePath,
+        stderr=stderrFilePath,
+        wrkDir=wsLogDirPath,
+        socketPath=getModelGenerateSocketPath(),
+        maxWorkers=args.maxWorkers,
+    )
+
+    if args.startOp:
+        sys.stdout.write("+ModelGenerateServer() starting service at %s\n" % lt)
+        logger.info("ModelGenerateServer() starting service at %s", lt)
+        myDP.start()
+    elif args.stopOp:
+        sys.stdout.write("+ModelGenerateServer() stopping service at %s\n" % lt)
+        logger.info("ModelGenerateServer() stopping service at %s", lt)
+        myDP.stop()
+    elif args.restartOp:
+        sys.stdout.write("+ModelGenerateServer() restarting service at %s\n" % lt)
+        logger.info("ModelGenerateServer() restarting service at %s", lt)
+        myDP.restart()
+    elif args.statusOp:
+        sys.stdout.write("+ModelGenerateServer() reporting status for service at %s\n" % lt)
+        sys.stdout.write(myDP.status())
+    else:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+##
+# File:  SubprocessRunner.py
+# Date:  18-Oct-2026  E. Peisach
+#
+# Update:
+##
+"""
+Run a command in a new process group with a timeout -
+
+The output of the command (stdout and stderr) is written to the log file as it arrives so a
+command producing a lot of output cannot block on a full pipe.  The runner waits on the output
+pipe and, where the platform provides one, a process file descriptor rather than polling, and
+kills the process group when the timeout expires.  The wall clock time, CPU time and peak
+resident memory of the command are reported for profiling.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.07"
+
+import logging
+import os
+import selectors
+import signal
+import subprocess
+import time
+
+logger = logging.getLogger()
+
+
+def _getExitCode(status):
+    """Return the return code (negative signal number if killed) for a wait status."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class SubprocessRunner(object):
+    """
+    Run commands with a timeout and collect their resource usage.
+
+    """
+
+    def __init__(self, timeout=10, logPath=None, blockSize=65536):
+        self.__timeout = timeout
+        self.__logPath = logPath
+        self.__blockSize = blockSize
+        self.__statsD = {}
+
+    def getStats(self):
+        """Return d = {"wall", "cpu_user", "cpu_system", "max_rss_kb", "output_bytes", "returncode", "timed_out"} of the last command."""
+        return dict(self.__statsD)
+
+    def run(self, cmd):
+        """Run the command (a path or an argument list)  -  Returns the return code or None on timeout or failure."""
+        logger.debug("STARTING %r with time out set at %g (seconds)", cmd, self.__timeout)
+        self.__statsD = {"wall": 0.0, "cpu_user": 0.0, "cpu_system": 0.0, "max_rss_kb": 0, "output_bytes": 0, "returncode": None, "timed_out": False}
+        startTime = time.monotonic()
+        deadline = startTime + self.__timeout
+        try:
+            proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=False, close_fds=True, start_new_session=True)
+        except Exception as e:
+            logger.exception("Failed to start %r %s", cmd, str(e))
+            return None
+        #
+        ofh = open(self.__logPath, "ab") if self.__logPath else None  # pylint: disable=consider-using-with
+        pidFd = None
+        sel = selectors.DefaultSelector()
+        try:
+            sel.register(proc.stdout, selectors.EVENT_READ, "output")
+            if hasattr(os, "pidfd_open"):
+                try:
+                    pidFd = os.pidfd_open(proc.pid)
+                    sel.register(pidFd, selectors.EVENT_READ, "exit")
+                except OSError:
+                    pidFd = None
+            exited = False
+            eof = False
+            while not eof or not exited:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.__kill(proc, exited)
+                    break
+                if eof and pidFd is None:
+                    # Output is closed  -  wait for the process without a process file descriptor
+                    try:
+                        proc.wait(remaining)
+                    except subprocess.TimeoutExpired:
+                        continue
+                    break
+                for key, _ in sel.select(remaining):
+                    if key.data == "exit":
+                        exited = True
+                        sel.unregister(key.fileobj)
+                        continue
+                    chunk = os.read(key.fd, self.__blockSize)
+                    if not chunk:
+                        eof = True
+                        sel.unregister(key.fileobj)
+                        continue
+                    self.__statsD["output_bytes"] += len(chunk)
+                    if ofh:
+                        ofh.write(chunk)
+                        ofh.flush()
+                    else:
+                        logger.debug("output %r", chunk)
+            #
+            self.__reap(proc)
+        except Exception as e:
+            logger.exception("Failing running %r %s", cmd, str(e))
+            self.__kill(proc, False)
+            self.__reap(proc)
+            self.__statsD["returncode"] = None
+        finally:
+            sel.close()
+            if pidFd is not None:
+                os.close(pidFd)
+            proc.stdout.close()
+            if ofh:
+                if self.__statsD["timed_out"]:
+                    ofh.write(("Execution terminated by timeout %g (seconds)\n" % self.__timeout).encode("utf-8"))
+                ofh.close()
+        #
+        self.__statsD["wall"] = time.monotonic() - startTime
+        logger.info(
+            "Command %r return code %r wall %.2f s cpu user %.2f s system %.2f s max rss %d KB output %d bytes",
+            cmd,
+            self.__statsD["returncode"],
+            self.__statsD["wall"],
+            self.__statsD["cpu_user"],
+            self.__statsD["cpu_system"],
+            self.__statsD["max_rss_kb"],
+            self.__statsD["output_bytes"],
+        )
+        return None if self.__statsD["timed_out"] else self.__statsD["returncode"]
+
+    def __kill(self, proc, exited):
+        """Kill the process group at the deadline  -  processes left behind by an exited command are also killed."""
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        if not exited:
+            self.__statsD["timed_out"] = True
+            logger.debug("Execution terminated by timeout %g (seconds)", self.__timeout)
+
+    def __reap(self, proc):
+        """Wait for the process and record its return code and resource usage."""
+        if proc.returncode is not None:
+            # Already reaped by Popen.wait()  -  resource usage is not available
+            self.__statsD["returncode"] = proc.returncode
+            return
+        try:
+            _, status, ru = os.wait4(proc.pid, 0)
+        except ChildProcessError:
+            proc.wait()
+            self.__statsD["returncode"] = proc.returncode
+            return
+        proc.returncode = _getExitCode(status)
+        self.__statsD.update({"returncode": proc.returncode, "cpu_user": ru.ru_utime, "cpu_system": ru.ru_stime, "max_rss_kb": ru.ru_maxrss})
@@ -6,6 +6,17 @@
 #   18-Feb-2017 jdw Change search approach for model file -
 #   15-Mar-2017 ep  For model file, invoke DepUI to produce model
 #   16-Mar-2017 jdw Change status tracking to avoid collisions
+#   18-Oct-2026 ep  Accept a comma separated list of entry content types in one request
+#   18-Oct-2026 ep  Read archive and deposit model files in place rather than copying them to the session
+#   18-Oct-2026 ep  Add bulk entry content requests for a list of datasets
+#   18-Oct-2026 ep  Reject report format types that cannot be written on this server
+#   18-Oct-2026 ep  Use the report digest recorded by the consumer for downloads
+#   18-Oct-2026 ep  Generate DepUI model files with the pre-warmed model generation server when available
+#   18-Oct-2026 ep  Locate the model file in the content request consumer rather than on submit
+#   18-Oct-2026 ep  Cache dataset site lookups
+#   18-Oct-2026 ep  Build the URL to method mapping once for the class
+#   18-Oct-2026 ep  Compressed NDJSON bulk output
+#   18-Oct-2026 ep  Uploads do not overwrite reports linked to the report store, check the report inode on download
 ##
 """
 Manage web request and response processing for miscellaneous annotation tasks.
@@ -27,15 +38,10 @@ __version__ = "V0.07"
 
 import glob
 
-import datetime
 import json
 import logging
+import ntpath
 import os
-import signal
-import time
-from subprocess import Popen, PIPE
-from wwpdb.io.file.DataExchange import DataExchange
-from wwpdb.io.locator.PathInfo import PathInfo
 from wwpdb.utils.config.ConfigInfo import getSiteId
 from wwpdb.utils.config.ConfigInfoDataSet import ConfigInfoDataSet
 from wwpdb.utils.message_queue.MessagePublisher import MessagePublisher
@@ -44,12 +50,39 @@ from wwpdb.utils.ws_utils.ServiceUploadUtils import ServiceUploadUtils
 from wwpdb.utils.ws_utils.ServiceUtilsMisc import getMD5
 from wwpdb.utils.ws_utils.ServiceWorkerBase import ServiceWorkerBase
 
+from wwpdb.apps.content_ws_server.content.ContentRequestBatchProxy import ContentRequestBatchProxy
+from wwpdb.apps.content_ws_server.content.ContentRequestModelCache import ContentRequestModelCache
+from wwpdb.apps.content_ws_server.content.ContentRequestReportStore import releaseReport
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import getFormatType, isFormatSupported, parseFormatType
 from wwpdb.apps.content_ws_server.message_queue.MessageQueue import get_queue_name, get_routing_key, get_exchange_name
 
 logger = logging.getLogger(__name__)
 
 
 class ContentServiceAppWorker(ServiceWorkerBase):
+    #
+    #  URL to method mapping -----  the service names are case insensitive --
+    #  (built once and shared by the workers for all requests)
+    #
+    _appPathD = {
+        "/contentws/dump": "_dumpOp",
+        "/contentws/session": "_sessionOp",
+        "/contentws/upload": "_uploadFileOp",
+        "/contentws/input_file": "_uploadFileOp",
+        "/contentws/sessioninfo": "_sessionInfoOp",
+        "/contentws/session_status": "_sessionInfoOp",
+        "/contentws/download": "_downloadOp",
+        "/contentws/output_file": "_uploadFileOp",
+        "/contentws/submit": "_submitReportOp",
+        "/contentws/entry_content": "_submitContentRequestOp",
+        "/contentws/summary_content": "_submitContentRequestOp",
+        "/contentws/bulk_entry_content": "_submitBulkContentRequestOp",
+        "/contentws/index": "_indexOp",
+        "/contentws/session_index": "_indexOp",
+        "/contentws/session_activity": "_activityOp",
+        "/contentws/activity": "_activityOp",
+    }
+
     def __init__(self, reqObj=None, sessionDataPrefix=None):
         """
         Worker methods for annotation tasks.
@@ -59,27 +92,7 @@ class ContentServiceAppWorker(ServiceWorkerBase):
 
         """
         super(ContentServiceAppWorker, self).__init__(reqObj=reqObj, sessionDataPrefix=sessionDataPrefix)
-        #
-        #  URL to method mapping -----  the service names are case insensitive --
-        #
-        self.__appPathD = {
-            "/contentws/dump": "_dumpOp",
-            "/contentws/session": "_sessionOp",
-            "/contentws/upload": "_uploadFileOp",
-            "/contentws/input_file": "_uploadFileOp",
-            "/contentws/sessioninfo": "_sessionInfoOp",
-            "/contentws/session_status": "_sessionInfoOp",
-            "/contentws/download": "_downloadOp",
-            "/contentws/output_file": "_uploadFileOp",
-            "/contentws/submit": "_submitReportOp",
-            "/contentws/entry_content": "_submitContentRequestOp",
-            "/contentws/summary_content": "_submitContentRequestOp",
-            "/contentws/index": "_indexOp",
-            "/contentws/session_index": "_indexOp",
-            "/contentws/session_activity": "_activityOp",
-            "/contentws/activity": "_activityOp",
-        }
-        self.addServices(self.__appPathD)
+        self.addServices(self._appPathD)
         #
 
     def run(self, reqPath=None):
@@ -131,14 +144,15 @@ class ContentServiceAppWorker(ServiceWorkerBase):
                 status = sD["status"]
             else:
                 status = "unknown"
-            sst.setAppDataDict(
-                {
-                    "session_id": self._sessionId,
-                    "status": status,
-                    "session_history": shL,
-                },
-                format="json",
-            )
+            dD = {
+                "session_id": self._sessionId,
+                "status": status,
+                "session_history": shL,
+            }
+            # Per dataset status of a bulk request
+            if "bulk_entry_status" in sD:
+                dD["bulk_entry_status"] = sD["bulk_entry_status"]
+            sst.setAppDataDict(dD, format="json")
         #
         logger.debug("Completed")
         return sst
@@ -185,6 +199,9 @@ class ContentServiceAppWorker(ServiceWorkerBase):
                 if not suu.isFileUpload():
                     sst.setServiceError(msg="No input file in request ")
                 else:
+                    # The upload is written in place  -  an existing report of the same name may be linked to the report store
+                    for fn in self.__getUploadFileNames("file"):
+                        releaseReport(os.path.join(self._sessionPath, fn))
                     fileName = suu.copyToSession(fileTag="file")
                     if fileName:
                         sst.setServiceCompletionFlag(True)
@@ -216,90 +233,15 @@ class ContentServiceAppWorker(ServiceWorkerBase):
 
         return sst
 
-    def __fetchModelFile(self, siteId, entryId):
-        """Fetch model file first from archive then from the deposit file source ..."""
-        generateModel = True
-
-        pdbxFilePath = None
-        # Sanity check
-        if len(entryId) > 30:
-            return None
+    def __getUploadFileNames(self, fileTag):
+        """Return the session file names written by ServiceUploadUtils.copyToSession() for the upload."""
         try:
-            logger.debug("siteId %r ", siteId)
-            # note explict use of siteId here --
-            dx = DataExchange(
-                reqObj=self._reqObj,
-                depDataSetId=entryId,
-                fileSource="archive",
-                siteId=siteId,
-                verbose=True,
-            )
-            fl = dx.getContentTypeFileList(fileSource="archive", contentTypeList=["model"])
-            if len(fl) > 0:
-                pdbxFilePath = dx.fetch(contentType="model", formatType="pdbx", version="latest")
-            elif generateModel:
-                pdbxFilePath = self.__depuiGenerateModelFile(siteId, entryId)
-
-            # Fallback on deposit directory
-            if not pdbxFilePath:
-                dx = DataExchange(
-                    reqObj=self._reqObj,
-                    depDataSetId=entryId,
-                    fileSource="deposit",
-                    siteId=siteId,
-                    verbose=True,
-                )
-                pdbxFilePath = dx.fetch(contentType="model", formatType="pdbx", version="latest")
-
+            fn = str(self._reqObj.getRawValue(fileTag).filename).strip()
+            fn = ntpath.basename(fn) if fn.find("\\") != -1 else os.path.basename(fn)
+            return [fn, fn[:-3]] if fn.endswith(".gz") else [fn]
         except Exception as e:
-            logger.exception("Fetch model failing %r", entryId)
-            logger.exception(e)
-        return pdbxFilePath
-
-    def __depuiGenerateModelFile(self, siteId, entryId):
-        """Uses code in the deposition system to generate a model file in the session directory.
-        returns path to filename or None if it fails
-        """
-        logger.debug("generate %r from depui", entryId)
-        sessDir = self._reqObj.getSessionObj().getPath()
-
-        # Create script to run. Django will need WWPDB_SITE_ID set before invoking
-        cmdPy = os.path.join(sessDir, "generate.py")
-        fOut = open(cmdPy, "w")
-        fOut.write("#!/usr/bin/env python\n")
-        fOut.write("import os, sys\n")
-        # Setup the Django environment
-        fOut.write('os.environ.setdefault("DJANGO_SETTINGS_MODULE", "wwpdb.apps.deposit.settings")\n')
-        fOut.write("import django\n")
-        fOut.write("django.setup()\n")
-        fOut.write("from wwpdb.apps.deposit.depui.generate_model import generate_model\n")
-        fOut.write('generate_model(depID="%s", sessionDir = "%s").write_out_cif_from_depui()' % (entryId, sessDir))
-        fOut.close()
-        cmdfile = os.path.join(sessDir, "generate.sh")
-        fOut = open(cmdfile, "w")
-        fOut.write("#!/bin/sh\n")
-        fOut.write("export WWPDB_SITE_ID=%s\n" % siteId)
-        fOut.write("export PYTHONPATH=$TOP_WWPDB_PYTHON_DIR/wwpdb/apps/deposit:$PYTHONPATH\n")
-        fOut.write("python %s\n" % cmdPy)
-        fOut.close()
-        os.chmod(cmdfile, 0o777)
-
-        logfile = os.path.join(sessDir, "generate.log")
-
-        retCode = self.__runTimeout(cmdFile=cmdfile, logFile=logfile, timeout=30)
-
-        logger.debug("response from depui %r", retCode)
-        if retCode != 0:
-            return None
-        pI = PathInfo(siteId=self._siteId, sessionPath=sessDir, verbose=True)
-        pdbxFilePath = pI.getModelPdbxFilePath(dataSetId=entryId, fileSource="session")
-        # DepUI can generate file even if deposition non-existant!! Make sure minimal size....
-        if os.access(pdbxFilePath, os.R_OK):
-            statinfo = os.stat(pdbxFilePath)
-            if statinfo.st_size > 100:
-                return pdbxFilePath
-
-        return None
+            logger.exception("Failing for upload file name %s", str(e))
+        return []
 
     def _submitContentRequestOp(self):
         """Submit entry content service request  -"""
@@ -334,14 +276,23 @@ class ContentServiceAppWorker(ServiceWorkerBase):
             # config variable not set - will return ['None']
             siteCoverage = [x.strip() for x in str(self._cI.get("SITE_WS_CONTENT_SITE_COVERAGE")).split(",")]
 
+            # Several entry content types may be requested as a comma separated list
+            contentTypeList = [ct.strip() for ct in contentType.split(",") if ct.strip()]
+
             # Content type
-            if entryId != "unassigned" and contentType.startswith("report-entry-"):
+            if entryId != "unassigned" and contentTypeList and all([ct.startswith("report-entry-") for ct in contentTypeList]):
                 ok = True
+                if len(contentTypeList) > 1:
+                    contentType = contentTypeList[0]
+                    pD["request_content_type"] = contentType
+                    pD["request_content_type_list"] = contentTypeList
+                    pD["report_file_list"] = [entryId + "_" + ct + "." + formatType for ct in contentTypeList]
+                    pD["report_path_list"] = [os.path.join(self._sessionPath, fn) for fn in pD["report_file_list"]]
                 fName = entryId + "_" + contentType + "." + formatType
                 logger.debug("Entry content type %r format type %r and dataset id %r status %r", contentType, formatType, entryId, ok)
 
-                cIDS = ConfigInfoDataSet()
-                siteId = cIDS.getSiteId(entryId)
+                # The site of a dataset does not change  -  lookups are cached in the process
+                siteId = ContentRequestModelCache().getSiteId(entryId, lambda dataSetId: ConfigInfoDataSet().getSiteId(dataSetId))
 
                 # On development server
                 if siteId == "UNASSIGNED":
@@ -362,12 +313,8 @@ class ContentServiceAppWorker(ServiceWorkerBase):
                     else:
                         ok = False
                 else:
-                    # Look up with siteId info for depositions
-                    pdbxFilePath = self.__fetchModelFile(siteId, entryId)
-                    if os.access(pdbxFilePath, os.R_OK):
-                        pD["session_pdbx_file_path"] = str(pdbxFilePath)
-                    else:
-                        ok = False
+                    # The model file is located (or generated) by the content request consumer
+                    pD["session_pdbx_site_id"] = siteId
 
             elif contentType.startswith("report-summary-"):
                 ok = True
@@ -385,13 +332,17 @@ class ContentServiceAppWorker(ServiceWorkerBase):
 
                 logger.debug("Summary content type %r format type %r site %s status %r", contentType, formatType, qs, ok)
 
+            if ok and not isFormatSupported(formatType):
+                logger.error("Report format %r is not supported", formatType)
+                ok = False
+
             if ok:
                 resultPath = os.path.join(self._sessionPath, fName)
                 pD["report_file"] = fName
                 pD["report_path"] = resultPath
 
                 # Not really used in this example -
-                dstPathList = [resultPath]
+                dstPathList = pD.get("report_path_list", [resultPath])
                 pD["dst_file_path_list"] = dstPathList
                 #
                 pD["session_path"] = self._sessionPath
@@ -436,6 +387,98 @@ class ContentServiceAppWorker(ServiceWorkerBase):
         logger.debug("Completed request method")
         return sst
 
+    def _submitBulkContentRequestOp(self):
+        """Submit an entry content request for a list of datasets  -
+
+        The datasets are published in chunks of local datasets and of datasets on each remote site.
+        The status of each dataset is kept in the session store and the reports are combined in a
+        single NDJSON (request_format_type=ndjson, ndjson.gz or ndjson.zst) or zip archive output file.
+        """
+        logger.debug("Bulk content request method starting now")
+        sst = ServiceSessionState()
+        #            Join an existing session -
+        ok = self._getSession(new=False, useContext=True, contextOverWrite=True)
+        if not ok:
+            sst.setServiceCompletionFlag(ok)
+            sst.setServiceError(msg="Session acquire failed")
+            return sst
+        #
+        sD = self._getSessionStoreDict()
+        ok = False
+        try:
+            idS = self._reqObj.getValueOrDefault("request_dataset_id_list", default="")
+            dataSetIdList = []
+            for dataSetId in idS.replace(",", " ").split():
+                if dataSetId.upper() not in dataSetIdList:
+                    dataSetIdList.append(dataSetId.upper())
+            contentType = self._reqObj.getValueOrDefault("request_content_type", default="unassigned")
+            formatType = self._reqObj.getValueOrDefault("request_format_type", default="json")
+            maxEntries = int(self._cI.get("SITE_WS_CONTENT_BULK_MAX_ENTRIES", 5000))
+            chunkSize = int(self._cI.get("SITE_WS_CONTENT_BULK_CHUNK_SIZE", 25))
+            #
+            if dataSetIdList and len(dataSetIdList) <= maxEntries and contentType.startswith("report-entry-") and "," not in contentType and isFormatSupported(formatType):
+                # NDJSON output may be compressed (e.g. ndjson.gz)
+                outputFormat = "ndjson" if parseFormatType(formatType)[0] == "ndjson" else "zip"
+                fName = "bulk_" + contentType + "." + (getFormatType(formatType) if outputFormat == "ndjson" else outputFormat)
+                bulkPath = os.path.join(self._sessionPath, "bulk")
+                if not os.path.isdir(bulkPath):
+                    os.makedirs(bulkPath)
+                #
+                localList, proxyD, unresolvedList = ContentRequestBatchProxy().groupBySite(dataSetIdList)
+                chunkList = [(localList[ii : ii + chunkSize], None) for ii in range(0, len(localList), chunkSize)]
+                for apiUrl, dL in proxyD.items():
+                    chunkList.extend([(dL[ii : ii + chunkSize], apiUrl) for ii in range(0, len(dL), chunkSize)])
+                #
+                pStatus = sD["status"]
+                if chunkList:
+                    # Datasets are reported in the requested order
+                    entryD = {dataSetId: "queued" for dataSetId in dataSetIdList}
+                    entryD.update({dataSetId: "failed" for dataSetId in unresolvedList})
+                    self._setSessionStoreValue("bulk_entry_status", entryD)
+                    self._setSessionStoreValue("bulk_finalized", False)
+                    self._setSessionStoreValue("status", "submitted")
+                    self._trackServiceStatus("submitted")
+                    ok = True
+                for chunk, apiUrl in chunkList:
+                    pD = {
+                        "request_bulk": True,
+                        "request_dataset_id": chunk[0],
+                        "request_dataset_id_list": chunk,
+                        "request_content_type": contentType,
+                        "request_format_type": formatType,
+                        "bulk_path": bulkPath,
+                        "bulk_output_format": outputFormat,
+                        "report_file": fName,
+                        "report_path": os.path.join(self._sessionPath, fName),
+                        "session_path": self._sessionPath,
+                        "session_store_prefix": self._sdsPrefix,
+                        "session_history_path": self._reqObj.getSessionUserPath(),
+                        "session_id": self._sessionId,
+                    }
+                    if apiUrl:
+                        pD["session_proxy_url"] = apiUrl
+                    ok = self.__publishRequest(pD) and ok
+                logger.info("Bulk request %r for %d datasets in %d messages status %r", contentType, len(dataSetIdList), len(chunkList), ok)
+                if not ok:
+                    # restore the prior status
+                    self._setSessionStoreValue("status", pStatus)
+        except Exception as e:
+            logger.exception("Failed bulk submit method %s", str(e))
+            ok = False
+        #
+        if ok:
+            sst.setAppDataDict(
+                {"session_id": self._sessionId, "session_history": sD.get("session_history", [])},
+                format="json",
+            )
+            sst.setServiceCompletionFlag(ok)
+            sst.setServiceStatusText("Submit successful")
+        else:
+            sst.setServiceCompletionFlag(False)
+            sst.setServiceError(msg="Submit operation failed")
+        logger.debug("Completed bulk request method")
+        return sst
+
     def __publishRequest(self, pD):
         ok = False
         logger.debug("Publishing request with payload %r", pD)
@@ -516,7 +559,13 @@ class ContentServiceAppWorker(ServiceWorkerBase):
 
                 fp = os.path.join(self._sessionPath, fn)
                 logger.debug("download target path %r", fp)
-                md5Digest = getMD5(fp, block_size=4096, hr=True)
+                # Reports have their digest recorded when they are completed  -  a replaced report has a new inode
+                dD = sD.get("report_digests", {}).get(fn, {})
+                st = os.stat(fp)
+                if dD and dD["size"] == st.st_size and dD.get("inode") == st.st_ino:
+                    md5Digest = dD["md5"]
+                else:
+                    md5Digest = getMD5(fp, block_size=4096, hr=True)
                 sst.setDownload(fn, fp, contentType=None, md5Digest=md5Digest)
                 # self._trackServiceStatus('downloading', {'file': fn})
                 self._trackServiceStatus("downloading", file=fn)
@@ -568,43 +617,4 @@ class ContentServiceAppWorker(ServiceWorkerBase):
         logger.debug("Completed history summary method")
         return sst
 
-    def __runTimeout(self, cmdFile=None, logFile=None, timeout=10):
-        """Execute the command as a subprocess with a timeout."""
-        logger.debug("STARTING with time out set at %d (seconds)", timeout)
-        #
-        start = datetime.datetime.now()
-        try:
-            process = Popen(  # pylint: disable=subprocess-popen-preexec-fn
-                cmdFile,
-                stdout=PIPE,
-                stderr=PIPE,
-                shell=False,
-                close_fds=True,
-                preexec_fn=os.setsid,
-            )
-            while process.poll() is None:
-                time.sleep(0.1)
-                now = datetime.datetime.now()
-                if (now - start).seconds > timeout:
-                    os.killpg(process.pid, signal.SIGKILL)
-                    os.waitpid(-1, os.WNOHANG)
-                    logger.debug("Execution terminated by timeout %d (seconds)", timeout)
-                    if logFile is not None:
-                        ofh = open(logFile, "a")
-                        ofh.write("Execution terminated by timeout %d (seconds)\n" % timeout)
-                        ofh.close()
-                    #
-                    return None
-                #
-                #
-        except Exception as e:
-            logger.error("Exception", exc_info=True)
-            logger.error(e)
-        #
-        output = process.communicate()
-        logger.debug("completed with stdout data %r", output[0])
-        logger.debug("completed with stderr data %r", output[1])
-        logger.debug("completed with return code %r", process.returncode)
-        return process.returncode
-
     #
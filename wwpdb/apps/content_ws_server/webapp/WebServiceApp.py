@@ -4,6 +4,7 @@
 #
 # Updates:
 #    7-Feb-2017  jdw adapt for content provider service
+#   18-Oct-2026  ep  read the site configuration once for each site in the process
 #
 ##
 """
@@ -38,6 +39,24 @@ from wwpdb.apps.content_ws_server.webapp.ContentServiceAppWorker import (
 
 logger = logging.getLogger()
 
+# Site configuration used by each request  -  d[siteId] = {"top_session_path", "path_prefix"}
+_siteConfigD = {}
+
+
+def getSiteConfig(siteId):
+    """Return the configuration values of the site used to set up each request  -  read once for each site in the process."""
+    sD = _siteConfigD.get(siteId)
+    if sD is None:
+        cI = ConfigInfo(siteId)
+        sD = {"top_session_path": cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH"), "path_prefix": cI.get("SITE_WEB_SERVICE_PATH_PREFIX", default="/service")}
+        _siteConfigD[siteId] = sD
+    return sD
+
+
+def clearSiteConfig():
+    """Discard the site configuration read by this process."""
+    _siteConfigD.clear()
+
 
 class WebServiceApp(object):
     """Handle request and response object processing for various web services."""
@@ -54,9 +73,9 @@ class WebServiceApp(object):
         self.__reqObj = ServiceRequest(parameterDict)
         siteId = self.__reqObj.getSiteId()
         #
-        cI = ConfigInfo(siteId)
-        self.__reqObj.setTopSessionPath(cI.get("SITE_WEB_APPS_TOP_SESSIONS_PATH"))
-        self.__reqObj.setRequestPathPrefix(cI.get("SITE_WEB_SERVICE_PATH_PREFIX", default="/service"))
+        sD = getSiteConfig(siteId)
+        self.__reqObj.setTopSessionPath(sD["top_session_path"])
+        self.__reqObj.setRequestPathPrefix(sD["path_prefix"])
         self.__reqObj.setDefaultReturnFormat(return_format="json")
         #
 
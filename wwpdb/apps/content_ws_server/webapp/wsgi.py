@@ -3,6 +3,7 @@
 # Created:  10-Feb-2017
 # Updates:
 #     17-Feb-2017  jdw add auth filtering on content request type ---
+#     18-Oct-2026  ep  build the site configuration and token readers once in each server process
 ##
 """
 This top-level responder for web service requests ...
@@ -21,7 +22,7 @@ from wwpdb.utils.config.ConfigInfo import getSiteId
 from wwpdb.utils.ws_utils.ServiceResponse import ServiceResponse
 from wwpdb.utils.ws_utils.TokenUtils import JwtTokenReader
 
-from wwpdb.apps.content_ws_server.webapp.WebServiceApp import WebServiceApp
+from wwpdb.apps.content_ws_server.webapp.WebServiceApp import WebServiceApp, getSiteConfig
 
 USEKEY = True
 # Create logger
@@ -46,6 +47,21 @@ class MyRequestApp(object):
         self.__serviceName = serviceName
         self.__authVerifyFlag = authVerifyFlag
         #
+        # Request independent objects are built once  -  at import, before the server forks its workers
+        self.__siteId = getSiteId()
+        self.__jwtD = {}
+        if self.__siteId:
+            getSiteConfig(self.__siteId)
+            if self.__authVerifyFlag:
+                self.__getTokenReader(self.__siteId)
+
+    def __getTokenReader(self, siteId):
+        """Return the API token reader for the site."""
+        jtu = self.__jwtD.get(siteId)
+        if jtu is None:
+            jtu = JwtTokenReader(siteId=siteId)
+            self.__jwtD[siteId] = jtu
+        return jtu
 
     def __dumpRequest(self, request):
         outL = []
@@ -86,7 +102,7 @@ class MyRequestApp(object):
         tD = {"errorCode": 401, "errorMessage": "Token processing error", "token": None, "errorFlag": True}
 
         try:
-            jtu = JwtTokenReader(siteId=siteId)
+            jtu = self.__getTokenReader(siteId)
             tD = jtu.parseAuth(authHeader)
             if tD["errorFlag"]:
                 return tD
@@ -109,9 +125,10 @@ class MyRequestApp(object):
         """Request callable entry point"""
         #
         myRequest = Request(environment)
-        logger.debug("%s", "\n ++ ".join(self.__dumpRequest(request=myRequest)))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s", "\n ++ ".join(self.__dumpRequest(request=myRequest)))
         #
-        myParameterDict = {"request_host": [""], "wwpdb_site_id": [getSiteId()], "service_user_id": [""], "remote_addr": [""]}
+        myParameterDict = {"request_host": [""], "wwpdb_site_id": [self.__siteId], "service_user_id": [""], "remote_addr": [""]}
         #
         try:
             #
@@ -0,0 +1,175 @@
+##
+#
+# File:    ContentRequestBulkTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  compressed NDJSON output written with the selected JSON backend
+#
+##
+"""
+Test cases for the messages of bulk entry content requests -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.utils.ws_utils.ServiceDataStore import ServiceDataStore  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content.ContentRequestBulk import ContentRequestBulk, getBulkEntryFileName  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import ContentRequestJsonSerializer  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class FakeBatchProxy(object):
+    """Batch proxy stand-in writing a report for every dataset except D_9."""
+
+    def retrieveReports(self, proxyD, contentType, formatType, reportPathD):  # pylint: disable=unused-argument
+        rD = {}
+        for dL in proxyD.values():
+            for dataSetId in dL:
+                rD[dataSetId] = dataSetId != "D_9"
+                if rD[dataSetId]:
+                    with open(reportPathD[dataSetId], "w") as ofh:
+                        json.dump({"remote": dataSetId}, ofh)
+        return rD
+
+
+class ContentRequestBulkTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__bulkPath = os.path.join(self.__workPath, "bulk")
+        os.makedirs(self.__bulkPath)
+        self.__pdbxFilePath = os.path.join(HERE, "data", "1kip.cif")
+        self.__contentType = "report-entry-example-test"
+        self.__sds = ServiceDataStore(sessionPath=self.__workPath, prefix="test")
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __locateModel(self, dataSetId):
+        return None if dataSetId == "D_2" else self.__pdbxFilePath
+
+    def __getPayload(self, dataSetIdList, outputFormat, proxyUrl=None, formatType=None):
+        reportFile = "bulk_" + self.__contentType + "." + (formatType if formatType else outputFormat)
+        pD = {
+            "request_bulk": True,
+            "request_dataset_id": dataSetIdList[0],
+            "request_dataset_id_list": dataSetIdList,
+            "request_content_type": self.__contentType,
+            "bulk_path": self.__bulkPath,
+            "bulk_output_format": outputFormat,
+            "report_path": os.path.join(self.__workPath, reportFile),
+            "session_path": self.__workPath,
+            "session_store_prefix": "test",
+            "session_proxy_url": proxyUrl,
+        }
+        if formatType:
+            pD["request_format_type"] = formatType
+        return pD
+
+    def __run(self, outputFormat, formatType=None):
+        """Run a local and a remote chunk of four datasets, two of which fail."""
+        self.__sds.set("bulk_entry_status", {dataSetId: "queued" for dataSetId in ["D_1", "D_2", "D_8", "D_9"]})
+        localD = self.__getPayload(["D_1", "D_2"], outputFormat, formatType=formatType)
+        done, ok = ContentRequestBulk(localD, modelLocator=self.__locateModel).run()
+        self.assertFalse(done)
+        self.assertFalse(ok)
+        self.assertEqual(self.__sds.get("bulk_entry_status"), {"D_1": "completed", "D_2": "failed", "D_8": "queued", "D_9": "queued"})
+        self.assertFalse(os.access(localD["report_path"], os.R_OK))
+        #
+        remoteD = self.__getPayload(["D_8", "D_9"], outputFormat, proxyUrl="https://remote", formatType=formatType)
+        done, ok = ContentRequestBulk(remoteD, batchProxy=FakeBatchProxy()).run()
+        self.assertTrue(done)
+        self.assertTrue(ok)
+        self.assertTrue(self.__sds.get("bulk_finalized"))
+        self.assertEqual(self.__sds.get("bulk_entry_status"), {"D_1": "completed", "D_2": "failed", "D_8": "completed", "D_9": "failed"})
+        # A repeated message does not rewrite the output
+        done, ok = ContentRequestBulk(remoteD, batchProxy=FakeBatchProxy()).run()
+        self.assertFalse(done)
+        return remoteD["report_path"]
+
+    def testBulkNdjson(self):
+        """Test case -  combined NDJSON output"""
+        reportPath = self.__run("ndjson")
+        with open(reportPath, "r") as ifh:
+            rL = [json.loads(line) for line in ifh]
+        self.assertEqual([(r["dataset_id"], r["status"]) for r in rL], [("D_1", "completed"), ("D_2", "failed"), ("D_8", "completed"), ("D_9", "failed")])
+        self.assertEqual(rL[0]["content"]["database_2"], [{"database_code": "1KIP"}])
+        self.assertIsNone(rL[1]["content"])
+        self.assertEqual(rL[2]["content"], {"remote": "D_8"})
+
+    def testBulkNdjsonCompressed(self):
+        """Test case -  compressed NDJSON output written with the configured JSON backend"""
+        for backend in ["json", "orjson"]:
+            with mock.patch.dict(configInfo, {"SITE_WS_CONTENT_JSON_BACKEND": backend}):
+                sj = ContentRequestJsonSerializer()
+                reportPath = self.__run("ndjson", formatType="ndjson.gz")
+            self.assertTrue(reportPath.endswith(".ndjson.gz"))
+            with gzip.open(reportPath, "rb") as ifh:
+                lineL = ifh.read().splitlines()
+            rL = [json.loads(line) for line in lineL]
+            self.assertEqual([(r["dataset_id"], r["status"]) for r in rL], [("D_1", "completed"), ("D_2", "failed"), ("D_8", "completed"), ("D_9", "failed")])
+            self.assertEqual(lineL, [sj.dumps(r) for r in rL])
+            # The entry reports are also written by the report writer
+            with open(os.path.join(self.__bulkPath, getBulkEntryFileName("D_1", self.__contentType)), "rb") as ifh:
+                data = ifh.read()
+            self.assertEqual(data, sj.dumps(json.loads(data)))
+            logger.info("Bulk output with %s %d bytes", sj.getName(), os.path.getsize(reportPath))
+            self.__sds.set("bulk_finalized", False)
+            os.remove(reportPath)
+
+    def testBulkArchive(self):
+        """Test case -  combined zip archive output"""
+        reportPath = self.__run("zip")
+        with zipfile.ZipFile(reportPath, "r") as zf:
+            nameL = sorted(zf.namelist())
+            manifestD = json.loads(zf.read("manifest.json"))
+            rD = json.loads(zf.read(getBulkEntryFileName("D_8", self.__contentType)))
+        self.assertEqual(nameL, sorted(["manifest.json", getBulkEntryFileName("D_1", self.__contentType), getBulkEntryFileName("D_8", self.__contentType)]))
+        self.assertEqual(manifestD["D_9"], "failed")
+        self.assertEqual(rD, {"remote": "D_8"})
+
+
+def suiteBulk():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestBulkTests("testBulkNdjson"))
+    suiteSelect.addTest(ContentRequestBulkTests("testBulkNdjsonCompressed"))
+    suiteSelect.addTest(ContentRequestBulkTests("testBulkArchive"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteBulk()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,198 @@
+##
+#
+# File:    ContentRequestCoalescerTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  add idle key cleanup tests
+#
+##
+"""
+Test cases for coalescing identical in-flight content requests -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from oslo_concurrency import lockutils  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content.ContentRequestCoalescer import ContentRequestCoalescer  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def removeLockedKey(keyPath, lockName, readyEvent, holdSeconds):
+    """Hold the key lock in another process and remove the key directory before releasing it."""
+    with lockutils.lock(lockName, external=True, lock_path=keyPath):
+        readyEvent.set()
+        time.sleep(holdSeconds)
+        shutil.rmtree(keyPath)
+
+
+class ContentRequestCoalescerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__coalescePath = os.path.join(self.__workPath, "inflight")
+        self.__runCount = 0
+        self.__lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __getPayload(self, sessionId, datasetId="D_1000000001"):
+        sessionPath = os.path.join(self.__workPath, sessionId)
+        if not os.path.isdir(sessionPath):
+            os.makedirs(sessionPath)
+        ctL = ["report-entry-wwpdb-status", "report-entry-wwpdb-audit-revision"]
+        return {
+            "request_dataset_id": datasetId,
+            "request_content_type": ctL[0],
+            "request_content_type_list": ctL,
+            "request_format_type": "json",
+            "report_path_list": [os.path.join(sessionPath, ct + ".json") for ct in ctL],
+        }
+
+    def __runJob(self, pD, duration=0.0, status=True):
+        def runFunc():
+            with self.__lock:
+                self.__runCount += 1
+            time.sleep(duration)
+            for fp in pD["report_path_list"]:
+                with open(fp, "w") as ofh:
+                    ofh.write("%s %s" % (pD["request_dataset_id"], os.path.basename(fp)))
+            return status
+
+        return runFunc
+
+    def __runConcurrent(self, pDList, duration, status=True):
+        rL = [None] * len(pDList)
+
+        def target(ii, pD):
+            rL[ii] = ContentRequestCoalescer(coalescePath=self.__coalescePath).run(pD, self.__runJob(pD, duration, status))
+
+        thL = []
+        for ii, pD in enumerate(pDList):
+            th = threading.Thread(target=target, args=(ii, pD))
+            th.start()
+            thL.append(th)
+            # Followers arrive while the leader is running
+            time.sleep(0.05)
+        for th in thL:
+            th.join()
+        return rL
+
+    def testCoalesce(self):
+        """Test case -  concurrent identical requests are computed once"""
+        pDList = [self.__getPayload("session-%d" % ii) for ii in range(4)]
+        rL = self.__runConcurrent(pDList, 0.5)
+        self.assertEqual(rL, [True] * 4)
+        self.assertEqual(self.__runCount, 1)
+        for pD in pDList[1:]:
+            for fp0, fp in zip(pDList[0]["report_path_list"], pD["report_path_list"]):
+                with open(fp0, "r") as ifh0, open(fp, "r") as ifh:
+                    self.assertEqual(ifh0.read(), ifh.read())
+        #
+        # A request arriving after completion is computed again
+        pD = self.__getPayload("session-9")
+        self.assertTrue(ContentRequestCoalescer(coalescePath=self.__coalescePath).run(pD, self.__runJob(pD)))
+        self.assertEqual(self.__runCount, 2)
+
+    def testDistinctKeys(self):
+        """Test case -  requests for different datasets are not coalesced"""
+        pDList = [self.__getPayload("session-%d" % ii, datasetId="D_100000000%d" % ii) for ii in range(3)]
+        startTime = time.time()
+        rL = self.__runConcurrent(pDList, 0.5)
+        self.assertEqual(rL, [True] * 3)
+        self.assertEqual(self.__runCount, 3)
+        # Different keys do not wait on each other
+        self.assertLess(time.time() - startTime, 1.0)
+        cr = ContentRequestCoalescer(coalescePath=self.__coalescePath)
+        self.assertNotEqual(cr.getKey(pDList[0]), cr.getKey(pDList[1]))
+        # The model file is located by the consumer
+        self.assertEqual(cr.getKey(pDList[0]), cr.getKey(dict(pDList[0], session_pdbx_file_path="/tmp/D_1000000000_model_P1.cif.V1")))
+
+    def testFailedLeader(self):
+        """Test case -  a failed result is not shared"""
+        pDList = [self.__getPayload("session-%d" % ii) for ii in range(2)]
+        rL = self.__runConcurrent(pDList, 0.2, status=False)
+        self.assertEqual(rL, [False, False])
+        self.assertEqual(self.__runCount, 2)
+
+    def testCleanup(self):
+        """Test case -  idle keys are removed once per cleanup interval unless their lock is held"""
+        cr = ContentRequestCoalescer(coalescePath=self.__coalescePath, retainSeconds=60, cleanupInterval=3600)
+        pDList = [self.__getPayload("session-%d" % ii, datasetId="D_100000000%d" % ii) for ii in range(4)]
+        for pD in pDList[:3]:
+            self.assertTrue(cr.run(pD, self.__runJob(pD)))
+        keyPathList = [os.path.join(self.__coalescePath, cr.getKey(pD)) for pD in pDList]
+        stampPath = os.path.join(self.__coalescePath, "cleanup.stamp")
+        oldTime = time.time() - 7200
+        for fp in keyPathList[:2]:
+            os.utime(fp, (oldTime, oldTime))
+        # Cleanup is not due
+        self.assertTrue(cr.run(pDList[3], self.__runJob(pDList[3])))
+        self.assertTrue(all([os.path.isdir(fp) for fp in keyPathList]))
+        #
+        os.utime(stampPath, (oldTime, oldTime))
+        with lockutils.lock("wscoalesce." + cr.getKey(pDList[1]), external=True, lock_path=keyPathList[1]):
+            self.assertTrue(cr.run(pDList[3], self.__runJob(pDList[3])))
+        self.assertEqual([os.path.isdir(fp) for fp in keyPathList], [False, True, True, True])
+        self.assertGreater(os.stat(stampPath).st_mtime, oldTime + 3600)
+
+    def testRemovedWhileWaiting(self):
+        """Test case -  a request holding the lock of a removed key directory retries"""
+        cr = ContentRequestCoalescer(coalescePath=self.__coalescePath)
+        pD = self.__getPayload("session-1")
+        key = cr.getKey(pD)
+        keyPath = os.path.join(self.__coalescePath, key)
+        os.makedirs(keyPath)
+        ctx = multiprocessing.get_context("spawn")
+        readyEvent = ctx.Event()
+        proc = ctx.Process(target=removeLockedKey, args=(keyPath, "wscoalesce." + key, readyEvent, 0.5))
+        proc.start()
+        self.assertTrue(readyEvent.wait(60))
+        self.assertTrue(cr.run(pD, self.__runJob(pD)))
+        proc.join(60)
+        self.assertEqual(proc.exitcode, 0)
+        # Published in the new key directory
+        self.assertTrue(os.access(os.path.join(keyPath, "manifest.json"), os.R_OK))
+
+
+def suiteCoalescer():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestCoalescerTests("testCoalesce"))
+    suiteSelect.addTest(ContentRequestCoalescerTests("testDistinctKeys"))
+    suiteSelect.addTest(ContentRequestCoalescerTests("testFailedLeader"))
+    suiteSelect.addTest(ContentRequestCoalescerTests("testCleanup"))
+    suiteSelect.addTest(ContentRequestCoalescerTests("testRemovedWhileWaiting"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteCoalescer()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
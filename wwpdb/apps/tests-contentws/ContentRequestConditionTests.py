@@ -0,0 +1,109 @@
+##
+#
+# File:    ContentRequestConditionTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for compiled content definition conditions -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import sys
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.utils.db.DaInternalSchemaDef import DaInternalSchemaDef  # noqa: E402
+from wwpdb.utils.db.MyDbSqlGen import MyDbConditionSqlGen  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content.ContentRequestCondition import ContentRequestCondition, compileConditions  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportIo import ContentRequestReportIo  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestConditionTests(unittest.TestCase):
+    def testCharConditions(self):
+        """Test case -  char comparisons"""
+        self.assertTrue(ContentRequestCondition("entity_id", "1", "char", "eq")("1"))
+        self.assertFalse(ContentRequestCondition("entity_id", "1", "char", "eq")("2"))
+        self.assertTrue(ContentRequestCondition("entity_id", "1", "char", "ne")("2"))
+        self.assertTrue(ContentRequestCondition("date", "2017-02-14", "char", "gt")("2017-03-01"))
+        self.assertTrue(ContentRequestCondition("date", "2017-02-14", "char", "ge")("2017-02-14"))
+        self.assertTrue(ContentRequestCondition("date", "2017-02-14", "char", "lt")("2016-12-31"))
+        self.assertFalse(ContentRequestCondition("date", "2017-02-14", "char", "le")("2017-02-15"))
+        self.assertTrue(ContentRequestCondition("db", ["PDB", "EMDB"], "char", "in")("EMDB"))
+        self.assertTrue(ContentRequestCondition("db", "PDB, EMDB", "char", "IN")("EMDB"))
+        self.assertFalse(ContentRequestCondition("db", "PDB,EMDB", "char", "in")("BMRB"))
+
+    def testLikeConditions(self):
+        """Test case -  SQL style like patterns"""
+        cnd = ContentRequestCondition("exp_method", "%ELECTRON%", "char", "LIKE")
+        self.assertTrue(cnd("ELECTRON MICROSCOPY"))
+        self.assertTrue(cnd("solution nmr, electron crystallography"))
+        self.assertFalse(cnd("X-RAY DIFFRACTION"))
+        self.assertFalse(cnd(None))
+        cnd = ContentRequestCondition("code", "D_1_0_.(a)", "char", "like")
+        self.assertTrue(cnd("D_1000.(a)"))
+        self.assertFalse(cnd("D_1000.(b)"))
+        self.assertRaises(ValueError, ContentRequestCondition, "ordinal", "1%", "int", "like")
+
+    def testNumericConditions(self):
+        """Test case -  int and float comparisons with mmCIF null values"""
+        self.assertTrue(ContentRequestCondition("major_revision", "1", "int", "eq")("1"))
+        self.assertFalse(ContentRequestCondition("major_revision", "1", "int", "eq")("?"))
+        self.assertTrue(ContentRequestCondition("major_revision", "2", "int", "ne")("10"))
+        self.assertTrue(ContentRequestCondition("major_revision", "2", "int", "gt")("10"))
+        self.assertFalse(ContentRequestCondition("major_revision", "2", "int", "lt")("."))
+        self.assertTrue(ContentRequestCondition("resolution", "2.5", "float", "le")("2.50"))
+        self.assertTrue(ContentRequestCondition("resolution", "2.5", "float", "ge")("3"))
+        self.assertTrue(ContentRequestCondition("major_revision", ["1", "3"], "int", "in")("3"))
+        self.assertFalse(ContentRequestCondition("major_revision", ["1", "3"], "int", "in")("x"))
+        self.assertRaises(ValueError, ContentRequestCondition, "major_revision", "1", "bool", "eq")
+        self.assertRaises(ValueError, ContentRequestCondition, "major_revision", "1", "int", "approx")
+        self.assertRaises(ValueError, ContentRequestCondition, "major_revision", "one", "int", "eq")
+
+    def testCompileDefinitions(self):
+        """Test case -  conditions for all installed content definitions compile"""
+        crio = ContentRequestReportIo()
+        for ctype in crio.getContentTypes():
+            condD = crio.getContentConditions(ctype)
+            self.assertIsNotNone(condD, ctype)
+            self.assertEqual(sorted(condD.keys()), sorted(crio.getContentDefinition(ctype)["conditions"].keys()))
+        condD = compileConditions({"entity_poly": {"entity_id": ["1", "char", "eq"]}})
+        self.assertTrue(condD["entity_poly"]["entity_id"]("1"))
+
+    def testSqlConditions(self):
+        """Test case -  SQL condition terms for database content"""
+        sDef = DaInternalSchemaDef(verbose=True, log=sys.stderr, databaseName="da_internal")
+        sqlCondition = MyDbConditionSqlGen(schemaDefObj=sDef, verbose=True, log=sys.stderr)
+        ContentRequestCondition("exp_method", "%ELECTRON%", "char", "LIKE").addSqlCondition(sqlCondition, "rcsb_status")
+        ContentRequestCondition("status_code", ["REL", "HPUB"], "char", "in").addSqlCondition(sqlCondition, "rcsb_status")
+        sqlS = " ".join(sqlCondition.getSql().split())
+        logger.info("SQL condition %s", sqlS)
+        self.assertIn("LIKE '%ELECTRON%'", sqlS)
+        self.assertIn("status_code = 'REL' ) OR (", sqlS)
+        self.assertIn(") AND (", sqlS)
+
+
+if __name__ == "__main__":
+    unittest.main()
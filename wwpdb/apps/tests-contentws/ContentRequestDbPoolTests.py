@@ -0,0 +1,227 @@
+##
+#
+# File:    ContentRequestDbPoolTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  health checks after the check interval
+#   18-Oct-2026 ep  health checks do not block other checkouts
+##
+"""
+Test cases for the per-process database connection pool using SQLite as a stand-in for the
+MySQL resources -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestDbPool import ContentRequestDbPool, getDbPool  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class SqliteConnection(object):
+    """Connection holder with the MyConnectionBase connection methods for an SQLite database."""
+
+    def __init__(self, dbPath):
+        self.__dbPath = dbPath
+        self._dbCon = None
+
+    def openConnection(self):
+        self._dbCon = sqlite3.connect(self.__dbPath, check_same_thread=False)
+        return True
+
+    def getConnection(self):
+        return self._dbCon
+
+    def closeConnection(self):
+        if self._dbCon is not None:
+            self._dbCon.close()
+            self._dbCon = None
+            return True
+        return False
+
+
+class StalledConnection(SqliteConnection):
+    """Connection holder whose health check query waits until released."""
+
+    def __init__(self, dbPath, event):
+        super(StalledConnection, self).__init__(dbPath)
+        self.__event = event
+
+    def getConnection(self):
+        return self if self._dbCon is not None else None
+
+    def cursor(self):
+        curs = self._dbCon.cursor()
+        event = self.__event
+
+        class StalledCursor(object):
+            def execute(self, sqlS):
+                if sqlS == "SELECT 1":
+                    event.wait(5)
+                return curs.execute(sqlS)
+
+            def __getattr__(self, name):
+                return getattr(curs, name)
+
+        return StalledCursor()
+
+
+class ContentRequestDbPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__dbPath = os.path.join(self.__workPath, "da_internal.db")
+        dbCon = sqlite3.connect(self.__dbPath)
+        dbCon.execute("CREATE TABLE rcsb_status (dep_set_id TEXT, status_code TEXT)")
+        dbCon.executemany("INSERT INTO rcsb_status VALUES (?, ?)", [("D_1000000001", "REL"), ("D_1000000002", "HPUB")])
+        dbCon.commit()
+        dbCon.close()
+        self.__holderList = []
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __factory(self, resourceName):
+        logger.debug("Opening connection for %r", resourceName)
+        holder = SqliteConnection(self.__dbPath)
+        holder.openConnection()
+        self.__holderList.append(holder)
+        return holder
+
+    def __query(self, pool, resourceName="DA_INTERNAL"):
+        with pool.connection(resourceName) as dbCon:
+            curs = dbCon.cursor()
+            curs.execute("SELECT dep_set_id, status_code FROM rcsb_status ORDER BY dep_set_id")
+            return curs.fetchall()
+
+    def testConnectionReuse(self):
+        """Test case -  consecutive queries and requests reuse one connection per resource"""
+        pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", maxSize=4, idleTimeout=300, connectionFactory=self.__factory)
+        # Four tables per request for ten consecutive requests
+        for _ in range(10):
+            for _ in range(4):
+                self.assertEqual(len(self.__query(pool)), 2)
+        self.__query(pool, "STATUS")
+        statD = pool.getStats()
+        logger.info("Pool statistics %r", statD)
+        self.assertEqual(statD["opened"], 2)
+        self.assertEqual(statD["reused"], 39)
+        self.assertEqual(len(self.__holderList), 2)
+        self.assertEqual(pool.getOpenCount("DA_INTERNAL"), 1)
+        pool.clear()
+        self.assertEqual(pool.getOpenCount("DA_INTERNAL"), 0)
+        self.assertTrue(all([h.getConnection() is None for h in self.__holderList]))
+
+    def testHealthCheckAndIdleTimeout(self):
+        """Test case -  broken and idle connections are replaced"""
+        pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", maxSize=2, idleTimeout=0.2, checkInterval=0, connectionFactory=self.__factory)
+        self.__query(pool)
+        # Break the pooled connection behind the pool's back
+        self.__holderList[0].getConnection().close()
+        self.assertEqual(len(self.__query(pool)), 2)
+        self.assertEqual(pool.getStats()["failed_checks"], 1)
+        self.assertEqual(len(self.__holderList), 2)
+        #
+        time.sleep(0.3)
+        self.assertEqual(len(self.__query(pool)), 2)
+        self.assertEqual(len(self.__holderList), 3)
+        self.assertIsNone(self.__holderList[1].getConnection())
+        self.assertEqual(pool.getOpenCount("DA_INTERNAL"), 1)
+        #
+        # A connection used in a failing block is not returned to the pool
+        try:
+            with pool.connection("DA_INTERNAL") as dbCon:
+                dbCon.execute("SELECT * FROM no_such_table")
+        except sqlite3.OperationalError:
+            pass
+        self.assertEqual(pool.getOpenCount("DA_INTERNAL"), 0)
+
+    def testMaxSize(self):
+        """Test case -  the number of connections per resource is bounded"""
+        pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", maxSize=1, waitTimeout=0.2, connectionFactory=self.__factory)
+        holder = pool.checkout("DA_INTERNAL")
+        self.assertRaises(RuntimeError, pool.checkout, "DA_INTERNAL")
+        #
+        timer = threading.Timer(0.05, pool.checkin, args=("DA_INTERNAL", holder))
+        timer.start()
+        holder2 = pool.checkout("DA_INTERNAL")
+        timer.join()
+        self.assertIs(holder, holder2)
+        self.assertEqual(len(self.__holderList), 1)
+        pool.checkin("DA_INTERNAL", holder2)
+
+    def testStalledHealthCheck(self):
+        """Test case -  a stalled health check does not block checkouts of other connections"""
+        event = threading.Event()
+
+        def factory(resourceName):
+            if resourceName == "STATUS":
+                return self.__factory(resourceName)
+            holder = StalledConnection(self.__dbPath, event)
+            holder.openConnection()
+            return holder
+
+        pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", maxSize=2, checkInterval=0, connectionFactory=factory)
+        holder = pool.checkout("DA_INTERNAL")
+        pool.checkin("DA_INTERNAL", holder)
+        self.__query(pool, "STATUS")
+        #
+        resultD = {}
+        thread = threading.Thread(target=lambda: resultD.update({"holder": pool.checkout("DA_INTERNAL")}))
+        thread.start()
+        time.sleep(0.1)
+        startTime = time.time()
+        self.assertEqual(len(self.__query(pool, "STATUS")), 2)
+        self.assertEqual(pool.getOpenCount("DA_INTERNAL"), 1)
+        self.assertLess(time.time() - startTime, 1.0)
+        event.set()
+        thread.join()
+        self.assertIs(resultD["holder"], holder)
+        pool.checkin("DA_INTERNAL", holder)
+        pool.clear()
+
+    def testProcessPool(self):
+        """Test case -  one pool per site in a process"""
+        self.assertIs(getDbPool("WWPDB_DEPLOY"), getDbPool("WWPDB_DEPLOY"))
+        self.assertIsNot(getDbPool("WWPDB_DEPLOY"), getDbPool("WWPDB_DEPLOY_TEST"))
+
+
+def suiteDbPool():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestDbPoolTests("testConnectionReuse"))
+    suiteSelect.addTest(ContentRequestDbPoolTests("testHealthCheckAndIdleTimeout"))
+    suiteSelect.addTest(ContentRequestDbPoolTests("testMaxSize"))
+    suiteSelect.addTest(ContentRequestDbPoolTests("testStalledHealthCheck"))
+    suiteSelect.addTest(ContentRequestDbPoolTests("testProcessPool"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteDbPool()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,146 @@
+##
+#
+# File:    ContentRequestJsonSerializerTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for the JSON serialization backends and a report writing benchmark -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import ContentRequestJsonSerializer, getBackendNames  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import ContentRequestReportWriter  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestJsonSerializerTests(unittest.TestCase):
+    def testBackendSelection(self):
+        """Test case -  the preferred installed backend is used unless configured"""
+        backendL = getBackendNames()
+        logger.info("Installed JSON backends %r", backendL)
+        self.assertEqual(backendL[-1], "json")
+        self.assertEqual(ContentRequestJsonSerializer().getName(), backendL[0])
+        with mock.patch.dict(configInfo, {"SITE_WS_CONTENT_JSON_BACKEND": "json"}):
+            self.assertEqual(ContentRequestJsonSerializer().getName(), "json")
+        self.assertEqual(ContentRequestJsonSerializer("nosuchbackend").getName(), backendL[0])
+
+    def testSerialize(self):
+        """Test case -  backends produce equivalent JSON"""
+        rD = {"status": "REL", "title": "a/b å \"quoted\"", "count": 3, "value": 1.5, "missing": None, "list": [1, 2]}
+        for backend in getBackendNames():
+            sr = ContentRequestJsonSerializer(backend)
+            bS = sr.dumps(rD)
+            self.assertIsInstance(bS, bytes)
+            self.assertEqual(json.loads(bS.decode("utf-8")), rD)
+            # Values outside the range of the faster backends are still serialized
+            self.assertEqual(json.loads(sr.dumps({"big": 2**70})), {"big": 2**70})
+            with self.assertRaises(TypeError):
+                sr.dumps({"bad": object()})
+        self.assertEqual(ContentRequestJsonSerializer("json").dumps(rD), json.dumps(rD).encode("utf-8"))
+
+
+@unittest.skipUnless(os.environ.get("CONTENTWS_RUN_BENCHMARKS"), "Set CONTENTWS_RUN_BENCHMARKS to run the report benchmark")
+class ContentRequestJsonSerializerBenchmarkTests(unittest.TestCase):
+    """Write a synthetic 1M row summary report with each backend."""
+
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__nRows = 1000000
+        attrList = ["Structure_ID", "status_code", "email", "name_first", "name_last", "country", "phone", "role", "organization_type", "identifier_ORCID"]
+        self.__templateD = {a: "%s value" % a for a in attrList}
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __rowGenerator(self):
+        for ii in range(self.__nRows):
+            d = dict(self.__templateD)
+            d["Structure_ID"] = "D_%010d" % ii
+            yield d
+
+    def __write(self, backend, reportPath):
+        with ContentRequestReportWriter(reportPath, serializer=ContentRequestJsonSerializer(backend)) as wr:
+            wr.writeCategory("pdbx_contact_author", self.__rowGenerator())
+        return wr.getRowCount()
+
+    def testReportBenchmark(self):
+        """Test case -  time and peak memory to write the report with each backend"""
+        resultD = {}
+        for backend in getBackendNames():
+            reportPath = os.path.join(self.__workPath, "report-%s.json" % backend)
+            startTime = time.time()
+            self.assertEqual(self.__write(backend, reportPath), self.__nRows)
+            elapsed = time.time() - startTime
+            # Memory is traced in a separate pass as tracing slows allocation
+            tracemalloc.start()
+            self.__write(backend, reportPath)
+            _, peakMemory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            resultD[backend] = (elapsed, peakMemory)
+            logger.info("Backend %-6s rows %d time (%.2f seconds) peak memory %.2f MB size %d", backend, self.__nRows, elapsed, peakMemory / 1.0e6, os.path.getsize(reportPath))
+        #
+        with open(os.path.join(self.__workPath, "report-%s.json" % getBackendNames()[0]), "rb") as ifh:
+            ifh.seek(-200, os.SEEK_END)
+            self.assertTrue(ifh.read().endswith(b'"identifier_ORCID value"}]}'))
+        # Peak memory is bounded by the batch of rows serialized together
+        for backend, (_, peakMemory) in resultD.items():
+            self.assertLess(peakMemory, 50.0e6, backend)
+        if "orjson" in resultD:
+            self.assertLess(resultD["orjson"][0], resultD["json"][0])
+
+
+def suiteSerializer():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestJsonSerializerTests("testBackendSelection"))
+    suiteSelect.addTest(ContentRequestJsonSerializerTests("testSerialize"))
+    return suiteSelect
+
+
+def suiteSerializerBenchmark():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestJsonSerializerBenchmarkTests("testReportBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSerializer()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
+    #
+    mySuite = suiteSerializerBenchmark()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,195 @@
+##
+#
+# File:    ContentRequestModelLocatorTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  cached archive model file locations
+#
+##
+"""
+Test cases for locating entry model files in the content request consumer -
+
+The archive and deposit path lookup and the model generation server are replaced by local stand-ins.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content import ContentRequestModelLocator  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestModelCache import ContentRequestModelCache  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+_pathD = {}
+_scanD = {"archive": 0}
+
+
+class FakePathInfo(object):
+    """Model file paths under <top>/<file source>/<dataset>."""
+
+    def __init__(self, siteId=None, sessionPath=None, verbose=False):  # pylint: disable=unused-argument
+        self.__sessionPath = sessionPath
+
+    def getDirPath(self, dataSetId, fileSource="archive"):
+        return os.path.join(_pathD["top"], fileSource, dataSetId)
+
+    def getModelPdbxFilePath(self, dataSetId, fileSource="archive", versionId="latest"):  # pylint: disable=unused-argument
+        if fileSource == "session":
+            return os.path.join(self.__sessionPath, dataSetId + "_model_P1.cif.V1")
+        if fileSource == "archive":
+            # The latest version is found by a scan of the archive directory
+            _scanD["archive"] += 1
+            vL = [fn for fn in os.listdir(self.getDirPath(dataSetId)) if ".cif.V" in fn] if os.path.isdir(self.getDirPath(dataSetId)) else []
+            if vL:
+                return os.path.join(self.getDirPath(dataSetId), sorted(vL)[-1].replace(".gz", ""))
+        return os.path.join(self.getDirPath(dataSetId, fileSource), dataSetId + "_model_P1.cif.V1")
+
+
+class ContentRequestModelLocatorTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__sessionPath = os.path.join(self.__workPath, "session")
+        os.makedirs(self.__sessionPath)
+        _pathD["top"] = self.__workPath
+        _scanD["archive"] = 0
+        ContentRequestModelCache().clear()
+        self.__patchList = [
+            mock.patch.object(ContentRequestModelLocator, "PathInfo", FakePathInfo),
+            mock.patch.object(ContentRequestModelLocator, "ModelGenerateClient"),
+        ]
+        _, mgc = [p.start() for p in self.__patchList]
+        self.__generate = mgc.return_value.generate
+        self.__generate.side_effect = self.__generateModel
+
+    def tearDown(self):
+        for p in reversed(self.__patchList):
+            p.stop()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __generateModel(self, siteId, dataSetId, sessionPath, timeout=30):  # pylint: disable=unused-argument
+        if dataSetId == "D_3":
+            return "failed"
+        with open(os.path.join(sessionPath, dataSetId + "_model_P1.cif.V1"), "w") as ofh:
+            ofh.write("data_%s\n%s\n" % (dataSetId, "#" * 200))
+        return "ok"
+
+    def __writeModel(self, fileSource, dataSetId, suffix="", version=1):
+        dirPath = os.path.join(self.__workPath, fileSource, dataSetId)
+        if not os.path.isdir(dirPath):
+            os.makedirs(dirPath)
+        fp = os.path.join(dirPath, dataSetId + "_model_P1.cif.V%d" % version + suffix)
+        with open(fp, "w") as ofh:
+            ofh.write("data_%s\n" % dataSetId)
+        return fp
+
+    def testArchiveAndDeposit(self):
+        """Test case -  archive and deposit model files are read in place"""
+        ml = ContentRequestModelLocator.ContentRequestModelLocator(self.__sessionPath, siteId="WWPDB_DEPLOY")
+        fp = self.__writeModel("archive", "D_1")
+        self.assertEqual(ml.getModelFilePath("D_1"), fp)
+        self.assertEqual(ml.getBytesCopied(fp), 0)
+        fp = self.__writeModel("archive", "D_2", suffix=".gz")
+        self.assertEqual(ml.getModelFilePath("D_2"), fp)
+        fp = self.__writeModel("deposit", "D_3")
+        self.assertEqual(ml.getModelFilePath("D_3"), fp)
+        self.assertEqual(self.__generate.call_count, 1)
+        self.assertIsNone(ml.getModelFilePath("D_%s" % ("9" * 30)))
+
+    def testGenerate(self):
+        """Test case -  models are generated in the session without an archive model file"""
+        ml = ContentRequestModelLocator.ContentRequestModelLocator(self.__sessionPath, siteId="WWPDB_DEPLOY")
+        fp = ml.getModelFilePath("D_4")
+        self.assertEqual(fp, os.path.join(self.__sessionPath, "D_4_model_P1.cif.V1"))
+        self.assertEqual(ml.getBytesCopied(fp), os.path.getsize(fp))
+        # Bulk requests do not generate models
+        self.assertIsNone(ml.getModelFilePath("D_5", generateModel=False))
+        self.assertEqual(self.__generate.call_count, 1)
+
+    def testCachedLookup(self):
+        """Test case -  repeated requests do not scan the archive directory until it changes"""
+        ml = ContentRequestModelLocator.ContentRequestModelLocator(self.__sessionPath, siteId="WWPDB_DEPLOY")
+        fp = self.__writeModel("archive", "D_1")
+        self.__writeModel("deposit", "D_6")
+        startTime = time.time()
+        for _ in range(100):
+            self.assertEqual(ml.getModelFilePath("D_1"), fp)
+            self.assertEqual(ml.getModelFilePath("D_6", generateModel=False), os.path.join(self.__workPath, "deposit", "D_6", "D_6_model_P1.cif.V1"))
+        logger.info("200 lookups in (%.4f seconds) archive scans %d stats %r", time.time() - startTime, _scanD["archive"], ContentRequestModelCache().getStats())
+        self.assertEqual(_scanD["archive"], 2)
+        # A new model version invalidates the entry
+        fp = self.__writeModel("archive", "D_1", version=2)
+        self.assertEqual(ml.getModelFilePath("D_1"), fp)
+        self.assertEqual(_scanD["archive"], 3)
+        eD = ContentRequestModelCache().get("WWPDB_DEPLOY", "D_1")
+        self.assertEqual((eD["path"], eD["version"]), (fp, 2))
+        # A new archive directory invalidates an entry without a model
+        fp = self.__writeModel("archive", "D_6")
+        self.assertEqual(ml.getModelFilePath("D_6", generateModel=False), fp)
+        self.assertEqual(_scanD["archive"], 4)
+
+    def testSharedCache(self):
+        """Test case -  entries are shared through the cache directory"""
+        cachePath = os.path.join(self.__workPath, "model-cache")
+        fp = self.__writeModel("archive", "D_1")
+        dirPath = os.path.dirname(fp)
+        mc = ContentRequestModelCache(cachePath=cachePath)
+        self.assertTrue(mc.isShared())
+        mc.set("WWPDB_DEPLOY", "D_1", dirPath, os.stat(dirPath).st_mtime_ns, fp)
+        # Another process starts with an empty process cache
+        mc.clear()
+        self.assertIsNone(ContentRequestModelCache().get("WWPDB_DEPLOY", "D_1"))
+        self.assertEqual(ContentRequestModelCache(cachePath=cachePath).get("WWPDB_DEPLOY", "D_1")["path"], fp)
+        self.assertEqual(ContentRequestModelCache().get("WWPDB_DEPLOY", "D_1")["path"], fp)
+
+    def testSiteLookup(self):
+        """Test case -  dataset sites are looked up once"""
+        with mock.patch.object(ContentRequestModelLocator, "ConfigInfoDataSet") as cids:
+            cids.return_value.getSiteId.return_value = "UNASSIGNED"
+            ml = ContentRequestModelLocator.ContentRequestModelLocator(self.__sessionPath)
+            for _ in range(10):
+                self.assertEqual(ml.getDataSetSiteId("D_1"), "WWPDB_DEPLOY")
+            self.assertEqual(cids.return_value.getSiteId.call_count, 1)
+
+
+def suiteModelLocator():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestModelLocatorTests("testArchiveAndDeposit"))
+    suiteSelect.addTest(ContentRequestModelLocatorTests("testGenerate"))
+    suiteSelect.addTest(ContentRequestModelLocatorTests("testCachedLookup"))
+    suiteSelect.addTest(ContentRequestModelLocatorTests("testSharedCache"))
+    suiteSelect.addTest(ContentRequestModelLocatorTests("testSiteLookup"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteModelLocator()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
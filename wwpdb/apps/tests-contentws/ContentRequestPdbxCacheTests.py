@@ -0,0 +1,121 @@
+##
+#
+# File:    ContentRequestPdbxCacheTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for the on-disk cache of categories read from PDBx files -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestPdbxCache import ContentRequestPdbxCache  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportPdbx import ContentRequestReportPdbx  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestPdbxCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__verbose = True
+        self.__pdbxFilePath = os.path.join(HERE, "data", "1kip.cif")
+        self.__cachePath = tempfile.mkdtemp()
+        self.__logFilePath = os.path.join(self.__cachePath, "my.log")
+        self.__catList = ["entity", "entity_poly", "database_2"]
+
+    def tearDown(self):
+        shutil.rmtree(self.__cachePath, ignore_errors=True)
+
+    def testCacheRoundTrip(self):
+        """Test case -  cached containers match the parsed containers"""
+        cache = ContentRequestPdbxCache(cachePath=os.path.join(self.__cachePath, "cache"))
+        self.assertTrue(cache.isEnabled())
+        cr = ContentRequestReportPdbx(self.__verbose, cache=cache)
+        cL1 = cr.readFilePdbx(self.__pdbxFilePath, self.__logFilePath, self.__catList)
+        key = cache.getKey(self.__pdbxFilePath, self.__catList)
+        cL2 = cache.get(key)
+        self.assertIsNotNone(cL2)
+        self.assertEqual(len(cL1), len(cL2))
+        for c1, c2 in zip(cL1, cL2):
+            self.assertEqual(c1.getName(), c2.getName())
+            self.assertEqual(sorted(c1.getObjNameList()), sorted(c2.getObjNameList()))
+            for catName in c1.getObjNameList():
+                self.assertEqual(c1.getObj(catName).getAttributeList(), c2.getObj(catName).getAttributeList())
+                self.assertEqual(c1.getObj(catName).getRowList(), c2.getObj(catName).getRowList())
+        #
+        # Category selection is part of the key
+        self.assertIsNone(cache.get(cache.getKey(self.__pdbxFilePath, ["entity"])))
+
+    def testCacheEviction(self):
+        """Test case -  least recently used entries are removed when over size"""
+        cachePath = os.path.join(self.__cachePath, "cache")
+        cache = ContentRequestPdbxCache(cachePath=cachePath, maxBytes=20000)
+        cr = ContentRequestReportPdbx(self.__verbose, cache=cache)
+        cr.readFilePdbx(self.__pdbxFilePath, self.__logFilePath, ["entity_poly"])
+        k1 = cache.getKey(self.__pdbxFilePath, ["entity_poly"])
+        os.utime(os.path.join(cachePath, k1 + ".json"), (1, 1))
+        cr.readFilePdbx(self.__pdbxFilePath, self.__logFilePath, ["atom_site"])
+        k2 = cache.getKey(self.__pdbxFilePath, ["atom_site"])
+        # atom_site alone exceeds the bound - both entries are gone
+        self.assertIsNone(cache.get(k1))
+        self.assertIsNone(cache.get(k2))
+        cr.readFilePdbx(self.__pdbxFilePath, self.__logFilePath, ["entity"])
+        self.assertIsNotNone(cache.get(cache.getKey(self.__pdbxFilePath, ["entity"])))
+
+    def testCacheColdWarmBenchmark(self):
+        """Test case -  compare cold and warm extraction latency"""
+        cache = ContentRequestPdbxCache(cachePath=os.path.join(self.__cachePath, "cache"))
+        cr = ContentRequestReportPdbx(self.__verbose, cache=cache)
+        for ctype in ["report-entry-example-sasbdb", "report-entry-example-emdb"]:
+            cache.clear()
+            startTime = time.time()
+            rD1 = cr.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+            coldTime = time.time() - startTime
+            #
+            nIter = 10
+            startTime = time.time()
+            for _ in range(nIter):
+                rD2 = cr.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+            warmTime = (time.time() - startTime) / nIter
+            self.assertEqual(rD1, rD2)
+            logger.info("%s cold %.4f seconds warm %.4f seconds (x%.1f)", ctype, coldTime, warmTime, coldTime / max(warmTime, 1.0e-6))
+
+
+def suiteCache():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestPdbxCacheTests("testCacheRoundTrip"))
+    suiteSelect.addTest(ContentRequestPdbxCacheTests("testCacheEviction"))
+    suiteSelect.addTest(ContentRequestPdbxCacheTests("testCacheColdWarmBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteCache()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
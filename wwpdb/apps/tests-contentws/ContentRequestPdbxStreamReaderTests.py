@@ -0,0 +1,201 @@
+##
+#
+# File:    ContentRequestPdbxStreamReaderTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  add gzip compressed input tests
+##
+"""
+Test cases for the streaming category reader for large PDBx files -
+
+The size of the synthetic file in the memory benchmark may be set with the environment
+variable CONTENTWS_BENCHMARK_STREAM_MB (e.g. 500).
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import gzip
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from mmcif.io.IoAdapterCore import IoAdapterCore  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content.ContentRequestPdbxCache import ContentRequestPdbxCache  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestPdbxStreamReader import ContentRequestPdbxStreamReader  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportPdbx import ContentRequestReportPdbx  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestPdbxStreamReaderTests(unittest.TestCase):
+    def setUp(self):
+        self.__verbose = True
+        self.__pdbxFilePath = os.path.join(HERE, "data", "1kip.cif")
+        self.__workPath = tempfile.mkdtemp()
+        self.__logFilePath = os.path.join(self.__workPath, "my.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __compareContainers(self, cRef, cTest, catNameList):
+        for catName in catNameList:
+            oRef = cRef.getObj(catName)
+            oTest = cTest.getObj(catName)
+            self.assertIsNotNone(oTest, catName)
+            self.assertEqual(oRef.getAttributeList(), oTest.getAttributeList(), catName)
+            self.assertEqual(oRef.getRowList(), oTest.getRowList(), catName)
+
+    def testReadSelectedCategories(self):
+        """Test case -  selected categories match those from the full parser"""
+        io = IoAdapterCore(verbose=self.__verbose, log=sys.stderr)
+        cRef = io.readFile(self.__pdbxFilePath)[0]
+        catNameList = cRef.getObjNameList()
+        sr = ContentRequestPdbxStreamReader()
+        cL = sr.readFile(self.__pdbxFilePath, catNameList)
+        self.assertEqual(len(cL), 1)
+        self.assertEqual(cL[0].getName(), cRef.getName())
+        self.assertEqual(sorted(cL[0].getObjNameList()), sorted(catNameList))
+        self.__compareContainers(cRef, cL[0], catNameList)
+        #
+        # Key-value, loop and text field categories
+        catNameList = ["entity_poly", "struct", "database_2", "audit_author", "citation"]
+        cL = sr.readFile(self.__pdbxFilePath, catNameList)
+        self.assertEqual(sorted(cL[0].getObjNameList()), sorted(catNameList))
+        self.__compareContainers(cRef, cL[0], catNameList)
+        #
+        cL = sr.readFile(self.__pdbxFilePath, ["no_such_category"])
+        self.assertEqual(cL[0].getObjNameList(), [])
+
+    def testEarlyStop(self):
+        """Test case -  reading stops once all selected categories have been read"""
+        sr = ContentRequestPdbxStreamReader()
+        cL = sr.readFile(self.__pdbxFilePath, ["database_2", "entity_poly"])
+        self.assertEqual(sorted(cL[0].getObjNameList()), ["database_2", "entity_poly"])
+        self.assertEqual(cL[0].getObj("database_2").getRowCount(), 2)
+        statD = sr.getStats()
+        logger.info("Scanned %r of %d bytes", statD, os.path.getsize(self.__pdbxFilePath))
+        self.assertLess(statD["bytes_scanned"], os.path.getsize(self.__pdbxFilePath) // 10)
+
+    def testStreamingExtraction(self):
+        """Test case -  content extraction with the streaming reader matches the full parser"""
+        cache = ContentRequestPdbxCache(cachePath=os.path.join(self.__workPath, "cache"), maxBytes=0)
+        crFull = ContentRequestReportPdbx(self.__verbose, cache=cache, streamMinBytes=-1)
+        crStream = ContentRequestReportPdbx(self.__verbose, cache=cache, streamMinBytes=0)
+        for ctype in ["report-entry-example-sasbdb", "report-entry-example-emdb", "report-entry-example-test"]:
+            rD1 = crFull.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+            rD2 = crStream.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+            self.assertEqual(rD1, rD2, ctype)
+
+    def testCompressedInput(self):
+        """Test case -  gzip compressed files are read in place with the same content"""
+        gzPath = os.path.join(self.__workPath, "1kip.cif.gz")
+        with open(self.__pdbxFilePath, "rb") as ifh, gzip.open(gzPath, "wb") as ofh:
+            shutil.copyfileobj(ifh, ofh)
+        catNameList = ["entity_poly", "struct", "database_2", "audit_author", "citation", "pdbx_poly_seq_scheme"]
+        sr = ContentRequestPdbxStreamReader()
+        cRef = sr.readFile(self.__pdbxFilePath, catNameList)[0]
+        self.assertEqual(sr.getStats()["bytes_read"], sr.getStats()["bytes_scanned"])
+        cL = sr.readFile(gzPath, catNameList)
+        self.__compareContainers(cRef, cL[0], catNameList)
+        statD = sr.getStats()
+        logger.info("Compressed read %r", statD)
+        self.assertLessEqual(statD["bytes_read"], os.path.getsize(gzPath))
+        self.assertLess(statD["bytes_read"], statD["bytes_scanned"])
+        #
+        # Content extraction -  no decompressed copy is written beside the compressed file
+        cache = ContentRequestPdbxCache(cachePath=os.path.join(self.__workPath, "cache"), maxBytes=0)
+        cr = ContentRequestReportPdbx(self.__verbose, cache=cache)
+        for ctype in ["report-entry-example-sasbdb", "report-entry-example-test"]:
+            rD1 = cr.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+            rD2 = cr.extractContent(gzPath, self.__logFilePath, ctype)
+            self.assertEqual(rD1, rD2, ctype)
+        cL = cr.readFilePdbx(gzPath, self.__logFilePath)
+        self.assertEqual(len(cL[0].getObjNameList()), 60)
+        self.assertEqual(os.listdir(self.__workPath), ["1kip.cif.gz"])
+        ioD = cr.getIoCounters()
+        logger.info("IO counters %r", ioD)
+        self.assertEqual(ioD["files_read"], 5)
+
+    def __makeSyntheticFile(self, filePath, nBytes):
+        """Write a model file with an atom_site category of about nBytes followed by the selected categories."""
+        with open(self.__pdbxFilePath, "r") as ifh:
+            lineL = ifh.readlines()
+        # Header up to the first atom_site loop and everything after the atom_site loop
+        iStart = [ii for ii, line in enumerate(lineL) if line.startswith("_atom_site.")][0] - 1
+        iEnd = [ii for ii, line in enumerate(lineL) if line.startswith("_atom_site_anisotrop.") or line.startswith("_pdbx_poly_seq_scheme.")][0] - 1
+        atomL = [line for line in lineL[iStart:iEnd] if line.startswith("ATOM") or line.startswith("HETATM")]
+        headL = [line for line in lineL[iStart:iEnd] if not (line.startswith("ATOM") or line.startswith("HETATM") or line.startswith("#"))]
+        with open(filePath, "w") as ofh:
+            ofh.write("".join(lineL[:iStart]))
+            ofh.write("".join(headL))
+            nW = 0
+            block = "".join(atomL)
+            while nW < nBytes:
+                ofh.write(block)
+                nW += len(block)
+            ofh.write("#\n")
+            ofh.write("loop_\n_pdbx_synthetic_tail.id\n_pdbx_synthetic_tail.value\n1 first\n2 'second value'\n#\n")
+
+    def testMemoryBenchmark(self):
+        """Test case -  peak memory for selected categories of a large synthetic file"""
+        nMb = int(os.environ.get("CONTENTWS_BENCHMARK_STREAM_MB", "20"))
+        filePath = os.path.join(self.__workPath, "synthetic.cif")
+        self.__makeSyntheticFile(filePath, nMb * 1024 * 1024)
+        fSize = os.path.getsize(filePath)
+        catNameList = ["entity_poly", "struct", "database_2", "pdbx_synthetic_tail"]
+        sr = ContentRequestPdbxStreamReader()
+        #
+        tracemalloc.start()
+        startTime = time.time()
+        cL = sr.readFile(filePath, catNameList)
+        elapsed = time.time() - startTime
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        #
+        self.assertEqual(sorted(cL[0].getObjNameList()), sorted(catNameList))
+        self.assertEqual(cL[0].getObj("pdbx_synthetic_tail").getRowList(), [["1", "first"], ["2", "second value"]])
+        logger.info("Streaming read of %.1f MB file in %.2f seconds peak traced memory %.2f MB", fSize / 1.0e6, elapsed, peak / 1.0e6)
+        # Memory does not grow with the size of the skipped atom_site category
+        self.assertLess(peak, 8 * 1024 * 1024)
+        #
+        # Categories ahead of atom_site do not require a scan of the file
+        cL = sr.readFile(filePath, ["entity_poly", "database_2"])
+        self.assertLess(sr.getStats()["bytes_scanned"], fSize // 100)
+
+
+def suiteStreamReader():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestPdbxStreamReaderTests("testReadSelectedCategories"))
+    suiteSelect.addTest(ContentRequestPdbxStreamReaderTests("testEarlyStop"))
+    suiteSelect.addTest(ContentRequestPdbxStreamReaderTests("testStreamingExtraction"))
+    suiteSelect.addTest(ContentRequestPdbxStreamReaderTests("testCompressedInput"))
+    suiteSelect.addTest(ContentRequestPdbxStreamReaderTests("testMemoryBenchmark"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteStreamReader()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,417 @@
+##
+#
+# File:    ContentRequestProxyReportPdbxTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  remote client pool tests with a keep-alive stand-in service
+#   18-Oct-2026 ep  batch retrieval from two stand-in remote sites
+#   18-Oct-2026 ep  downloads completing after the deadline do not write the report
+#   18-Oct-2026 ep  a resubmitted proxy report does not change the linked reports of other sessions
+##
+"""
+Test cases for retrieving proxy reports from a local stand-in for the remote content service -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+try:
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    from urlparse import parse_qs, urlparse
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestBatchProxy import ContentRequestBatchProxy  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestProxyClientPool import ContentRequestProxyClientPool  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestProxyReportPdbx import ContentRequestProxyReportPdbx  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportStore import ContentRequestReportStore, getFileDigests  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class RemoteServiceHandler(BaseHTTPRequestHandler):
+    """Stand-in for the remote content service -  a report for dataset D_<n> completes (n mod 10)/10 seconds after
+    submission and D_FAIL reports failure."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def __params(self):
+        pD = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        length = int(self.headers.get("Content-Length", 0))
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                body += self.rfile.read(size + 2)[:size]
+                if size == 0:
+                    break
+        else:
+            body = self.rfile.read(length) if length else b""
+        pD.update({k: v[0] for k, v in parse_qs(body.decode("utf-8")).items()})
+        return pD
+
+    def __reply(self, rD, body=None):
+        self.send_response(200)
+        if body is not None:
+            self.send_header("checksum_md5", hashlib.md5(body).hexdigest())
+        else:
+            rD.update({"errorflag": False, "statusmessage": "ok"})
+            body = json.dumps(rD).encode("utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.__handle()
+
+    def do_GET(self):
+        self.__handle()
+
+    def __handle(self):
+        state = self.server.state
+        endPoint = urlparse(self.path).path.split("/")[-1]
+        pD = self.__params()
+        if endPoint == "download":
+            time.sleep(state.get("download_delay", 0))
+        with state["lock"]:
+            state["connections"].add(self.client_address)
+            state["tokens"].add(self.headers.get("wwpdb-api-token"))
+            if endPoint == "session":
+                state["count"] += 1
+                self.__reply({"session_id": "session-%d" % state["count"]})
+            elif endPoint == "entry_content":
+                state["sessions"][pD["session_id"]] = (time.time(), pD["request_dataset_id"], pD["request_content_type"])
+                self.__reply({})
+            elif endPoint == "session_status":
+                state["polls"] += 1
+                tS, dataSetId, _ = state["sessions"][pD["session_id"]]
+                if dataSetId == "D_FAIL":
+                    self.__reply({"status": "failed"})
+                elif time.time() - tS >= (int(dataSetId[2:]) % 10) / 10.0:
+                    self.__reply({"status": "completed"})
+                else:
+                    self.__reply({"status": "running"})
+            elif endPoint == "download":
+                _, dataSetId, contentType = state["sessions"][pD["session_id"]]
+                self.__reply({}, body=json.dumps({"dataset": dataSetId, "content_type": contentType}).encode("utf-8"))
+            else:
+                self.send_error(404)
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ContentRequestProxyReportPdbxTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        keyPath = os.path.join(self.__workPath, "api.key")
+        with open(keyPath, "w") as ofh:
+            ofh.write("SOMEKEY")
+        self.__configPatch = mock.patch.dict(configInfo, {"SITE_WS_CONTENT_WWPDB_KEY": keyPath})
+        self.__configPatch.start()
+        #
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteServiceHandler)
+        self.__server.state = {"lock": threading.Lock(), "count": 0, "polls": 0, "sessions": {}, "connections": set(), "tokens": set()}
+        self.__thread = threading.Thread(target=self.__server.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        self.__apiUrl = "http://127.0.0.1:%d" % self.__server.server_address[1]
+
+    def tearDown(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__configPatch.stop()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __reportPath(self, ii):
+        return os.path.join(self.__workPath, "report-%d.json" % ii)
+
+    def testRetrieve(self):
+        """Test case -  a report is picked up shortly after the remote completes"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.1, pollMaxInterval=0.4)
+        startTime = time.time()
+        ok = cr.retrieveProxyReport("D_3", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(1))
+        elapsed = time.time() - startTime
+        logger.info("Remote report completing in 0.3 seconds retrieved in (%.2f seconds)", elapsed)
+        self.assertTrue(ok)
+        self.assertLess(elapsed, 1.0)
+        with open(self.__reportPath(1), "r") as ifh:
+            self.assertEqual(json.load(ifh), {"dataset": "D_3", "content_type": "report-entry-wwpdb-status"})
+        #
+        self.assertFalse(cr.retrieveProxyReport("D_FAIL", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(2)))
+
+    def testConcurrentRequests(self):
+        """Test case -  many outstanding requests are polled concurrently"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.1, pollMaxInterval=0.2)
+        rL = [("D_5", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(ii)) for ii in range(20)]
+        startTime = time.time()
+        statusList = cr.retrieveProxyReports(rL)
+        elapsed = time.time() - startTime
+        logger.info("Twenty remote reports completing in 0.5 seconds retrieved in (%.2f seconds) with %d polls", elapsed, self.__server.state["polls"])
+        self.assertEqual(statusList, [True] * 20)
+        self.assertLess(elapsed, 2.0)
+
+    def testDeadline(self):
+        """Test case -  requests are abandoned at the deadline"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.1, pollMaxInterval=0.2, timeout=0.5)
+        startTime = time.time()
+        self.assertFalse(cr.retrieveProxyReport("D_9", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(1)))
+        self.assertLess(time.time() - startTime, 1.5)
+        self.assertFalse(os.access(self.__reportPath(1), os.F_OK))
+
+    def testLateDownload(self):
+        """Test case -  a download completing after the deadline does not replace the report"""
+        with open(self.__reportPath(1), "w") as ofh:
+            ofh.write("PREVIOUS")
+        self.__server.state["download_delay"] = 1.0
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.05, pollMaxInterval=0.1, timeout=0.5)
+        self.assertFalse(cr.retrieveProxyReport("D_1", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(1)))
+        # The download thread completes after the request has failed
+        time.sleep(1.5)
+        with open(self.__reportPath(1), "r") as ifh:
+            self.assertEqual(ifh.read(), "PREVIOUS")
+        self.assertEqual(sorted(os.listdir(self.__workPath)), ["api.key", "report-1.json"])
+        #
+        self.__server.state["download_delay"] = 0
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.05, pollMaxInterval=0.1, timeout=5)
+        self.assertTrue(cr.retrieveProxyReport("D_1", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(1)))
+        with open(self.__reportPath(1), "r") as ifh:
+            self.assertEqual(json.load(ifh)["dataset"], "D_1")
+        self.assertEqual(sorted(os.listdir(self.__workPath)), ["api.key", "report-1.json"])
+
+    def testLinkedReport(self):
+        """Test case -  a report resubmitted in one session does not change the report linked in another session"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.05, pollMaxInterval=0.1)
+        rs = ContentRequestReportStore(storePath=os.path.join(self.__workPath, "objects"))
+        dL = []
+        for ii in range(2):
+            self.assertTrue(cr.retrieveProxyReport("D_1", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(ii)))
+            dL.append(rs.add(self.__reportPath(ii)))
+        self.assertEqual(os.stat(self.__reportPath(0)).st_ino, os.stat(self.__reportPath(1)).st_ino)
+        # Resubmit in the first session  -  the remote now has other content
+        self.assertTrue(cr.retrieveProxyReport("D_2", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(0)))
+        with open(self.__reportPath(0), "r") as ifh:
+            self.assertEqual(json.load(ifh)["dataset"], "D_2")
+        with open(self.__reportPath(1), "r") as ifh:
+            self.assertEqual(json.load(ifh)["dataset"], "D_1")
+        self.assertEqual(getFileDigests(self.__reportPath(1))["md5"], dL[1]["md5"])
+        self.assertNotEqual(os.stat(self.__reportPath(0)).st_ino, dL[0]["inode"])
+
+    def testCancel(self):
+        """Test case -  outstanding requests may be cancelled"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.1, pollMaxInterval=0.2)
+
+        async def runAndCancel():
+            task = asyncio.ensure_future(cr.retrieveProxyReportAsync("D_9", self.__apiUrl, "report-entry-wwpdb-status", "json", self.__reportPath(1)))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            await task
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.assertRaises(asyncio.CancelledError, loop.run_until_complete, runAndCancel())
+        finally:
+            loop.close()
+        self.assertFalse(os.access(self.__reportPath(1), os.F_OK))
+
+
+class ContentRequestProxyClientPoolTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__keyPath = os.path.join(self.__workPath, "api.key")
+        with open(self.__keyPath, "w") as ofh:
+            ofh.write("SOMEKEY")
+        self.__server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteServiceHandler)
+        self.__server.state = {"lock": threading.Lock(), "count": 0, "polls": 0, "sessions": {}, "connections": set(), "tokens": set()}
+        self.__thread = threading.Thread(target=self.__server.serve_forever)
+        self.__thread.daemon = True
+        self.__thread.start()
+        self.__apiUrl = "http://127.0.0.1:%d" % self.__server.server_address[1]
+
+    def tearDown(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __retrieve(self, cr, dataSetIdList):
+        rL = [(dataSetId, self.__apiUrl, "report-entry-wwpdb-status", "json", os.path.join(self.__workPath, "report-%d.json" % ii)) for ii, dataSetId in enumerate(dataSetIdList)]
+        return cr.retrieveProxyReports(rL)
+
+    def testSessionReuse(self):
+        """Test case -  consecutive proxied datasets share one remote session and connection"""
+        pool = ContentRequestProxyClientPool(apiKeyPath=self.__keyPath)
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.05, pollMaxInterval=0.1, clientPool=pool)
+        for ii in range(5):
+            self.assertEqual(self.__retrieve(cr, ["D_%d" % ii]), [True])
+        state = self.__server.state
+        sD = cr.getClientStats()[self.__apiUrl]
+        logger.info("Client statistics %r", sD)
+        self.assertEqual(state["count"], 1)
+        self.assertEqual(len(state["connections"]), 1)
+        self.assertGreater(sD["requests"], 20)
+        self.assertEqual(sD["sessions_created"], 1)
+        self.assertEqual(sD["sessions_reused"], 4)
+        self.assertGreater(sD["rtt_mean"], 0.0)
+        self.assertGreaterEqual(sD["rtt_max"], sD["rtt_mean"])
+        #
+        # Concurrent requests use separate sessions which are then held for reuse
+        self.assertEqual(self.__retrieve(cr, ["D_1", "D_2", "D_3"]), [True] * 3)
+        self.assertEqual(state["count"], 3)
+        self.assertEqual(cr.getClientStats()[self.__apiUrl]["idle"], 3)
+
+    def testKeyReloadAndFailure(self):
+        """Test case -  a changed key file and failed requests start new sessions"""
+        pool = ContentRequestProxyClientPool(apiKeyPath=self.__keyPath)
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.05, pollMaxInterval=0.1, clientPool=pool)
+        self.assertEqual(self.__retrieve(cr, ["D_1"]), [True])
+        self.assertEqual(self.__retrieve(cr, ["D_FAIL"]), [False])
+        self.assertEqual(self.__retrieve(cr, ["D_1"]), [True])
+        self.assertEqual(self.__server.state["count"], 2)
+        #
+        with open(self.__keyPath, "w") as ofh:
+            ofh.write("NEWKEY-1")
+        self.assertEqual(pool.getApiKey(), "NEWKEY-1")
+        self.assertEqual(self.__retrieve(cr, ["D_1"]), [True])
+        self.assertEqual(self.__server.state["count"], 3)
+        self.assertEqual(self.__server.state["tokens"], set(["Bearer SOMEKEY", "Bearer NEWKEY-1"]))
+        self.assertEqual(cr.getClientStats()[self.__apiUrl]["sessions_expired"], 1)
+
+
+class ContentRequestBatchProxyTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        keyPath = os.path.join(self.__workPath, "api.key")
+        with open(keyPath, "w") as ofh:
+            ofh.write("SOMEKEY")
+        self.__serverD = {}
+        siteMap = {}
+        for siteId in ["PDBE", "PDBJ"]:
+            server = ThreadingHTTPServer(("127.0.0.1", 0), RemoteServiceHandler)
+            server.state = {"lock": threading.Lock(), "count": 0, "polls": 0, "sessions": {}, "connections": set(), "tokens": set()}
+            th = threading.Thread(target=server.serve_forever)
+            th.daemon = True
+            th.start()
+            self.__serverD[siteId] = server
+            siteMap[siteId] = "http://127.0.0.1:%d" % server.server_address[1]
+        self.__siteMap = siteMap
+        self.__configPatch = mock.patch.dict(configInfo, {"SITE_WS_CONTENT_WWPDB_KEY": keyPath, "PROJECT_CONTENTWS_SERVICE_DICTIONARY": siteMap})
+        self.__configPatch.start()
+        # Dataset locations  -  D_<n> completes in (n mod 10)/10 seconds on the stand-in service
+        self.__locationD = {"D_1": "WWPDB_DEPLOY", "D_2": "UNASSIGNED", "D_9": "PDBC", "D_FAIL": "PDBE"}
+        for ii in range(10, 16):
+            self.__locationD["D_%d" % ii] = "PDBE"
+        for ii in range(20, 26):
+            self.__locationD["D_%d" % ii] = "PDBJ"
+
+    def tearDown(self):
+        for server in self.__serverD.values():
+            server.shutdown()
+            server.server_close()
+        self.__configPatch.stop()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testBatch(self):
+        """Test case -  datasets are grouped by site and retrieved in parallel with progress"""
+        cr = ContentRequestProxyReportPdbx(pollInterval=0.1, pollMaxInterval=0.2)
+        bp = ContentRequestBatchProxy(siteLookup=self.__locationD.get, proxy=cr, maxPerSite=8)
+        localList, proxyD, unresolvedList = bp.groupBySite(sorted(self.__locationD.keys()))
+        self.assertEqual(localList, ["D_1", "D_2"])
+        self.assertEqual(unresolvedList, ["D_9"])
+        self.assertEqual(len(proxyD[self.__siteMap["PDBE"]]), 7)
+        self.assertEqual(len(proxyD[self.__siteMap["PDBJ"]]), 6)
+        #
+        contentType = "report-entry-wwpdb-status"
+        reportPathD = {}
+        for dL in proxyD.values():
+            for dataSetId in dL:
+                reportPathD[dataSetId] = os.path.join(self.__workPath, dataSetId + "_" + contentType + ".json")
+        progressPath = os.path.join(self.__workPath, "progress.json")
+        eventL = []
+        startTime = time.time()
+        rD = bp.retrieveReports(proxyD, contentType, "json", reportPathD, progressPath=progressPath, progressFunc=lambda d, s: eventL.append((d, s)))
+        elapsed = time.time() - startTime
+        logger.info("Thirteen remote reports on two sites retrieved in (%.2f seconds)", elapsed)
+        self.assertLess(elapsed, 2.0)
+        self.assertFalse(rD.pop("D_FAIL"))
+        self.assertEqual(len(rD), 12)
+        self.assertTrue(all(rD.values()))
+        with open(reportPathD["D_25"], "r") as ifh:
+            self.assertEqual(json.load(ifh)["dataset"], "D_25")
+        #
+        with open(progressPath, "r") as ifh:
+            progressD = json.load(ifh)
+        self.assertEqual(progressD, bp.getProgress())
+        self.assertEqual(progressD["D_FAIL"], "failed")
+        self.assertEqual(progressD["D_12"], "completed")
+        self.assertEqual([s for d, s in eventL if d == "D_12"], ["queued", "submitted", "completed"])
+
+
+def suiteBatchProxy():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestBatchProxyTests("testBatch"))
+    return suiteSelect
+
+
+def suiteClientPool():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestProxyClientPoolTests("testSessionReuse"))
+    suiteSelect.addTest(ContentRequestProxyClientPoolTests("testKeyReloadAndFailure"))
+    return suiteSelect
+
+
+def suiteProxyReport():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testRetrieve"))
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testConcurrentRequests"))
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testDeadline"))
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testLateDownload"))
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testLinkedReport"))
+    suiteSelect.addTest(ContentRequestProxyReportPdbxTests("testCancel"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteProxyReport()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
+    mySuite = suiteClientPool()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
+    mySuite = suiteBatchProxy()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -6,7 +6,12 @@
 # Version: 0.001
 #
 # Updates:
-#
+#   18-Oct-2026 ep  add streamed report tests with an SQLite stand-in database
+#   18-Oct-2026 ep  add concurrent category query benchmark
+#   18-Oct-2026 ep  add schema definition and SQL cache tests
+#   18-Oct-2026 ep  add compressed streamed report test
+#   18-Oct-2026 ep  compare streamed reports written with each JSON backend
+#   18-Oct-2026 ep  check that concurrent category queries leave the warning filters unchanged
 ##
 """
 Test cases for extracting content from rdbms database services and building
@@ -19,21 +24,31 @@ __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.01"
 
+import gzip
 import json
 import logging
 import os
+import shutil
+import sqlite3
+import tempfile
 import time
 import sys
+import tracemalloc
 import unittest
+import warnings
+from unittest.mock import patch
 
 if __package__ is None or __package__ == "":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
 else:
-    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
 
 from wwpdb.utils.config.ConfigInfo import getSiteId  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestDbPool import ContentRequestDbPool  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import getBackendNames  # noqa: E402
 from wwpdb.apps.content_ws_server.content.ContentRequestReportDb import ContentRequestReportDb  # noqa: E402
+from wwpdb.apps.content_ws_server.content_definitions.ContentDefintions import get_content_definition_file_path  # noqa: E402
 from wwpdb.utils.testing.Features import Features  # noqa: E402
 
 FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
@@ -91,6 +106,204 @@ class ContentRequestReportDbTests(unittest.TestCase):
         logger.info("Completed ad (%.2f seconds)\n" % endTime - startTime)
 
 
+class SqliteConnection(object):
+    """Connection holder for an SQLite stand-in with the da_internal database attached."""
+
+    def __init__(self, dbPath):
+        self._dbCon = sqlite3.connect(":memory:", check_same_thread=False)
+        self._dbCon.execute("ATTACH DATABASE ? AS da_internal", (dbPath,))
+
+    def getConnection(self):
+        return self._dbCon
+
+    def closeConnection(self):
+        self._dbCon.close()
+
+
+class ContentRequestReportDbStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.__verbose = False
+        self.__workPath = tempfile.mkdtemp()
+        self.__dbPath = os.path.join(self.__workPath, "da_internal.db")
+        self.__contentType = "report-summary-wwpdb-pdbx-contact-author"
+        self.__nRows = 20000
+        attrList = [
+            "Structure_ID",
+            "address_1",
+            "address_2",
+            "address_3",
+            "city",
+            "state_province",
+            "postal_code",
+            "email",
+            "name_first",
+            "name_last",
+            "country",
+            "phone",
+            "role",
+            "organization_type",
+            "identifier_ORCID",
+        ]
+        dbCon = sqlite3.connect(self.__dbPath)
+        dbCon.execute("CREATE TABLE pdbx_contact_author (%s)" % ",".join(attrList))
+        rowList = [["D_%010d" % ii] + ["%s value %d" % (a, ii) for a in attrList[1:]] for ii in range(self.__nRows)]
+        dbCon.executemany("INSERT INTO pdbx_contact_author VALUES (%s)" % ",".join(["?"] * len(attrList)), rowList)
+        dbCon.commit()
+        dbCon.close()
+        self.__pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", connectionFactory=lambda r: SqliteConnection(self.__dbPath))
+
+    def tearDown(self):
+        self.__pool.clear()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testStreamedReport(self):
+        """Test case -  streamed JSON report matches the serialized extracted content"""
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool)
+        rD = cr.extractContent(self.__contentType)
+        self.assertEqual(len(rD["pdbx_contact_author"]), self.__nRows)
+        reportPath = os.path.join(self.__workPath, self.__contentType + ".json")
+        with patch.dict(configInfo, {"SITE_WS_CONTENT_JSON_BACKEND": "json"}):
+            self.assertTrue(cr.writeContent(self.__contentType, reportPath, batchSize=500))
+        with open(reportPath, "r") as ifh:
+            self.assertEqual(ifh.read(), json.dumps(rD))
+        for backend in getBackendNames():
+            with patch.dict(configInfo, {"SITE_WS_CONTENT_JSON_BACKEND": backend}):
+                self.assertTrue(cr.writeContent(self.__contentType, reportPath, batchSize=500))
+            with open(reportPath, "r") as ifh:
+                self.assertEqual(json.load(ifh), rD)
+        #
+        reportPath = os.path.join(self.__workPath, self.__contentType + ".ndjson")
+        self.assertTrue(cr.writeContent(self.__contentType, reportPath, formatType="ndjson"))
+        with open(reportPath, "r") as ifh:
+            lineList = ifh.readlines()
+        self.assertEqual(len(lineList), self.__nRows)
+        self.assertEqual(json.loads(lineList[0]), {"category": "pdbx_contact_author", "row": rD["pdbx_contact_author"][0]})
+        #
+        reportPath = os.path.join(self.__workPath, self.__contentType + ".ndjson.gz")
+        self.assertTrue(cr.writeContent(self.__contentType, reportPath, formatType="ndjson.gz"))
+        with gzip.open(reportPath, "rt") as ifh:
+            self.assertEqual(ifh.readlines(), lineList)
+        # Connections were returned to the pool
+        self.assertEqual(self.__pool.getStats()["opened"], 1)
+
+    def testQueryCache(self):
+        """Test case -  repeated requests reuse schema definitions and SQL until definitions change"""
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool)
+        cr.extractContent(self.__contentType)
+        sD1 = cr.getCacheStats()
+        # A later request served by the same process
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool)
+        rD = cr.extractContent(self.__contentType)
+        self.assertEqual(len(rD["pdbx_contact_author"]), self.__nRows)
+        sD2 = cr.getCacheStats()
+        logger.info("Cache statistics %r", sD2)
+        self.assertEqual(sD2["sql_hits"], sD1["sql_hits"] + 1)
+        self.assertEqual(sD2["sql_misses"], sD1["sql_misses"])
+        self.assertEqual(sD2["schema_misses"], sD1["schema_misses"])
+        #
+        # Changed content definitions invalidate the generated SQL
+        with open(get_content_definition_file_path(), "r") as ifh:
+            contentDefD = json.load(ifh)
+        contentDefD[self.__contentType]["content"]["pdbx_contact_author"] = ["Structure_ID", "email"]
+        defPath = os.path.join(self.__workPath, "ws_content_type_definitions.json")
+        with open(defPath, "w") as ofh:
+            json.dump(contentDefD, ofh)
+        with patch("wwpdb.apps.content_ws_server.content.ContentRequestReportIo.get_content_definition_file_path", return_value=defPath):
+            cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool)
+            rD = cr.extractContent(self.__contentType)
+        self.assertEqual(rD["pdbx_contact_author"][0], {"Structure_ID": "D_0000000000", "email": "email value 0"})
+        sD3 = cr.getCacheStats()
+        self.assertEqual(sD3["sql_misses"], sD2["sql_misses"] + 1)
+        self.assertEqual(sD3["schema_misses"], sD2["schema_misses"])
+
+    def testStreamedReportMemory(self):
+        """Test case -  compare peak memory of the streamed and in-memory report"""
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool)
+        reportPath = os.path.join(self.__workPath, self.__contentType + ".json")
+        tracemalloc.start()
+        ss = json.dumps(cr.extractContent(self.__contentType))
+        with open(reportPath, "w") as ofh:
+            ofh.write(ss)
+        _, peakMemory = tracemalloc.get_traced_memory()
+        del ss
+        tracemalloc.stop()
+        #
+        tracemalloc.start()
+        self.assertTrue(cr.writeContent(self.__contentType, reportPath, batchSize=500))
+        _, peakStream = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        logger.info("Peak memory for %d rows in memory %.2f MB streamed %.2f MB", self.__nRows, peakMemory / 1.0e6, peakStream / 1.0e6)
+        self.assertLess(peakStream * 10, peakMemory)
+
+
+class SlowSqliteConnection(SqliteConnection):
+    """SQLite stand-in adding a fixed latency to each query."""
+
+    def __init__(self, dbPath, latency):
+        super(SlowSqliteConnection, self).__init__(dbPath)
+        self.__latency = latency
+
+    def getConnection(self):
+        return self
+
+    def cursor(self):
+        time.sleep(self.__latency)
+        return self._dbCon.cursor()
+
+
+class ContentRequestReportDbParallelTests(unittest.TestCase):
+    def setUp(self):
+        self.__verbose = False
+        self.__workPath = tempfile.mkdtemp()
+        self.__dbPath = os.path.join(self.__workPath, "da_internal.db")
+        self.__contentType = "report-summary-wwpdb-status"
+        self.__latency = 0.2
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=ContentRequestDbPool(siteId="WWPDB_DEPLOY"))
+        cDef = cr.getContentTypeDef(self.__contentType)
+        dbCon = sqlite3.connect(self.__dbPath)
+        for catName, attrList in cDef["content"].items():
+            dbCon.execute("CREATE TABLE %s (%s)" % (catName, ",".join(attrList)))
+            rowList = [["D_%010d" % ii] + ["%s %d" % (a, ii) for a in attrList[1:]] for ii in range(100)]
+            dbCon.executemany("INSERT INTO %s VALUES (%s)" % (catName, ",".join(["?"] * len(attrList))), rowList)
+        dbCon.commit()
+        dbCon.close()
+        self.__pool = ContentRequestDbPool(siteId="WWPDB_DEPLOY", connectionFactory=lambda r: SlowSqliteConnection(self.__dbPath, self.__latency))
+
+    def tearDown(self):
+        self.__pool.clear()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testParallelQueryBenchmark(self):
+        """Test case -  concurrent category queries with per-query latency"""
+        timeD = {}
+        resultD = {}
+        for nParallel in [1, 2, 4]:
+            cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool, maxParallel=nParallel)
+            startTime = time.time()
+            resultD[nParallel] = cr.extractContent(self.__contentType)
+            timeD[nParallel] = time.time() - startTime
+            logger.info("Queries with %d workers completed in (%.2f seconds)", nParallel, timeD[nParallel])
+        #
+        cDef = cr.getContentTypeDef(self.__contentType)
+        for nParallel in [2, 4]:
+            self.assertEqual(resultD[nParallel], resultD[1])
+            # Merged in definition order
+            self.assertEqual(list(resultD[nParallel].keys()), list(cDef["content"].keys()))
+        self.assertEqual([len(v) for v in resultD[4].values()], [100, 100, 100, 100])
+        self.assertGreaterEqual(timeD[1], 4 * self.__latency)
+        self.assertLess(timeD[4], 2 * self.__latency)
+        self.assertLessEqual(self.__pool.getOpenCount("DA_INTERNAL"), 4)
+
+    def testParallelWarningFilters(self):
+        """Test case -  concurrent category queries leave the process warning filters unchanged"""
+        filterList = list(warnings.filters)
+        cr = ContentRequestReportDb(siteId="WWPDB_DEPLOY", verbose=self.__verbose, dbPool=self.__pool, maxParallel=4)
+        for _ in range(5):
+            rD = cr.extractContent(self.__contentType)
+            self.assertEqual([len(v) for v in rD.values()], [100, 100, 100, 100])
+            self.assertEqual(warnings.filters, filterList)
+
+
 def suiteSummaryReport():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(ContentRequestReportDbTests("testContentTypeReader"))
@@ -98,6 +311,16 @@ def suiteSummaryReport():
     return suiteSelect
 
 
+def suiteStreamedReport():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestReportDbStreamTests("testStreamedReport"))
+    suiteSelect.addTest(ContentRequestReportDbStreamTests("testStreamedReportMemory"))
+    suiteSelect.addTest(ContentRequestReportDbStreamTests("testQueryCache"))
+    suiteSelect.addTest(ContentRequestReportDbParallelTests("testParallelQueryBenchmark"))
+    suiteSelect.addTest(ContentRequestReportDbParallelTests("testParallelWarningFilters"))
+    return suiteSelect
+
+
 if __name__ == "__main__":
     #
     mySuite = suiteSummaryReport()
@@ -6,7 +6,7 @@
 # Version: 0.001
 #
 # Updates:
-#
+#   18-Oct-2026 ep  add content definition hash test
 ##
 """
 Test cases for managing ws content type definitions.
@@ -20,6 +20,7 @@ __email__ = "jwest@rcsb.rutgers.edu"
 __license__ = "Creative Commons Attribution 3.0 Unported"
 __version__ = "V0.01"
 
+import hashlib
 import logging
 import sys
 import os
@@ -33,6 +34,7 @@ else:
     from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
 
 from wwpdb.apps.content_ws_server.content.ContentRequestReportIo import ContentRequestReportIo  # noqa: E402
+from wwpdb.apps.content_ws_server.content_definitions.ContentDefintions import get_content_definition_file_path  # noqa: E402
 
 FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
 logging.basicConfig(format=FORMAT)
@@ -391,11 +393,19 @@ class ContentRequestReportIoTests(unittest.TestCase):
         endTime = time.time()
         logger.info("Completed ad (%.2f seconds)", endTime - startTime)
 
+    def testContentDefinitionHash(self):
+        """Test case -  content definition hash identifies the definition file contents"""
+        with open(get_content_definition_file_path(), "rb") as ifh:
+            digest = hashlib.sha256(ifh.read()).hexdigest()
+        self.assertEqual(ContentRequestReportIo().getContentDefinitionHash(), digest)
+        self.assertEqual(ContentRequestReportIo().getContentDefinitionHash(), digest)
+
 
 def suiteWriteContentDef():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(ContentRequestReportIoTests("testWriteContentDef"))
     suiteSelect.addTest(ContentRequestReportIoTests("testReadContentDef"))
+    suiteSelect.addTest(ContentRequestReportIoTests("testContentDefinitionHash"))
     return suiteSelect
 
 
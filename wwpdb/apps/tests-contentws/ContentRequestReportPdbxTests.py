@@ -26,12 +26,15 @@ import time
 import sys
 import unittest
 
+from mmcif.api.DataCategory import DataCategory
+
 if __package__ is None or __package__ == "":
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
 else:
     from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
 
+from wwpdb.apps.content_ws_server.content.ContentRequestCondition import ContentRequestCondition  # noqa: E402
 from wwpdb.apps.content_ws_server.content.ContentRequestReportPdbx import ContentRequestReportPdbx  # noqa: E402
 
 FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
@@ -95,8 +98,14 @@ class ContentRequestReportPdbxTests(unittest.TestCase):
                     logger.info("Definition %r", ctype)
                     rD = cr.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
                     logger.info("File content %r", rD)
-                    # 1kip has three entity_poly
-                    self.assertEqual(len(rD["entity_poly"]), 3)
+                    if ctype == "report-entry-example-test":
+                        # Conditions select entity_poly 1 and the PDB database_2 row
+                        self.assertEqual(len(rD["entity_poly"]), 1)
+                        self.assertEqual(rD["entity_poly"][0]["entity_id"], "1")
+                        self.assertEqual(rD["database_2"], [{"database_code": "1KIP"}])
+                    else:
+                        # 1kip has three entity_poly
+                        self.assertEqual(len(rD["entity_poly"]), 3)
                     ss = json.dumps(rD)
                     logger.info("JSON serialized result %r", ss)
         except:  # noqa: E722 pylint: disable=bare-except
@@ -106,12 +115,53 @@ class ContentRequestReportPdbxTests(unittest.TestCase):
         endTime = time.time()
         logger.info("Completed ad (%.2f seconds)", endTime - startTime)
 
+    def testEntryReportMultiple(self):
+        """Test case -  several report types from a single read"""
+        startTime = time.time()
+        logger.info("Starting")
+
+        try:
+            cr = ContentRequestReportPdbx(self.__verbose)
+            ctypeL = [ctype for ctype in cr.getContentTypes() if ctype.startswith("report-entry-")]
+            rDD = cr.extractContents(self.__pdbxFilePath, self.__logFilePath, ctypeL)
+            self.assertEqual(sorted(rDD.keys()), sorted(ctypeL))
+            for ctype in ctypeL:
+                rD = cr.extractContent(self.__pdbxFilePath, self.__logFilePath, ctype)
+                self.assertEqual(rD, rDD[ctype])
+        except:  # noqa: E722 pylint: disable=bare-except
+            logger.exception("Failing test")
+            self.fail()
+
+        endTime = time.time()
+        logger.info("Completed ad (%.2f seconds)", endTime - startTime)
+
+    def testFilterCategoryBenchmark(self):
+        """Test case -  column and row oriented filtering on a synthetic 10^5 row category"""
+        nRows = 100000
+        attributeList = ["ordinal", "data_content_type", "major_revision", "minor_revision", "revision_date", "part_number", "type", "provider", "description"]
+        rowList = [[str(ii + 1), "Structure model", str(1 + ii % 7), str(ii % 3), "2017-02-14", "1", "Coordinate replacement", "repository", "x" * 20] for ii in range(nRows)]
+        cObj = DataCategory("pdbx_audit_revision_history", attributeList, rowList)
+        catSel = ["ordinal", "major_revision", "minor_revision", "revision_date"]
+        cr = ContentRequestReportPdbx(self.__verbose)
+        for cndD in [{}, {"major_revision": ContentRequestCondition("major_revision", "1", "int", "eq")}]:
+            startTime = time.time()
+            rL1 = cr.filterCategory(cObj, catSel, cndD, columnMode=False)
+            rowTime = time.time() - startTime
+            startTime = time.time()
+            rL2 = cr.filterCategory(cObj, catSel, cndD, columnMode=True)
+            colTime = time.time() - startTime
+            self.assertEqual(rL1, rL2)
+            self.assertEqual(len(rL2), nRows if not cndD else nRows // 7 + 1)
+            logger.info("Conditions %r row %.3f seconds column %.3f seconds (x%.1f)", cndD, rowTime, colTime, rowTime / max(colTime, 1.0e-6))
+
 
 def suiteEntryReport():
     suiteSelect = unittest.TestSuite()
     suiteSelect.addTest(ContentRequestReportPdbxTests("testEntryReader"))
     suiteSelect.addTest(ContentRequestReportPdbxTests("testContentTypeReader"))
     suiteSelect.addTest(ContentRequestReportPdbxTests("testEntryReport"))
+    suiteSelect.addTest(ContentRequestReportPdbxTests("testEntryReportMultiple"))
+    suiteSelect.addTest(ContentRequestReportPdbxTests("testFilterCategoryBenchmark"))
     return suiteSelect
 
 
@@ -0,0 +1,162 @@
+##
+#
+# File:    ContentRequestReportStoreTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  resubmitted reports do not change the reports of other sessions
+#
+##
+"""
+Test cases for the content-addressed report store -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import hashlib
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.utils.ws_utils.ServiceUtilsMisc import getMD5  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content.ContentRequestReportStore import ContentRequestReportStore, getFileDigests, releaseReport  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import ContentRequestReportWriter  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestReportStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__storePath = os.path.join(self.__workPath, "objects")
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __writeReport(self, sessionId, content):
+        sessionPath = os.path.join(self.__workPath, sessionId)
+        if not os.path.isdir(sessionPath):
+            os.makedirs(sessionPath)
+        reportPath = os.path.join(sessionPath, "report-summary-wwpdb-status.json")
+        with open(reportPath, "w") as ofh:
+            ofh.write(content)
+        return reportPath
+
+    def __digests(self, dD):
+        return {k: dD[k] for k in ["sha256", "md5", "size"]}
+
+    def testDeduplicate(self):
+        """Test case -  identical reports in different sessions share one stored object"""
+        rs = ContentRequestReportStore(storePath=self.__storePath)
+        self.assertTrue(rs.isEnabled())
+        content = '{"pdbx_database_status": [{"status_code": "REL"}]}' * 1000
+        fp1 = self.__writeReport("session-1", content)
+        fp2 = self.__writeReport("session-2", content)
+        fp3 = self.__writeReport("session-3", content + " ")
+        dD1 = rs.add(fp1)
+        dD2 = rs.add(fp2)
+        dD3 = rs.add(fp3)
+        self.assertEqual(dD1, dD2)
+        self.assertEqual(dD1["sha256"], hashlib.sha256(content.encode("utf-8")).hexdigest())
+        self.assertEqual(dD1["md5"], getMD5(fp1))
+        self.assertEqual(dD1["size"], os.path.getsize(fp1))
+        self.assertNotEqual(dD1["sha256"], dD3["sha256"])
+        self.assertEqual(rs.getDigests(dD1["sha256"]), self.__digests(dD1))
+        # Session reports are links to the stored object
+        self.assertEqual(os.stat(fp1).st_ino, os.stat(fp2).st_ino)
+        self.assertEqual(os.stat(fp1).st_nlink, 3)
+        self.assertNotEqual(os.stat(fp1).st_ino, os.stat(fp3).st_ino)
+        with open(fp2, "r") as ifh:
+            self.assertEqual(ifh.read(), content)
+        # Adding the same report again is harmless
+        self.assertEqual(rs.add(fp1), dD1)
+        self.assertEqual(os.stat(fp1).st_nlink, 3)
+
+    def testResubmitLinked(self):
+        """Test case -  a report resubmitted in one session leaves the linked reports of other sessions unchanged"""
+        rs = ContentRequestReportStore(storePath=self.__storePath)
+        fp1 = self.__writeReport("session-1", '{"status": "REL"}')
+        fp2 = self.__writeReport("session-2", '{"status": "REL"}')
+        dD1 = rs.add(fp1)
+        dD2 = rs.add(fp2)
+        self.assertEqual(os.stat(fp1).st_ino, os.stat(fp2).st_ino)
+        self.assertEqual(dD1["inode"], os.stat(fp1).st_ino)
+        # Reports are replaced by the report writer and rewritten in place only once released
+        with ContentRequestReportWriter(fp1) as wr:
+            wr.writeContent({"status": "HPUB"})
+        self.assertNotEqual(os.stat(fp1).st_ino, dD1["inode"])
+        self.__checkUnchanged(fp2, dD2)
+        releaseReport(fp1)
+        with open(fp1, "w") as ofh:
+            ofh.write("DUMMY")
+        self.__checkUnchanged(fp2, dD2)
+        # The resubmitted report is stored again
+        dD1 = rs.add(fp1)
+        self.assertNotEqual(dD1["sha256"], dD2["sha256"])
+        self.assertEqual(dD1["md5"], getMD5(fp1))
+
+    def __checkUnchanged(self, reportPath, dD):
+        """The report, its recorded digests and the stored object are unchanged."""
+        with open(reportPath, "r") as ifh:
+            self.assertEqual(ifh.read(), '{"status": "REL"}')
+        self.assertEqual(os.stat(reportPath).st_ino, dD["inode"])
+        self.assertEqual(self.__digests(getFileDigests(reportPath)), self.__digests(dD))
+        self.assertEqual(self.__digests(getFileDigests(os.path.join(self.__storePath, dD["sha256"][:2], dD["sha256"]))), self.__digests(dD))
+
+    def testPurge(self):
+        """Test case -  only objects no longer linked from a session are removed"""
+        rs = ContentRequestReportStore(storePath=self.__storePath, retainSeconds=0)
+        dD1 = rs.add(self.__writeReport("session-1", "report one"))
+        dD2 = rs.add(self.__writeReport("session-2", "report two"))
+        self.assertEqual(rs.purge(), 0)
+        shutil.rmtree(os.path.join(self.__workPath, "session-1"))
+        self.assertEqual(rs.purge(), 1)
+        self.assertEqual(rs.getDigests(dD1["sha256"]), {})
+        self.assertEqual(rs.getDigests(dD2["sha256"]), self.__digests(dD2))
+        # A report of purged content is stored again
+        fp = self.__writeReport("session-3", "report one")
+        self.assertEqual(self.__digests(rs.add(fp)), self.__digests(dD1))
+        self.assertEqual(os.stat(fp).st_nlink, 2)
+
+    def testDisabled(self):
+        """Test case -  digests are returned without a store"""
+        rs = ContentRequestReportStore(storePath=None)
+        self.assertFalse(rs.isEnabled())
+        fp = self.__writeReport("session-1", "report")
+        self.assertEqual(rs.add(fp)["md5"], getMD5(fp))
+        self.assertEqual(os.stat(fp).st_nlink, 1)
+        self.assertEqual(rs.add(os.path.join(self.__workPath, "missing.json")), {})
+
+
+def suiteReportStore():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestReportStoreTests("testDeduplicate"))
+    suiteSelect.addTest(ContentRequestReportStoreTests("testResubmitLinked"))
+    suiteSelect.addTest(ContentRequestReportStoreTests("testPurge"))
+    suiteSelect.addTest(ContentRequestReportStoreTests("testDisabled"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteReportStore()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
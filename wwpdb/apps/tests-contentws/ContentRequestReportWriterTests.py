@@ -0,0 +1,185 @@
+##
+#
+# File:    ContentRequestReportWriterTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  compare the reports written with each JSON backend
+#   18-Oct-2026 ep  add unsupported format type and concurrent writer tests
+#
+##
+"""
+Test cases for writing content reports in the requested output formats -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import gzip
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content import ContentRequestReportWriter as writerModule  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestJsonSerializer import ContentRequestJsonSerializer, getBackendNames  # noqa: E402
+from wwpdb.apps.content_ws_server.content.ContentRequestReportWriter import (  # noqa: E402
+    ContentRequestReportWriter,
+    getFormatType,
+    isFormatSupported,
+    parseFormatType,
+)
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestReportWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__nRows = 5000
+        self.__rD = {
+            "pdbx_database_status": [{"structure_id": "D_%010d" % ii, "status_code": "REL", "title": "Entry å %d" % ii} for ii in range(self.__nRows)],
+            "entity_poly": [],
+            "pdbx_depui_entry_details": {"structure_id": "D_0000000000"},
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __write(self, formatType, backend=None):
+        reportPath = os.path.join(self.__workPath, "report." + formatType)
+        with ContentRequestReportWriter(reportPath, formatType=formatType, serializer=ContentRequestJsonSerializer(backend)) as wr:
+            wr.writeContent(self.__rD)
+        self.assertFalse(os.access(reportPath + ".tmp", os.R_OK))
+        logger.info("Format %r report size %d", formatType, os.path.getsize(reportPath))
+        return reportPath
+
+    def __readNdJson(self, ifh):
+        rD = {}
+        for line in ifh:
+            d = json.loads(line)
+            if isinstance(d["row"], dict) and d["category"] in self.__rD and isinstance(self.__rD[d["category"]], list):
+                rD.setdefault(d["category"], []).append(d["row"])
+            else:
+                rD[d["category"]] = d["row"]
+        return rD
+
+    def testFormatTypes(self):
+        """Test case -  format type parsing"""
+        self.assertEqual(parseFormatType("json"), ("json", None))
+        self.assertEqual(parseFormatType("NDJSON.gz"), ("ndjson", "gz"))
+        self.assertEqual(parseFormatType("json.zst"), ("json", "zst"))
+        self.assertEqual(getFormatType("unassigned"), "json")
+        self.assertEqual(getFormatType(None), "json")
+        self.assertIsNone(getFormatType("ndjson.bz2"))
+        self.assertIsNone(getFormatType("xml"))
+        self.assertTrue(isFormatSupported("ndjson.gz"))
+        self.assertFalse(isFormatSupported("json.gz.gz"))
+
+    def testJson(self):
+        """Test case -  JSON report is identical to the serialized report dictionary"""
+        with open(self.__write("json", backend="json"), "r", encoding="utf-8") as ifh:
+            self.assertEqual(ifh.read(), json.dumps(self.__rD))
+        with open(self.__write("ndjson", backend="json"), "r", encoding="utf-8") as ifh:
+            lineList = [json.loads(line) for line in ifh]
+        for backend in getBackendNames():
+            with open(self.__write("json", backend=backend), "r", encoding="utf-8") as ifh:
+                self.assertEqual(json.load(ifh), self.__rD)
+            with open(self.__write("ndjson", backend=backend), "r", encoding="utf-8") as ifh:
+                self.assertEqual([json.loads(line) for line in ifh], lineList)
+
+    def testNdJson(self):
+        """Test case -  one line for each row"""
+        with open(self.__write("ndjson"), "r", encoding="utf-8") as ifh:
+            lineList = ifh.readlines()
+        self.assertEqual(len(lineList), self.__nRows + 1)
+        self.assertEqual(json.loads(lineList[0]), {"category": "pdbx_database_status", "row": self.__rD["pdbx_database_status"][0]})
+        self.assertEqual(self.__readNdJson(lineList)["pdbx_depui_entry_details"], self.__rD["pdbx_depui_entry_details"])
+
+    def testGzip(self):
+        """Test case -  gzip compressed reports"""
+        jsonSize = os.path.getsize(self.__write("json"))
+        reportPath = self.__write("json.gz")
+        self.assertLess(os.path.getsize(reportPath), jsonSize / 4)
+        with gzip.open(reportPath, "rt", encoding="utf-8") as ifh:
+            self.assertEqual(json.load(ifh), self.__rD)
+        with gzip.open(self.__write("ndjson.gz"), "rt", encoding="utf-8") as ifh:
+            rD = self.__readNdJson(ifh)
+        self.assertEqual(rD["pdbx_database_status"], self.__rD["pdbx_database_status"])
+        # Identical content gives an identical compressed report
+        with open(reportPath, "rb") as ifh:
+            bS = ifh.read()
+        with open(self.__write("json.gz"), "rb") as ifh:
+            self.assertEqual(ifh.read(), bS)
+
+    @unittest.skipIf(writerModule.zstandard is None, "Requires the zstandard package")
+    def testZstd(self):
+        """Test case -  zstandard compressed reports"""
+        with open(self.__write("json.zst"), "rb") as ifh:
+            bS = writerModule.zstandard.ZstdDecompressor().stream_reader(ifh).read()
+        self.assertEqual(json.loads(bS.decode("utf-8")), self.__rD)
+
+    def testFailure(self):
+        """Test case -  a failed report leaves no report file"""
+        reportPath = os.path.join(self.__workPath, "report.json")
+        with self.assertRaises(TypeError):
+            with ContentRequestReportWriter(reportPath) as wr:
+                wr.writeCategory("bad", [{"value": object()}])
+        self.assertEqual(os.listdir(self.__workPath), [])
+        with self.assertRaises(ValueError):
+            with ContentRequestReportWriter(reportPath, formatType="xml") as wr:
+                pass
+        self.assertEqual(os.listdir(self.__workPath), [])
+        if writerModule.zstandard is None:
+            self.assertFalse(isFormatSupported("ndjson.zst"))
+            with self.assertRaises(ValueError):
+                with ContentRequestReportWriter(reportPath, formatType="ndjson.zst") as wr:
+                    pass
+
+    def testConcurrentWriters(self):
+        """Test case -  writers of the same report do not share a temporary file"""
+        reportPath = os.path.join(self.__workPath, "report.json")
+        with ContentRequestReportWriter(reportPath) as wr1:
+            wr1.writeCategory("first", [{"value": 1}])
+            with ContentRequestReportWriter(reportPath) as wr2:
+                wr2.writeCategory("second", [{"value": 2}])
+            with open(reportPath, "r") as ifh:
+                self.assertEqual(json.load(ifh), {"second": [{"value": 2}]})
+        with open(reportPath, "r") as ifh:
+            self.assertEqual(json.load(ifh), {"first": [{"value": 1}]})
+        self.assertEqual(os.listdir(self.__workPath), ["report.json"])
+
+
+def suiteReportWriter():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestReportWriterTests("testFormatTypes"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testJson"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testNdJson"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testGzip"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testZstd"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testFailure"))
+    suiteSelect.addTest(ContentRequestReportWriterTests("testConcurrentWriters"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteReportWriter()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
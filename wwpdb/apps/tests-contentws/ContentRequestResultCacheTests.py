@@ -0,0 +1,159 @@
+##
+#
+# File:    ContentRequestResultCacheTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  add time-to-live configuration and lock file purge tests
+#
+##
+"""
+Test cases for the shared cache of summary content report files -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestResultCache import ContentRequestResultCache  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class ContentRequestResultCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__cachePath = os.path.join(self.__workPath, "cache")
+        self.__contentType = "report-summary-wwpdb-status"
+        self.__reportPath = os.path.join(self.__workPath, "session-1", self.__contentType + ".json")
+        os.makedirs(os.path.dirname(self.__reportPath))
+        with open(self.__reportPath, "w") as ofh:
+            ofh.write('{"rcsb_status": []}')
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testStoreAndFetch(self):
+        """Test case -  cached reports are linked into new sessions"""
+        rc = ContentRequestResultCache(cachePath=self.__cachePath, defaultTtl=300)
+        self.assertTrue(rc.isEnabled())
+        key = rc.getKey(self.__contentType, "WWPDB_DEPLOY", "abc123")
+        self.assertNotEqual(key, rc.getKey(self.__contentType, "PDBE", "abc123"))
+        self.assertNotEqual(key, rc.getKey(self.__contentType, "WWPDB_DEPLOY", "def456"))
+        self.assertNotEqual(key, rc.getKey(self.__contentType, "WWPDB_DEPLOY", "abc123", "ndjson"))
+        #
+        sD0 = rc.getStats()
+        dstPath = os.path.join(self.__workPath, "session-2", self.__contentType + ".json")
+        os.makedirs(os.path.dirname(dstPath))
+        self.assertFalse(rc.fetch(self.__contentType, key, dstPath))
+        self.assertTrue(rc.store(self.__contentType, key, self.__reportPath))
+        with rc.lock(key):
+            self.assertTrue(rc.fetch(self.__contentType, key, dstPath))
+        self.assertEqual(os.stat(dstPath).st_ino, os.stat(self.__reportPath).st_ino)
+        with open(dstPath, "r") as ifh:
+            self.assertEqual(ifh.read(), '{"rcsb_status": []}')
+        sD1 = rc.getStats()
+        logger.info("Cache statistics %r", sD1)
+        self.assertEqual(sD1["hits"], sD0["hits"] + 1)
+        self.assertEqual(sD1["misses"], sD0["misses"] + 1)
+        self.assertEqual(sD1["stores"], sD0["stores"] + 1)
+
+    def testTtlAndPurge(self):
+        """Test case -  expired entries are not served and entries can be purged"""
+        rc = ContentRequestResultCache(cachePath=self.__cachePath, defaultTtl=300, ttlD={"report-summary-emdb-status": 0, "report-summary-wwpdb-status": 60})
+        self.assertEqual(rc.getTtl("report-summary-wwpdb-status"), 60)
+        self.assertEqual(rc.getTtl("report-summary-wwpdb-audit-revision"), 300)
+        dstPath = os.path.join(self.__workPath, "out.json")
+        # Caching disabled for this content type
+        self.assertFalse(rc.store("report-summary-emdb-status", "k0", self.__reportPath))
+        #
+        self.assertTrue(rc.store(self.__contentType, "k1", self.__reportPath))
+        self.assertTrue(rc.store("report-summary-wwpdb-audit-revision", "k2", self.__reportPath))
+        entryPath = os.path.join(self.__cachePath, self.__contentType + ".k1")
+        oldTime = time.time() - 120
+        os.utime(entryPath, (oldTime, oldTime))
+        self.assertFalse(rc.fetch(self.__contentType, "k1", dstPath))
+        self.assertTrue(rc.fetch("report-summary-wwpdb-audit-revision", "k2", dstPath))
+        #
+        self.assertEqual(rc.purge(expiredOnly=True), 1)
+        self.assertFalse(os.access(entryPath, os.F_OK))
+        self.assertTrue(rc.store(self.__contentType, "k1", self.__reportPath))
+        self.assertEqual(rc.purge(self.__contentType), 1)
+        self.assertTrue(rc.fetch("report-summary-wwpdb-audit-revision", "k2", dstPath))
+        self.assertEqual(rc.purge(), 1)
+        self.assertFalse(rc.fetch("report-summary-wwpdb-audit-revision", "k2", dstPath))
+        # The session copy is not affected by the purge
+        self.assertTrue(os.access(dstPath, os.R_OK))
+
+    def testTtlConfig(self):
+        """Test case -  per content type time-to-live from the site configuration"""
+        with patch.dict(configInfo, {"SITE_WS_CONTENT_RESULT_CACHE_TTL_DICT": '{"report-summary-wwpdb-status": 60}'}):
+            rc = ContentRequestResultCache(cachePath=self.__cachePath, defaultTtl=300)
+        self.assertEqual(rc.getTtl("report-summary-wwpdb-status"), 60)
+        self.assertEqual(rc.getTtl("report-summary-emdb-status"), 300)
+        with patch.dict(configInfo, {"SITE_WS_CONTENT_RESULT_CACHE_TTL_DICT": '{"report-summary-wwpdb-status": '}):
+            with self.assertLogs(logger, level="WARNING"):
+                rc = ContentRequestResultCache(cachePath=self.__cachePath, defaultTtl=300)
+        self.assertEqual(rc.getTtl("report-summary-wwpdb-status"), 300)
+
+    def testPurgeLocks(self):
+        """Test case -  purged entries and unused locks leave no lock files"""
+        rc = ContentRequestResultCache(cachePath=self.__cachePath, defaultTtl=300)
+        for key in ["k1", "k2", "k3"]:
+            # Entries are links to the stored report file
+            reportPath = self.__reportPath + "." + key
+            shutil.copyfile(self.__reportPath, reportPath)
+            with rc.lock(key):
+                self.assertTrue(rc.store(self.__contentType, key, reportPath))
+        # A lock without a cache entry
+        with rc.lock("k4"):
+            pass
+        self.assertEqual(len(os.listdir(self.__cachePath)), 7)
+        oldTime = time.time() - 600
+        for fn in [self.__contentType + ".k1", "wsreportcache.k4"]:
+            os.utime(os.path.join(self.__cachePath, fn), (oldTime, oldTime))
+        self.assertEqual(rc.purge(expiredOnly=True), 1)
+        self.assertEqual(sorted(os.listdir(self.__cachePath)), sorted([self.__contentType + ".k2", self.__contentType + ".k3", "wsreportcache.k2", "wsreportcache.k3"]))
+        # A held lock is not removed
+        with rc.lock("k2"):
+            self.assertEqual(rc.purge(self.__contentType), 2)
+        self.assertEqual(os.listdir(self.__cachePath), ["wsreportcache.k2"])
+        self.assertEqual(rc.purge(), 0)
+        self.assertEqual(os.listdir(self.__cachePath), [])
+
+
+def suiteResultCache():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestResultCacheTests("testStoreAndFetch"))
+    suiteSelect.addTest(ContentRequestResultCacheTests("testTtlAndPurge"))
+    suiteSelect.addTest(ContentRequestResultCacheTests("testTtlConfig"))
+    suiteSelect.addTest(ContentRequestResultCacheTests("testPurgeLocks"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteResultCache()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,199 @@
+##
+#
+# File:    ContentRequestServiceHandlerTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#   18-Oct-2026 ep  run the process pool test with workers started from the fork server
+#
+##
+"""
+Test cases for concurrent message processing in the content request consumer -
+
+The message broker connection and the content request are replaced by local stand-ins.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.service import ContentRequestServiceHandler  # noqa: E402
+from wwpdb.apps.content_ws_server.service.ContentRequestServiceHandler import MessageConsumer  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+_activeLock = threading.Lock()
+_activeD = {"active": 0, "max": 0}
+
+
+class FakeContentRequest(object):
+    """Content request stand-in that sleeps and records the worker pid in the report path."""
+
+    def setup(self, pD):
+        self.__pD = pD
+        return True
+
+    def run(self):
+        with _activeLock:
+            _activeD["active"] += 1
+            _activeD["max"] = max(_activeD["max"], _activeD["active"])
+        time.sleep(self.__pD.get("worker_test_duration", 0))
+        with open(self.__pD["report_path"], "w") as ofh:
+            ofh.write("%d %d" % (os.getpid(), os.getppid()))
+        with _activeLock:
+            _activeD["active"] -= 1
+        return True
+
+
+def runFakeContentRequest(msgBody):
+    """Worker process stand-in for runContentRequest() -  worker processes do not inherit patches."""
+    v = FakeContentRequest()
+    v.setup(json.loads(msgBody))
+    return v.run()
+
+
+class FakeConnection(object):
+    """Queues thread-safe callbacks to be run from the connection thread."""
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__callbackList = []
+
+    def add_callback_threadsafe(self, callback):
+        with self.__lock:
+            self.__callbackList.append(callback)
+
+    def processCallbacks(self):
+        with self.__lock:
+            cbL, self.__callbackList = self.__callbackList, []
+        for cb in cbL:
+            cb()
+
+
+class FakeChannel(object):
+    def __init__(self):
+        self.ackList = []
+
+    def basic_ack(self, deliveryTag):
+        self.ackList.append(deliveryTag)
+
+
+class ContentRequestServiceHandlerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        _activeD.update({"active": 0, "max": 0})
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __getConsumer(self, numThreads, numProcesses=0):
+        mc = MessageConsumer(amqpUrl="amqp://localhost", numThreads=numThreads, numProcesses=numProcesses)
+        mc._connection = FakeConnection()  # pylint: disable=protected-access
+        mc._channel = FakeChannel()  # pylint: disable=protected-access
+        return mc
+
+    def __getMessage(self, ii, contentType="report-summary-wwpdb-status", duration=0.3, proxyUrl=None):
+        pD = {
+            "request_content_type": contentType,
+            "report_path": os.path.join(self.__workPath, "report-%d.json" % ii),
+            "worker_test_duration": duration,
+            "session_proxy_url": proxyUrl,
+        }
+        return json.dumps(pD).encode("utf-8")
+
+    def __deliver(self, mc, msgList):
+        for ii, msg in enumerate(msgList, start=1):
+            mc.onMessage(None, SimpleNamespace(delivery_tag=ii), SimpleNamespace(app_id="test"), msg)
+
+    def testConcurrentThreads(self):
+        """Test case -  messages run concurrently and are acknowledged after completion"""
+        mc = self.__getConsumer(numThreads=4)
+        self.assertTrue(mc.isConcurrent())
+        mc.startPools()
+        startTime = time.time()
+        with mock.patch.object(ContentRequestServiceHandler, "ContentRequest", FakeContentRequest):
+            self.__deliver(mc, [self.__getMessage(ii) for ii in range(1, 5)])
+            mc._connection.processCallbacks()  # pylint: disable=protected-access
+            self.assertEqual(mc._channel.ackList, [])  # pylint: disable=protected-access
+            mc.stopPools()
+        elapsed = time.time() - startTime
+        mc._connection.processCallbacks()  # pylint: disable=protected-access
+        logger.info("Four messages completed in (%.2f seconds) max concurrency %d", elapsed, _activeD["max"])
+        self.assertEqual(sorted(mc._channel.ackList), [1, 2, 3, 4])  # pylint: disable=protected-access
+        self.assertEqual(_activeD["max"], 4)
+        self.assertLess(elapsed, 1.0)
+
+    def testSelectPool(self):
+        """Test case -  PDBx parsing is routed to the process pool"""
+        mc = self.__getConsumer(numThreads=2, numProcesses=1)
+        mc.startPools()
+        try:
+            self.assertIsInstance(mc.selectPool(self.__getMessage(1, "report-entry-wwpdb-status")), ProcessPoolExecutor)
+            self.assertIsInstance(mc.selectPool(self.__getMessage(2, "report-entry-wwpdb-status", proxyUrl="https://remote")), ThreadPoolExecutor)
+            self.assertIsInstance(mc.selectPool(self.__getMessage(3)), ThreadPoolExecutor)
+            self.assertIsInstance(mc.selectPool(b"not json"), ThreadPoolExecutor)
+        finally:
+            mc.stopPools()
+        # A single thread and no processes keeps the serial consumer
+        self.assertFalse(self.__getConsumer(numThreads=1).isConcurrent())
+
+    def testProcessPool(self):
+        """Test case -  entry reports run in worker processes not forked from the consumer"""
+        mc = self.__getConsumer(numThreads=1, numProcesses=2)
+        with mock.patch.object(ContentRequestServiceHandler, "runContentRequest", runFakeContentRequest):
+            mc.startPools()
+            self.__deliver(mc, [self.__getMessage(ii, "report-entry-wwpdb-status", duration=0.1) for ii in range(1, 3)])
+            mc.stopPools()
+        mc._connection.processCallbacks()  # pylint: disable=protected-access
+        self.assertEqual(sorted(mc._channel.ackList), [1, 2])  # pylint: disable=protected-access
+        for ii in range(1, 3):
+            with open(os.path.join(self.__workPath, "report-%d.json" % ii), "r") as ifh:
+                pid, ppid = [int(v) for v in ifh.read().split()]
+            self.assertNotEqual(pid, os.getpid())
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                self.assertNotEqual(ppid, os.getpid())
+
+
+def suiteConsumer():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestServiceHandlerTests("testConcurrentThreads"))
+    suiteSelect.addTest(ContentRequestServiceHandlerTests("testSelectPool"))
+    suiteSelect.addTest(ContentRequestServiceHandlerTests("testProcessPool"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteConsumer()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,125 @@
+##
+#
+# File:    ContentRequestSessionStoreTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for session store updates from concurrent consumers -
+
+Two consumer processes, each having served a request for a different earlier session, run
+requests for the same two sessions on threads.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.content.ContentRequestSessionStore import ContentRequestSessionStore  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def runConsumer(sessionPathList, otherPath, nUpdates, nThreads):
+    """Consumer process  -  threads append to the store of each session after an earlier request for another session."""
+    # The process default lock path is fixed by the first store used in the process
+    ContentRequestSessionStore(sessionPath=otherPath, prefix="test").set("status", "completed")
+
+    def update(sessionPath, tag):
+        sds = ContentRequestSessionStore(sessionPath=sessionPath, prefix="test")
+        for ii in range(nUpdates):
+            sds.append("updates", "%s-%d-%s" % (tag, ii, "x" * 100))
+
+    tL = []
+    for sessionPath in sessionPathList:
+        for jj in range(nThreads):
+            tL.append(threading.Thread(target=update, args=(sessionPath, "%d-%d" % (os.getpid(), jj))))
+    for t in tL:
+        t.start()
+    for t in tL:
+        t.join()
+
+
+class ContentRequestSessionStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__sessionPathList = [os.path.join(self.__workPath, "session_%d" % ii) for ii in range(2)]
+        for sessionPath in self.__sessionPathList:
+            os.makedirs(sessionPath)
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testConcurrentSessions(self):
+        """Test case -  no session store updates are lost with two consumers running two sessions"""
+        nUpdates = 100
+        nThreads = 2
+        # New processes  -  the default lock path of this process may already be fixed
+        ctx = multiprocessing.get_context("spawn")
+        pL = []
+        for ii in range(2):
+            otherPath = os.path.join(self.__workPath, "other_%d" % ii)
+            os.makedirs(otherPath)
+            pL.append(ctx.Process(target=runConsumer, args=(self.__sessionPathList, otherPath, nUpdates, nThreads)))
+        startTime = time.time()
+        for p in pL:
+            p.start()
+        for p in pL:
+            p.join(120)
+            self.assertEqual(p.exitcode, 0)
+        logger.info("%d session store updates in (%.2f seconds)", 2 * len(pL) * nThreads * nUpdates, time.time() - startTime)
+        for sessionPath in self.__sessionPathList:
+            uL = ContentRequestSessionStore(sessionPath=sessionPath, prefix="test").get("updates")
+            self.assertEqual(len(uL), len(pL) * nThreads * nUpdates)
+            self.assertEqual(len(set(uL)), len(uL))
+            self.assertTrue(os.access(os.path.join(sessionPath, "sessiondatastore.lock"), os.F_OK))
+
+    def testStore(self):
+        """Test case -  store methods"""
+        sds = ContentRequestSessionStore(sessionPath=self.__sessionPathList[0], prefix="test")
+        self.assertTrue(sds.set("status", "running"))
+        self.assertFalse(sds.set("status", "failed", overWrite=False))
+        self.assertTrue(sds.updateAll({"status": "completed", "report": ("report.json", "data")}))
+        self.assertTrue(sds.update({"status": "failed", "other": 1}))
+        self.assertTrue(sds.extend("list", [1, 2]))
+        self.assertTrue(sds.append("list", 3))
+        self.assertEqual(sds.getDictionary(), {"status": "completed", "report": ("report.json", "data"), "other": 1, "list": [1, 2, 3]})
+        self.assertEqual(sds.get("missing"), "")
+
+
+def suiteSessionStore():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentRequestSessionStoreTests("testStore"))
+    suiteSelect.addTest(ContentRequestSessionStoreTests("testConcurrentSessions"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSessionStore()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,148 @@
+##
+#
+# File:    ContentServiceAppWorkerTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for content request submission in the web service worker -
+
+The message publisher and the dataset site lookup are replaced by local stand-ins.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.utils.ws_utils.ServiceRequest import ServiceRequest  # noqa: E402
+
+from wwpdb.apps.content_ws_server.content import ContentRequestModelLocator  # noqa: E402
+from wwpdb.apps.content_ws_server.webapp import ContentServiceAppWorker  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+def slowModelFilePath(self, dataSetId, generateModel=True):  # pylint: disable=unused-argument
+    """Stand-in for an archive listing followed by DepUI model generation."""
+    time.sleep(0.25)
+    return None
+
+
+class ContentServiceAppWorkerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__patchList = [
+            mock.patch.dict(configInfo, {"SITE_WEB_APPS_TOP_SESSIONS_PATH": self.__workPath}),
+            mock.patch.object(ContentServiceAppWorker, "MessagePublisher"),
+            mock.patch.object(ContentServiceAppWorker, "ConfigInfoDataSet"),
+            mock.patch.object(ContentRequestModelLocator.ContentRequestModelLocator, "getModelFilePath", slowModelFilePath),
+        ]
+        _, mp, cids, _ = [p.start() for p in self.__patchList]
+        self.__publish = mp.return_value.publish
+        self.__publish.return_value = True
+        cids.return_value.getSiteId.return_value = "WWPDB_DEPLOY"
+        self.__sessionId = self.__run("/contentws/session").getAppDataDict()["session_id"]
+
+    def tearDown(self):
+        for p in reversed(self.__patchList):
+            p.stop()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __run(self, requestPath, paramD=None):
+        pD = {"request_path": [requestPath], "wwpdb_site_id": ["WWPDB_DEPLOY"], "service_user_id": ["user"]}
+        for k, v in (paramD or {}).items():
+            pD[k] = [v]
+        reqObj = ServiceRequest(pD)
+        reqObj.setTopSessionPath(self.__workPath)
+        reqObj.setDefaultReturnFormat(return_format="json")
+        return ContentServiceAppWorker.ContentServiceAppWorker(reqObj=reqObj).run()
+
+    def __submit(self, dataSetId="D_1000000001"):
+        paramD = {
+            "session_id": self.__sessionId,
+            "request_dataset_id": dataSetId,
+            "request_content_type": "report-entry-example-test",
+            "request_format_type": "json",
+        }
+        return self.__run("/contentws/entry_content", paramD)
+
+    def testSubmitEntry(self):
+        """Test case -  entry requests are published without locating the model file"""
+        sst = self.__submit()
+        self.assertFalse(sst.getServiceErrorFlag())
+        self.assertEqual(sst.getAppDataDict()["session_id"], self.__sessionId)
+        pD = json.loads(self.__publish.call_args[0][0])
+        self.assertEqual(pD["session_pdbx_site_id"], "WWPDB_DEPLOY")
+        self.assertNotIn("session_pdbx_file_path", pD)
+        self.assertTrue(pD["report_path"].endswith("D_1000000001_report-entry-example-test.json"))
+
+    def testSubmitLatency(self):
+        """Test case -  submit latency with the model located before publishing and in the consumer"""
+        nRequests = 10
+        ml = ContentRequestModelLocator.ContentRequestModelLocator(self.__workPath, siteId="WWPDB_DEPLOY")
+        beforeList = []
+        afterList = []
+        for ii in range(nRequests):
+            dataSetId = "D_%010d" % ii
+            # Prior submit path  -  the model file was located in the web request before publishing
+            startTime = time.time()
+            ml.getModelFilePath(dataSetId)
+            self.__submit(dataSetId)
+            beforeList.append(time.time() - startTime)
+            startTime = time.time()
+            self.__submit(dataSetId)
+            afterList.append(time.time() - startTime)
+        beforeList.sort()
+        afterList.sort()
+        logger.info(
+            "Submit latency median before %.1f ms after %.1f ms  (max before %.1f ms after %.1f ms)",
+            1000.0 * beforeList[nRequests // 2],
+            1000.0 * afterList[nRequests // 2],
+            1000.0 * beforeList[-1],
+            1000.0 * afterList[-1],
+        )
+        self.assertEqual(self.__publish.call_count, 2 * nRequests)
+        self.assertLess(afterList[nRequests // 2], 0.1)
+        self.assertLess(afterList[nRequests // 2], beforeList[nRequests // 2])
+
+
+def suiteSubmit():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ContentServiceAppWorkerTests("testSubmitEntry"))
+    suiteSelect.addTest(ContentServiceAppWorkerTests("testSubmitLatency"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSubmit()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
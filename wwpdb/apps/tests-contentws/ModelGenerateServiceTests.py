@@ -0,0 +1,136 @@
+##
+#
+# File:    ModelGenerateServiceTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for the pre-warmed model generation server -
+
+The deposition model generator is replaced by local stand-ins.
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.service.ModelGenerateService import ModelGenerateClient, ModelGenerateServer  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Initialized in the server process before jobs are run
+_warmD = {}
+
+
+def generateStandIn(dataSetId, sessionPath):
+    """Writes the model file  -  fails for D_2 and runs past any timeout for D_3."""
+    if dataSetId == "D_2":
+        raise ValueError("No deposition for %s" % dataSetId)
+    if dataSetId == "D_3":
+        time.sleep(30)
+    with open(os.path.join(sessionPath, dataSetId + "_model_P1.cif.V1"), "w") as ofh:
+        ofh.write("data_%s\n# pid %d warm %s\n" % (dataSetId, os.getpid(), _warmD.get("warm")))
+
+
+class ModelGenerateServiceTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__sessionPath = os.path.join(self.__workPath, "session")
+        os.makedirs(self.__sessionPath)
+        self.__socketPath = os.path.join(self.__workPath, "generate.sock")
+        _warmD["warm"] = "initialized"
+        self.__server = ModelGenerateServer(self.__socketPath, generateStandIn, siteId="WWPDB_DEPLOY", maxWorkers=2)
+        self.__thread = threading.Thread(target=self.__server.serve_forever)
+        self.__thread.start()
+        for _ in range(100):
+            if os.path.exists(self.__socketPath):
+                break
+            time.sleep(0.01)
+        self.__client = ModelGenerateClient(socketPath=self.__socketPath)
+
+    def tearDown(self):
+        self.__server.shutdown()
+        self.__thread.join()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def testGenerate(self):
+        """Test case -  model files are generated in processes forked from the initialized server"""
+        startTime = time.time()
+        self.assertEqual(self.__client.generate("WWPDB_DEPLOY", "D_1", self.__sessionPath), "ok")
+        logger.info("Generated model in (%.3f seconds)", time.time() - startTime)
+        with open(os.path.join(self.__sessionPath, "D_1_model_P1.cif.V1"), "r") as ifh:
+            lineList = ifh.readlines()
+        self.assertIn("warm initialized", lineList[1])
+        self.assertNotIn("pid %d " % os.getpid(), lineList[1])
+
+    def testFailures(self):
+        """Test case -  failed, timed out and unsupported jobs"""
+        self.assertEqual(self.__client.generate("WWPDB_DEPLOY", "D_2", self.__sessionPath), "failed")
+        with open(os.path.join(self.__sessionPath, "generate.log"), "r") as ifh:
+            self.assertIn("No deposition for D_2", ifh.read())
+        #
+        startTime = time.time()
+        self.assertEqual(self.__client.generate("WWPDB_DEPLOY", "D_3", self.__sessionPath, timeout=0.5), "timeout")
+        self.assertLess(time.time() - startTime, 5.0)
+        with open(os.path.join(self.__sessionPath, "generate.log"), "r") as ifh:
+            self.assertIn("Execution terminated by timeout", ifh.read())
+        self.assertFalse(os.access(os.path.join(self.__sessionPath, "D_3_model_P1.cif.V1"), os.R_OK))
+        #
+        self.assertEqual(self.__client.generate("OTHER_SITE", "D_1", self.__sessionPath), "unsupported")
+        self.assertEqual(self.__client.generate("WWPDB_DEPLOY", "D_1", os.path.join(self.__workPath, "missing")), "failed")
+        # Without a server the caller falls back to the generate script
+        self.assertIsNone(ModelGenerateClient(socketPath=os.path.join(self.__workPath, "none.sock")).generate("WWPDB_DEPLOY", "D_1", self.__sessionPath))
+
+    def testConcurrent(self):
+        """Test case -  a long job does not hold up the other worker"""
+        resultD = {}
+
+        def submit(dataSetId, timeout):
+            resultD[dataSetId] = self.__client.generate("WWPDB_DEPLOY", dataSetId, self.__sessionPath, timeout=timeout)
+
+        th = threading.Thread(target=submit, args=("D_3", 2))
+        th.start()
+        time.sleep(0.2)
+        startTime = time.time()
+        submit("D_4", 10)
+        self.assertLess(time.time() - startTime, 1.5)
+        th.join()
+        self.assertEqual(resultD, {"D_3": "timeout", "D_4": "ok"})
+
+
+def suiteModelGenerate():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(ModelGenerateServiceTests("testGenerate"))
+    suiteSelect.addTest(ModelGenerateServiceTests("testFailures"))
+    suiteSelect.addTest(ModelGenerateServiceTests("testConcurrent"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteModelGenerate()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,143 @@
+##
+#
+# File:    SubprocessRunnerTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for running commands with a timeout -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from wwpdb.apps.content_ws_server.service.SubprocessRunner import SubprocessRunner  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+
+class SubprocessRunnerTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__logPath = os.path.join(self.__workPath, "run.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __writeScript(self, body):
+        cmdFile = os.path.join(self.__workPath, "run.sh")
+        with open(cmdFile, "w") as ofh:
+            ofh.write("#!/bin/sh\n%s\n" % body)
+        os.chmod(cmdFile, 0o755)
+        return cmdFile
+
+    def __isRunning(self, pid):
+        try:
+            os.kill(pid, 0)
+            # Killed orphans may be left as zombies until reaped by init
+            with open("/proc/%d/stat" % pid, "r") as ifh:
+                return ifh.read().split(")")[-1].split()[0] != "Z"
+        except (IOError, OSError):
+            return False
+        return True
+
+    def testRun(self):
+        """Test case -  output is written to the log and resource usage is reported"""
+        sr = SubprocessRunner(timeout=10, logPath=self.__logPath)
+        cmdFile = self.__writeScript("echo to stdout\necho to stderr 1>&2\nexit 3")
+        self.assertEqual(sr.run(cmdFile), 3)
+        with open(self.__logPath, "r") as ifh:
+            self.assertEqual(ifh.read(), "to stdout\nto stderr\n")
+        sD = sr.getStats()
+        self.assertEqual((sD["returncode"], sD["timed_out"], sD["output_bytes"]), (3, False, 20))
+        self.assertGreater(sD["max_rss_kb"], 0)
+        #
+        self.assertEqual(sr.run([sys.executable, "-c", "sum(range(3000000))"]), 0)
+        sD = sr.getStats()
+        logger.info("Python child stats %r", sD)
+        self.assertGreater(sD["cpu_user"] + sD["cpu_system"], 0.0)
+        self.assertLessEqual(sD["cpu_user"] + sD["cpu_system"], sD["wall"] + 0.1)
+        self.assertIsNone(sr.run(os.path.join(self.__workPath, "missing.sh")))
+        # Without a process file descriptor the exit is waited for after the output is closed
+        with mock.patch("os.pidfd_open", side_effect=OSError, create=True):
+            self.assertEqual(sr.run(cmdFile), 3)
+
+    def testLargeOutput(self):
+        """Test case -  a command writing more than a pipe buffer completes"""
+        sr = SubprocessRunner(timeout=20, logPath=self.__logPath)
+        startTime = time.time()
+        self.assertEqual(sr.run([sys.executable, "-c", "import sys; sys.stdout.write('x' * 8000000); sys.stderr.write('y' * 1000000)"]), 0)
+        logger.info("9 MB of output in (%.2f seconds)", time.time() - startTime)
+        self.assertEqual(os.path.getsize(self.__logPath), 9000000)
+        self.assertEqual(sr.getStats()["output_bytes"], 9000000)
+
+    def testTimeout(self):
+        """Test case -  the process group is killed at the deadline"""
+        pidPath = os.path.join(self.__workPath, "child.pid")
+        cmdFile = self.__writeScript("echo started\nsleep 30 &\necho $! > %s\nwait" % pidPath)
+        for usePidFd in [True, False]:
+            sr = SubprocessRunner(timeout=0.5, logPath=self.__logPath)
+            startTime = time.time()
+            if usePidFd:
+                ret = sr.run(cmdFile)
+            else:
+                with mock.patch("os.pidfd_open", side_effect=OSError, create=True):
+                    ret = sr.run(cmdFile)
+            elapsed = time.time() - startTime
+            logger.info("Timed out (pidfd %r) after (%.3f seconds)", usePidFd, elapsed)
+            self.assertIsNone(ret)
+            self.assertTrue(sr.getStats()["timed_out"])
+            self.assertGreaterEqual(elapsed, 0.5)
+            self.assertLess(elapsed, 0.8)
+            with open(pidPath, "r") as ifh:
+                pid = int(ifh.read())
+            for _ in range(50):
+                if not self.__isRunning(pid):
+                    break
+                time.sleep(0.01)
+            self.assertFalse(self.__isRunning(pid))
+        with open(self.__logPath, "r") as ifh:
+            self.assertEqual(ifh.read(), "started\nExecution terminated by timeout 0.5 (seconds)\n" * 2)
+
+
+def suiteSubprocessRunner():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(SubprocessRunnerTests("testRun"))
+    suiteSelect.addTest(SubprocessRunnerTests("testLargeOutput"))
+    suiteSelect.addTest(SubprocessRunnerTests("testTimeout"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteSubprocessRunner()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)
@@ -0,0 +1,125 @@
+##
+#
+# File:    WsgiRequestAppTests.py
+# Author:  E. Peisach
+# Date:    18-Oct-2026
+# Version: 0.001
+#
+# Updates:
+#
+##
+"""
+Test cases for the WSGI request application and a requests per second benchmark -
+
+"""
+__docformat__ = "restructuredtext en"
+__author__ = "Ezra Peisach"
+__email__ = "peisach@rcsb.rutgers.edu"
+__license__ = "Creative Commons Attribution 3.0 Unported"
+__version__ = "V0.01"
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+if __package__ is None or __package__ == "":
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from commonsetup import HERE, configInfo  # noqa:  F401 pylint: disable=import-error,unused-import
+else:
+    from .commonsetup import HERE, configInfo  # noqa: F401 pylint: disable=relative-beyond-top-level
+
+from webob import Request  # noqa: E402
+
+from wwpdb.apps.content_ws_server.webapp import WebServiceApp, wsgi  # noqa: E402
+
+FORMAT = "[%(levelname)s]-%(module)s.%(funcName)s: %(message)s"
+logging.basicConfig(format=FORMAT)
+logger = logging.getLogger()
+
+
+class WsgiRequestAppTests(unittest.TestCase):
+    def setUp(self):
+        self.__workPath = tempfile.mkdtemp()
+        self.__patch = mock.patch.dict(configInfo, {"SITE_WEB_APPS_TOP_SESSIONS_PATH": self.__workPath})
+        self.__patch.start()
+        WebServiceApp.clearSiteConfig()
+        # Request logging is not part of the measured work
+        self.__logLevel = logger.level
+        logger.setLevel(logging.INFO)
+
+    def tearDown(self):
+        logger.setLevel(self.__logLevel)
+        WebServiceApp.clearSiteConfig()
+        self.__patch.stop()
+        shutil.rmtree(self.__workPath, ignore_errors=True)
+
+    def __request(self, app, path, headers=None):
+        rsp = Request.blank(path, POST={"request_dataset_id": "D_1000000001"}, headers=headers or {}).get_response(app)
+        return rsp.status_int, json.loads(rsp.body.decode("utf-8"))
+
+    def testRoutes(self):
+        """Test case -  dump, session and unknown service requests"""
+        app = wsgi.MyRequestApp(authVerifyFlag=True)
+        status, rD = self.__request(app, "/contentws/dump")
+        self.assertEqual(status, 200)
+        self.assertFalse(rD["errorflag"])
+        self.assertEqual(rD["request_dataset_id"], ["D_1000000001"])
+        status, rD = self.__request(app, "/contentws/session")
+        self.assertFalse(rD["errorflag"])
+        self.assertTrue(os.path.isdir(os.path.join(self.__workPath, "sessions", "CONTENTWS_ANONYMOUS", rD["session_id"])))
+        status, rD = self.__request(app, "/contentws/nosuchservice")
+        self.assertTrue(rD["errorflag"])
+        self.assertEqual(rD["statusmessage"], "Unknown operation")
+
+    def testBuiltOnce(self):
+        """Test case -  site configuration and token readers are not built for each request"""
+        tokD = {"errorFlag": False, "token": "token", "sub": "CONTENTWS_USER", "exp": 2000000000, "iat": 1700000000}
+        with mock.patch.object(wsgi, "JwtTokenReader") as jtr, mock.patch.object(WebServiceApp, "ConfigInfo", wraps=WebServiceApp.ConfigInfo) as cI:
+            jtr.return_value.parseAuth.return_value = tokD
+            jtr.return_value.parseToken.return_value = tokD
+            app = wsgi.MyRequestApp(authVerifyFlag=True)
+            for _ in range(10):
+                for path in ["/contentws/dump", "/contentws/session"]:
+                    _, rD = self.__request(app, path, headers={"wwpdb-api-token": "Bearer " + "x" * 40})
+                    self.assertFalse(rD["errorflag"])
+            self.assertEqual(rD["statusmessage"], "ok")
+            self.assertEqual(jtr.call_count, 1)
+            self.assertEqual(cI.call_count, 1)
+            self.assertEqual(jtr.return_value.parseToken.call_count, 20)
+
+    def testRequestRate(self):
+        """Test case -  requests per second for the dump and session services"""
+        app = wsgi.MyRequestApp(authVerifyFlag=True)
+        nRequests = 300
+        for path in ["/contentws/dump", "/contentws/session"]:
+            self.__request(app, path)
+            startTime = time.time()
+            for _ in range(nRequests):
+                status, _ = self.__request(app, path)
+                self.assertEqual(status, 200)
+            elapsed = time.time() - startTime
+            logger.info("Service %-20s %d requests in (%.2f seconds) %.0f requests/second", path, nRequests, elapsed, nRequests / elapsed)
+
+
+def suiteWsgi():
+    suiteSelect = unittest.TestSuite()
+    suiteSelect.addTest(WsgiRequestAppTests("testRoutes"))
+    suiteSelect.addTest(WsgiRequestAppTests("testBuiltOnce"))
+    suiteSelect.addTest(WsgiRequestAppTests("testRequestRate"))
+    return suiteSelect
+
+
+if __name__ == "__main__":
+    #
+    mySuite = suiteWsgi()
+    unittest.TextTestRunner(verbosity=2).run(mySuite)